@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'early_child_api.settings')
+# Serve list and detail reads with the async views (see edu/async_views.py)
+os.environ.setdefault('EDU_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -1,3 +1,5 @@
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -32,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'edu.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -69,6 +72,87 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local-memory by default; point this at Redis or Memcached in production so
+# every worker shares the same cached responses and version counters.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Read-through cache for catalog (resource and module) responses
+EDU_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Bulk create/update/delete on list endpoints
+EDU_BULK = {
+    'MAX_ITEMS': 5000,
+    'BATCH_SIZE': 500,
+}
+
+# Delta sync feeds only return rows older than this many seconds, so rows
+# written by transactions still committing are not skipped
+EDU_SYNC_SETTLE_SECONDS = 2
+
+# Serve list/detail reads with async views; early_child_api/asgi.py turns this on
+EDU_ASYNC_VIEWS = os.environ.get('EDU_ASYNC_VIEWS') == '1'
+
+# Token -> user resolution cached per process (SHARED_ALIAS adds a CACHES alias
+# shared by every process). Without SHARED_ALIAS, a revoked token or deactivated
+# user is still accepted by other processes for up to TTL seconds; changes made
+# with QuerySet.update() (no signals) take up to TTL seconds everywhere.
+EDU_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 60,
+    'SHARED_ALIAS': None,
+}
+
+# Throttle counters (per-endpoint rates are set in edu/urls.py)
+EDU_THROTTLE = {
+    'STORE': 'edu.throttling.CacheCounterStore',
+    'CACHE_ALIAS': 'default',
+}
+
+# Buffered ingestion of child progress events
+EDU_INGEST = {
+    'MAX_BUFFERED': 50000,
+    'BATCH_SIZE': 1000,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+# Brotli/gzip response compression (brotli only when the package is installed)
+EDU_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Audio delivery; set OFFLOAD to 'x-accel-redirect' (nginx) or 'x-sendfile'
+# (Apache) to let the front server send files
+EDU_MEDIA = {
+    'OFFLOAD': None,
+    'MAX_AGE': 86400,
+}
+
+# Background processing of phonetics audio uploads (renditions, duration, waveform)
+EDU_AUDIO = {
+    'WORKERS': 2,
+    'SAMPLE_RATE': 16000,
+}
+
+# Server-sent change events (/api/v1/events/, ASGI only)
+EDU_EVENTS = {
+    'HEARTBEAT': 15,
+    'QUEUE_SIZE': 100,
+}
+
+# MessagePack is offered only when the optional msgpack package is installed
+MSGPACK_AVAILABLE = find_spec('msgpack') is not None
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -113,7 +197,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'edu.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -122,12 +206,19 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'edu.renderers.FastJSONRenderer',
+        *(['edu.renderers.MessagePackRenderer'] if MSGPACK_AVAILABLE else []),
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        *(['edu.renderers.MessagePackParser'] if MSGPACK_AVAILABLE else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'edu.throttling.AnonRateThrottle',
+        'edu.throttling.UserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
@@ -16,8 +16,14 @@ def homepage(request):
             "child_profiles": "/api/v1/child-profiles/",
             "resources": "/api/v1/resources/",
             "phonetics_modules": "/api/v1/phonetics-modules/",
+            "phonetics_audio": "/api/v1/phonetics-modules/<id>/audio/",
             "math_modules": "/api/v1/math-modules/",
             "stem_modules": "/api/v1/stem-modules/",
+            "catalog": "/api/v1/catalog/",
+            "search": "/api/v1/search/?q=<terms>",
+            "sync": "/api/v1/sync/<resource_type>/?updated_since=<ISO 8601>",
+            "progress_events": "/api/v1/progress-events/",
+            "change_events": "/api/v1/events/?types=<types>",
             "auth_token": "/api/v1/auth-token/",  # Add auth token endpoint
         }
     })
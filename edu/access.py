@@ -0,0 +1,71 @@
+from django.contrib.auth.models import Group
+from django.core.exceptions import FieldDoesNotExist
+
+from .caching import bump_model_version, get_cache_settings, get_model_version, get_response_cache
+
+
+# Group names are cached per user for this long; membership changes delete
+# the entry straight away (see edu/signals.py)
+GROUPS_TIMEOUT = 300
+
+
+def _groups_key(user_pk):
+    # Renaming or deleting a group bumps the Group version, dropping every user's entry
+    return f"{get_cache_settings()['KEY_PREFIX']}:access:groups:{get_model_version(Group)}:{user_pk}"
+
+
+def get_group_names(request):
+    """
+    Return the names of the groups the requesting user belongs to.
+
+    Resolved once per request (memoized on the request) and shared across
+    requests through the response cache backend, so permission checks
+    normally run no queries.
+    """
+    names = getattr(request, '_edu_group_names', None)
+    if names is None:
+        user = request.user
+        if not user or not user.is_authenticated:
+            names = frozenset()
+        else:
+            cache = get_response_cache()
+            key = _groups_key(user.pk)
+            names = cache.get(key)
+            if names is None:
+                names = frozenset(user.groups.values_list('name', flat=True))
+                cache.set(key, names, GROUPS_TIMEOUT)
+        request._edu_group_names = names
+    return names
+
+
+def in_group(request, name):
+    return name in get_group_names(request)
+
+
+def invalidate_user_groups(user_pks):
+    """
+    Forget the cached groups of the given users.
+    """
+    get_response_cache().delete_many([_groups_key(pk) for pk in user_pks])
+
+
+def invalidate_all_groups():
+    """
+    Forget the cached groups of every user (a group was renamed or deleted).
+    """
+    bump_model_version(Group)
+
+
+def is_owner(user, obj, owner_field='user'):
+    """
+    Return whether `obj.<owner_field>` is `user`, comparing the foreign key
+    column so the related row is never fetched. Objects without the field,
+    or owned by a different model than `user`'s, are never owned.
+    """
+    try:
+        field = obj._meta.get_field(owner_field)
+    except FieldDoesNotExist:
+        return False
+    if not field.many_to_one or not isinstance(user, field.related_model):
+        return False
+    return getattr(obj, field.attname) == user.pk
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule
+from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, AudioRendition, MathModule, STEMModule
 
 # Admin registration with customization for UserProfile model
 class ChildProfileInline(admin.TabularInline):
@@ -47,6 +47,20 @@ class ResourceAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)  # Order by creation date
 
 
+class AudioRenditionInline(admin.TabularInline):
+    """
+    Read-only list of the renditions built by the audio pipeline.
+    """
+    model = AudioRendition
+    fields = ('codec', 'content_type', 'file', 'size', 'sample_rate', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 # Admin registration for PhoneticsModule model
 @admin.register(PhoneticsModule)
 class PhoneticsModuleAdmin(admin.ModelAdmin):
@@ -57,6 +71,8 @@ class PhoneticsModuleAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')  # Enable search by title or description
     list_filter = ('created_at', 'updated_at')  # Add filter options
     filter_horizontal = ('resources',)  # For many-to-many fields
+    readonly_fields = ('audio_status', 'audio_duration', 'audio_waveform')  # Set by the audio pipeline
+    inlines = [AudioRenditionInline]
     ordering = ('-created_at',)  # Order by creation date
 
 
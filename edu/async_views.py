@@ -0,0 +1,285 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date
+from rest_framework import generics, mixins, status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotFound, ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .caching import CachedResponseMixin, get_cache_settings, get_response_cache, response_cache_metrics
+from .conditional import ConditionalGetMixin
+from .events import EVENT_TYPES, HEARTBEAT_MESSAGE, RESET_MESSAGE, change_broker, get_event_settings
+from .fast_serializers import FastListMixin, compile_plan
+from .views import BaseViewMixin
+
+
+class AsyncGenericAPIView(generics.GenericAPIView):
+    """
+    `GenericAPIView` with coroutine handlers, for ASGI deployments.
+
+    Authentication, permissions and throttling (plus the list validators and
+    the response cache lookup, where the view has them) run together in one
+    worker-thread hop; the handler then reads the database with the async
+    ORM and the response is rendered on the event loop. No thread is held
+    while a request waits on the client.
+
+    Methods without an async handler go to `sync_view`, the regular view
+    for the same URL, so writes keep its validation and bulk support.
+    """
+    sync_view = None  # View function of the sync view, see as_view()
+    cache_models = ()
+    cache_name = None
+    get_cache_name = CachedResponseMixin.get_cache_name
+
+    @classmethod
+    def as_view(cls, sync_view_class=None, **initkwargs):
+        if sync_view_class is not None:
+            initkwargs['sync_view'] = sync_view_class.as_view(**initkwargs)
+        return super().as_view(**initkwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if self.sync_view is not None and method != 'options' and not hasattr(self, method):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        self.args, self.kwargs = args, kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        self.cache_key = self.validators = None
+        try:
+            response = await sync_to_async(self.prepare)(request, *args, **kwargs)
+            if response is None:
+                handler = getattr(self, method, None) if method in self.http_method_names else None
+                if handler is None:
+                    raise MethodNotAllowed(request.method)
+                if iscoroutinefunction(handler):
+                    response = await handler(request, *args, **kwargs)
+                else:
+                    response = await sync_to_async(handler)(request, *args, **kwargs)  # OPTIONS
+                if self.cache_key is not None and response.status_code == 200:
+                    await get_response_cache().aset(self.cache_key, response.data, get_cache_settings()['TIMEOUT'])
+                    response['X-Cache'] = 'MISS'
+            if self.validators is not None and response.status_code in (200, 304):
+                etag, last_modified = self.validators
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        response = self.finalize_response(request, response, *args, **kwargs)
+        return await self.render(response)
+
+    def prepare(self, request, *args, **kwargs):
+        """
+        Run `initial()` and return the response to send without running the
+        handler (a 304 or a cached response), if any. Runs in a worker thread.
+        """
+        self.initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return self.get_early_response(request)
+
+    def get_early_response(self, request):
+        """
+        Return the cached response for views with a response cache, or None.
+        """
+        if not hasattr(self, 'get_cache_key'):
+            return None
+        self.cache_key = self.get_cache_key(request)
+        data = get_response_cache().get(self.cache_key)
+        response_cache_metrics.record(self.get_cache_name(), hit=data is not None)
+        if data is None:
+            return None
+        self.cache_key = None  # Nothing to store
+        self.check_cached_permissions()
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def check_cached_permissions(self):
+        """
+        Hook for object permission checks on cache hits.
+        """
+
+    async def render(self, response):
+        """
+        Render the response and return it as a plain `HttpResponse`, which
+        Django's ASGI handler sends as it is instead of rendering it in a
+        thread. The browsable API builds its forms from the database, so it
+        is still rendered in a thread.
+        """
+        if not hasattr(response, 'render'):
+            return response
+        if isinstance(getattr(response, 'accepted_renderer', None), BrowsableAPIRenderer):
+            await sync_to_async(response.render)()
+        else:
+            response.render()
+        plain = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            plain[header] = value
+        plain.cookies = response.cookies
+        return plain
+
+
+class AsyncListView(AsyncGenericAPIView):
+    """
+    Async `list`: the page (count and rows, with their prefetches) is read
+    with the async ORM. Views built from a `FastListMixin` view serialize
+    `.values()` rows through the compiled field plan, as the sync view does.
+    """
+    fast_list = False
+
+    def get_early_response(self, request):
+        # As in ConditionalGetMixin.list: validators come before the cache.
+        is_keyset_request = getattr(self.paginator, 'is_keyset_request', None)
+        keyset = is_keyset_request is not None and is_keyset_request(request)
+        if isinstance(self, ConditionalGetMixin) and not keyset:
+            etag, last_modified = self.get_list_validator(self.filter_queryset(self.get_queryset()))
+            if etag is not None:
+                self.validators = etag, last_modified
+                if self.is_not_modified(request, etag, last_modified):
+                    return HttpResponseNotModified()
+        return super().get_early_response(request)
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = compile_plan(self.get_serializer()) if self.fast_list else None
+        if plan is not None:
+            ordering = getattr(getattr(self.paginator, 'keyset_class', None), 'ordering', ())
+            columns = plan.columns + [column for column in ordering if column not in plan.columns]
+            queryset = queryset.prefetch_related(None).values(*columns)
+
+        paginator = self.paginator
+        if paginator is None:
+            rows = [row async for row in queryset]
+        elif hasattr(paginator, 'apaginate_queryset'):
+            rows = await paginator.apaginate_queryset(queryset, request, view=self)
+        else:
+            rows = await sync_to_async(paginator.paginate_queryset)(queryset, request, view=self)
+
+        if plan is None:
+            data = self.get_serializer(rows, many=True).data
+        elif plan.nested:
+            data = await sync_to_async(plan.serialize)(rows)  # One query per nested relation
+        else:
+            data = plan.serialize(rows)
+        return Response(data) if paginator is None else paginator.get_paginated_response(data)
+
+
+class AsyncDetailView(AsyncGenericAPIView):
+    """
+    Async `retrieve`. Object permissions are checked on the event loop, so
+    they must not query the database (`IsOwnerOrAdmin` only compares
+    foreign key columns). Views built from a `ConditionalGetMixin` view
+    compute the object's validators from the fetched object and serialize
+    it directly, without the response cache.
+    """
+    def get_early_response(self, request):
+        if isinstance(self, ConditionalGetMixin):
+            return None  # The validators need the object; see get()
+        return super().get_early_response(request)
+
+    async def get(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise NotFound()
+        self.check_object_permissions(request, obj)
+        if isinstance(self, ConditionalGetMixin):
+            self.validators = self.get_object_validator(obj)
+            if self.is_not_modified(request, *self.validators):
+                return HttpResponseNotModified()
+        return Response(self.get_serializer(obj).data)
+
+    def check_cached_permissions(self):
+        self.get_plain_object()
+
+
+# Settings copied from the sync view
+ASYNC_VIEW_ATTRIBUTES = (
+    'queryset', 'serializer_class', 'pagination_class', 'filter_backends', 'filterset_fields',
+    'permission_classes', 'throttle_classes', 'cache_models', 'lookup_field', 'lookup_url_kwarg',
+)
+
+
+def async_view(view_class):
+    """
+    Build the async counterpart of a list or detail view, with its
+    queryset, serializer, pagination, filters, permissions, cache models,
+    ETag validators and fast list path. Cached responses and ETags are
+    shared with the sync view.
+    """
+    base = AsyncListView if issubclass(view_class, mixins.ListModelMixin) else AsyncDetailView
+    attrs = {name: getattr(view_class, name) for name in ASYNC_VIEW_ATTRIBUTES if hasattr(view_class, name)}
+    attrs['cache_name'] = view_class.__name__
+    attrs['fast_list'] = issubclass(view_class, FastListMixin)
+    if issubclass(view_class, CachedResponseMixin):
+        attrs['get_cache_key'] = CachedResponseMixin.get_cache_key
+    attrs['__doc__'] = f"Async version of `{view_class.__name__}` for reads."
+    bases = (BaseViewMixin, base)
+    if issubclass(view_class, ConditionalGetMixin):
+        bases = (ConditionalGetMixin, *bases)
+    return type(f"Async{view_class.__name__}", bases, attrs)
+
+
+class StreamingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Change events are only streamed when the API is served over ASGI."
+    default_code = 'streaming_unavailable'
+
+
+class ChangeStreamView(AsyncGenericAPIView):
+    """
+    API endpoint streaming change notifications as server-sent events.
+    - `GET ?types=resources,child-profiles` limits the stream to those types
+      (the sync feed's); all of them by default.
+    - Each `change` event carries `{"type", "id", "action"}`, `action` being
+      `saved` or `deleted`; clients refetch what changed.
+    - Reconnecting with `Last-Event-ID` replays the events missed meanwhile.
+      A `reset` event means some were lost: resync from the sync feed.
+    - A comment every `EDU_EVENTS['HEARTBEAT']` seconds keeps the connection open.
+    Served over ASGI only: under WSGI each stream would hold a worker thread.
+    """
+    permission_classes = BaseViewMixin.permission_classes
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is an event stream whatever the Accept header asks for.
+        return super().perform_content_negotiation(request, force=True)
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request._request, ASGIRequest):
+            raise StreamingUnavailable()
+        types = self.get_event_types(request)
+        response = StreamingHttpResponse(
+            self.stream(types, request.headers.get('Last-Event-ID')), content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: pass events on as they come
+        return response
+
+    def get_event_types(self, request):
+        value = request.query_params.get('types')
+        if not value:
+            return frozenset(EVENT_TYPES)
+        types = frozenset(value.split(','))
+        if not types <= EVENT_TYPES.keys():
+            raise ValidationError({"types": f"Choose from: {', '.join(EVENT_TYPES)}."})
+        return types
+
+    async def stream(self, types, last_event_id):
+        options = get_event_settings()
+        subscription, missed = change_broker.subscribe(types, last_event_id)
+        try:
+            yield f"retry: {options['RETRY']}\n\n".encode()
+            if missed is None:
+                yield RESET_MESSAGE
+            elif missed:
+                yield b''.join(missed)
+            while True:
+                messages = await subscription.next_messages(options['HEARTBEAT'])
+                yield HEARTBEAT_MESSAGE if messages is None else messages
+        finally:
+            change_broker.unsubscribe(subscription)
@@ -0,0 +1,319 @@
+import atexit
+import io
+import logging
+import mimetypes
+import os
+import posixpath
+import shutil
+import subprocess
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.utils.mediatypes import media_type_matches
+
+from .caching import bump_model_version
+from .models import AudioRendition, PhoneticsModule
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIO_SETTINGS = {
+    'WORKERS': 2,             # Background threads processing uploads; 0 processes them inline
+    'SAMPLE_RATE': 16000,     # Renditions are mono at this rate, plenty for speech
+    'PEAK_DBFS': -1.0,        # Renditions are normalized so their loudest sample sits here
+    'WAVEFORM_POINTS': 100,   # Slices in the stored waveform
+    'FFMPEG': 'ffmpeg',       # When found, decodes any upload format and encodes Opus/MP3
+    'FFMPEG_TIMEOUT': 120,
+}
+
+# Rendition codec -> (content type, file extension, ffmpeg encoder arguments).
+# WAV is written with the standard library, so every readable upload gets one.
+RENDITIONS = {
+    'wav': ('audio/wav', 'wav', None),
+    'opus': ('audio/ogg', 'ogg', ['-c:a', 'libopus', '-b:a', '24k', '-f', 'ogg']),
+    'mp3': ('audio/mpeg', 'mp3', ['-c:a', 'libmp3lame', '-b:a', '48k', '-f', 'mp3']),
+}
+
+
+def get_audio_settings():
+    """
+    Return the audio pipeline settings, with defaults filled in.
+    """
+    return {**DEFAULT_AUDIO_SETTINGS, **getattr(settings, 'EDU_AUDIO', {})}
+
+
+class AudioError(Exception):
+    pass
+
+
+def find_ffmpeg():
+    return shutil.which(get_audio_settings()['FFMPEG'] or '')
+
+
+def _run_ffmpeg(ffmpeg, args, data):
+    result = subprocess.run(
+        [ffmpeg, '-nostdin', '-v', 'error', '-i', 'pipe:0', *args, 'pipe:1'],
+        input=data, capture_output=True, timeout=get_audio_settings()['FFMPEG_TIMEOUT'],
+    )
+    if result.returncode:
+        raise AudioError(result.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+    return result.stdout
+
+
+# Decoding
+def _pcm_to_float(frames, sample_width, channels):
+    """
+    Convert little-endian PCM frames to mono float32 samples in [-1, 1].
+    """
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 2 ** 15
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(values >= 2 ** 23, values - 2 ** 24, values).astype(np.float32) / 2 ** 23
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2 ** 31
+    else:
+        raise AudioError(f"Unsupported sample width: {sample_width} bytes.")
+    return samples.reshape(-1, channels).mean(axis=1)
+
+
+def decode(data, ffmpeg=None):
+    """
+    Return `(samples, sample_rate)` with mono float32 samples. PCM WAV is
+    read with the standard library; other formats need ffmpeg.
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as reader:
+            frames = reader.readframes(reader.getnframes())
+            return _pcm_to_float(frames, reader.getsampwidth(), reader.getnchannels()), reader.getframerate()
+    except (wave.Error, EOFError):
+        if ffmpeg is None:
+            raise AudioError("Only PCM WAV uploads can be processed without ffmpeg.") from None
+    rate = get_audio_settings()['SAMPLE_RATE']
+    output = _run_ffmpeg(ffmpeg, ['-ac', '1', '-ar', str(rate), '-f', 'f32le'], data)
+    return np.frombuffer(output, dtype='<f4').astype(np.float32), rate
+
+
+# Processing
+def normalize(samples, peak_dbfs):
+    """
+    Remove any DC offset and scale so the loudest sample is at `peak_dbfs`.
+    """
+    samples = samples - samples.mean() if len(samples) else samples
+    peak = np.abs(samples).max() if len(samples) else 0
+    if not peak:
+        return samples
+    return samples * (10 ** (peak_dbfs / 20) / peak)
+
+
+def resample(samples, rate, target_rate, taps=101):
+    """
+    Downsample to `target_rate` with a windowed-sinc low-pass filter (so
+    nothing above the new Nyquist frequency aliases) and linear
+    interpolation. Audio at or below the target rate is left as it is.
+    """
+    if rate <= target_rate or not len(samples):
+        return samples, rate
+    cutoff = 0.5 * target_rate / rate * 0.95  # Cycles per input sample, just under the new Nyquist
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    filtered = np.convolve(samples, kernel / kernel.sum(), mode='same')
+    positions = np.arange(int(len(samples) * target_rate / rate)) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), filtered).astype(np.float32), target_rate
+
+
+def waveform(samples, points):
+    """
+    Return the peak level of each of `points` equal slices, relative to the
+    loudest slice, for drawing the clip in players.
+    """
+    if not len(samples):
+        return []
+    peaks = np.array([np.abs(chunk).max() if len(chunk) else 0.0 for chunk in np.array_split(samples, points)])
+    top = peaks.max()
+    return [round(float(peak), 3) for peak in (peaks / top if top else peaks)]
+
+
+def encode_wav(samples, rate):
+    """
+    Return 16-bit mono PCM WAV bytes.
+    """
+    pcm = (np.clip(samples, -1, 1) * (2 ** 15 - 1)).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def build_renditions(data):
+    """
+    Decode, normalize and downsample an upload, then encode it in every
+    available rendition. Return `(renditions, sample_rate, duration, waveform)`
+    where `renditions` maps codec to file content.
+    """
+    options = get_audio_settings()
+    ffmpeg = find_ffmpeg()
+    samples, rate = decode(data, ffmpeg)
+    if not len(samples):
+        raise AudioError("The file contains no audio.")
+    duration = len(samples) / rate
+    samples = normalize(samples, options['PEAK_DBFS'])
+    peaks = waveform(samples, options['WAVEFORM_POINTS'])
+    samples, rate = resample(samples, rate, options['SAMPLE_RATE'])
+
+    wav = encode_wav(samples, rate)
+    renditions = {'wav': wav}
+    if ffmpeg is not None:
+        for codec, (_, _, args) in RENDITIONS.items():
+            if args is None:
+                continue
+            try:
+                renditions[codec] = _run_ffmpeg(ffmpeg, args, wav)
+            except (AudioError, subprocess.TimeoutExpired) as exc:
+                # Builds without this encoder still get the other renditions.
+                logger.warning("Skipped %s rendition: %s", codec, exc)
+    return renditions, rate, duration, peaks
+
+
+def process_module(pk):
+    """
+    Build the renditions and metadata of one phonetics module's audio and
+    return its new status (None if the module or its upload is gone).
+    Renditions replace the previous ones in one transaction; if the upload
+    was replaced meanwhile, the result is dropped for the newer job.
+    """
+    module = PhoneticsModule.objects.only('id', 'audio_file').filter(pk=pk).first()
+    if module is None or not module.audio_file:
+        return None
+    source = module.audio_file.name
+    try:
+        with module.audio_file.open('rb') as upload:
+            renditions, rate, duration, peaks = build_renditions(upload.read())
+    except Exception as exc:
+        if isinstance(exc, AudioError):
+            logger.warning("Could not process the audio of phonetics module %s: %s", pk, exc)
+        else:
+            logger.exception("Could not process the audio of phonetics module %s.", pk)
+        PhoneticsModule.objects.filter(pk=pk, audio_file=source).update(
+            audio_status='failed', updated_at=timezone.now(),  # Changes the ETag and reaches the sync feed
+        )
+        bump_model_version(PhoneticsModule)  # update() sends no post_save
+        return 'failed'
+
+    stem = posixpath.splitext(posixpath.basename(source))[0]
+    with transaction.atomic():
+        module = PhoneticsModule.objects.select_for_update().filter(pk=pk, audio_file=source).first()
+        if module is None:
+            return None
+        module.audio_renditions.all().delete()
+        for codec, content in renditions.items():
+            content_type, extension, _ = RENDITIONS[codec]
+            rendition = AudioRendition(
+                module=module, codec=codec, content_type=content_type, size=len(content), sample_rate=rate,
+            )
+            rendition.file.save(f"{stem}.{extension}", ContentFile(content), save=False)
+            rendition.save()
+        module.audio_status = 'ready'
+        module.audio_duration = round(duration, 3)
+        module.audio_waveform = peaks
+        module.save(update_fields=['audio_status', 'audio_duration', 'audio_waveform', 'updated_at'])
+    return 'ready'
+
+
+class AudioPipeline:
+    """
+    Processes uploads on a pool of background threads, so requests that
+    upload audio return straight away (the heavy lifting is numpy and
+    ffmpeg, which release the GIL). With `WORKERS` set to 0 uploads are
+    processed inline. The pool is created on first use, so forked workers
+    get their own, and is drained at interpreter exit. Jobs lost to a crash
+    stay `pending`; `manage.py process_audio` picks them up.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def submit(self, pk):
+        workers = get_audio_settings()['WORKERS']
+        if not workers:
+            return process_module(pk)
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='edu-audio')
+                self._pid = os.getpid()
+            return self._executor.submit(self._run, pk)
+
+    @staticmethod
+    def _run(pk):
+        try:
+            return process_module(pk)
+        finally:
+            connection.close()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+audio_pipeline = AudioPipeline()
+atexit.register(audio_pipeline.shutdown)
+
+
+# Delivery
+def _accepted_types(accept):
+    types = []
+    for item in (accept or '*/*').split(','):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        quality = next((param.partition('=')[2] for param in params if param.startswith('q=')), '1')
+        try:
+            if float(quality) > 0 and media_type:
+                types.append(media_type)
+        except ValueError:
+            continue
+    return types
+
+
+def pick_rendition(module, accept=None, codec=None):
+    """
+    Return `(file, content_type)` to serve for a module: the smallest file
+    whose type the client accepts, among the renditions (once processing
+    is done) and the original upload. `codec` ('original' or a key of
+    `RENDITIONS`) asks for one file explicitly; None is returned if the
+    module has no such file.
+    """
+    original = (module.audio_file, mimetypes.guess_type(module.audio_file.name)[0] or 'application/octet-stream')
+    if codec == 'original':
+        return original
+    renditions = list(module.audio_renditions.all()) if module.audio_status == 'ready' else []
+    if codec is not None:
+        return next(((r.file, r.content_type) for r in renditions if r.codec == codec), None)
+    if not renditions:
+        return original
+
+    accepted = _accepted_types(accept)
+    candidates = [(r.size, r.file, r.content_type) for r in renditions]
+    try:
+        candidates.append((module.audio_file.size, *original))
+    except OSError:
+        pass  # The upload is gone from storage; a rendition is served instead
+    suitable = [
+        candidate for candidate in candidates
+        if any(media_type_matches(candidate[2], media_type) for media_type in accepted)
+    ]
+    _, file, content_type = min(suitable or candidates, key=lambda candidate: candidate[0])
+    return file, content_type
@@ -0,0 +1,160 @@
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .caching import CacheMetrics
+
+
+DEFAULT_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,   # Tokens kept in each process
+    'TTL': 60,              # Seconds before a cached token is resolved again; without a shared
+                            # cache, the longest other processes accept a revoked token
+    'SHARED_ALIAS': None,   # Optional alias from settings.CACHES shared by all processes
+    'KEY_PREFIX': 'edu:token',
+}
+
+
+def get_token_cache_settings():
+    """
+    Return the token cache settings, with defaults filled in.
+    """
+    return {**DEFAULT_TOKEN_CACHE, **getattr(settings, 'EDU_TOKEN_CACHE', {})}
+
+
+class LRUCache:
+    """
+    Thread-safe, bounded least-recently-used cache whose entries expire.
+    """
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache_metrics = CacheMetrics()
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_token_cache():
+    """
+    Return this process's LRU, rebuilt if the size or TTL settings changed.
+    """
+    global _local_cache
+    options = get_token_cache_settings()
+    with _local_cache_lock:
+        if (
+            _local_cache is None
+            or _local_cache.max_entries != options['MAX_ENTRIES']
+            or _local_cache.ttl != options['TTL']
+        ):
+            _local_cache = LRUCache(options['MAX_ENTRIES'], options['TTL'])
+        return _local_cache
+
+
+def _token_cache_key(key):
+    # Tokens are credentials; only their digest is used as a cache key.
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_tokens(keys):
+    """
+    Drop cached resolutions for the given token keys. Locally they are
+    deleted; with a shared cache, each token's version there is bumped, so
+    every process re-resolves it on its next request.
+    """
+    options = get_token_cache_settings()
+    digests = [_token_cache_key(key) for key in keys]
+    local = get_local_token_cache()
+    for digest in digests:
+        local.delete(digest)
+    if options['SHARED_ALIAS']:
+        # Entries resolved before the bump expire within TTL, so the version can too.
+        caches[options['SHARED_ALIAS']].set_many(
+            {f"{options['KEY_PREFIX']}:version:{digest}": uuid.uuid4().hex for digest in digests}, options['TTL']
+        )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for `TokenAuthentication` that caches token -> user.
+
+    Lookups go to a per-process LRU first, then to the optional shared
+    cache, and only then to the database (the usual `Token`/`User` join).
+    Deleting a token or saving its user (e.g. deactivating it) invalidates
+    the cached entries; see edu/signals.py. With a shared cache, entries
+    carry the token's version there, read on every request, so the change
+    reaches all processes at once. Without one, other processes keep
+    accepting the token for up to `TTL` seconds. Changes that send no
+    signals (`QuerySet.update()`, raw SQL) are only seen once entries
+    expire, after up to `TTL` seconds. Each request gets its own copy of the
+    cached user. Hits and misses per layer are in `token_cache_metrics`.
+    """
+    def authenticate_credentials(self, key):
+        options = get_token_cache_settings()
+        digest = _token_cache_key(key)
+        local = get_local_token_cache()
+        shared = caches[options['SHARED_ALIAS']] if options['SHARED_ALIAS'] else None
+        version = shared.get(f"{options['KEY_PREFIX']}:version:{digest}") if shared is not None else None
+        shared_key = f"{options['KEY_PREFIX']}:{digest}:{version or 0}"
+
+        entry = local.get(digest)  # (version, user)
+        user = entry[1] if entry is not None and entry[0] == version else None
+        token_cache_metrics.record('local', hit=user is not None)
+        if user is None and shared is not None:
+            user = shared.get(shared_key)
+            token_cache_metrics.record('shared', hit=user is not None)
+            if user is not None:
+                local.set(digest, (version, user))
+
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            local.set(digest, (version, copy.copy(user)))
+            if shared is not None:
+                shared.set(shared_key, user, options['TTL'])
+            return user, token
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return copy.copy(user), Token(key=key, user=user)
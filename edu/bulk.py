@@ -0,0 +1,201 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .caching import bump_model_version
+from .events import publish_changes
+from .search import index_objects
+
+
+DEFAULT_BULK_SETTINGS = {
+    'MAX_ITEMS': 5000,   # Largest batch accepted in a single request
+    'BATCH_SIZE': 500,   # Rows per INSERT/UPDATE statement
+}
+
+
+def get_bulk_settings():
+    """
+    Return the bulk endpoint settings, with defaults filled in.
+    """
+    return {**DEFAULT_BULK_SETTINGS, **getattr(settings, 'EDU_BULK', {})}
+
+
+# Bulk Endpoints
+class BulkCreateMixin:
+    """
+    Batch create for list endpoints: `POST` with a JSON array creates every
+    item with `bulk_create`.
+
+    Every item is validated first; if any item is invalid nothing is written
+    and the response lists the errors by index. Otherwise all rows are written
+    in one transaction and the response carries one result per item.
+    `bulk_create` skips model signals, so the response cache version of
+    `cache_models` is bumped, the search index updated and change events
+    published explicitly.
+    """
+
+    def get_bulk_context(self, items):
+        """
+        Hook for subclasses to resolve lookups for the whole batch up front.
+        """
+        return self.get_serializer_context()
+
+    def get_bulk_items(self, request, item_type):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"error": "Expected a list of items."})
+        max_items = get_bulk_settings()['MAX_ITEMS']
+        if len(items) > max_items:
+            raise ValidationError({"error": f"A batch may contain at most {max_items} items."})
+        for index, item in enumerate(items):
+            if not isinstance(item, item_type):
+                raise ValidationError({"error": f"Item {index} has an invalid type."})
+        return items
+
+    def validate_bulk(self, items, instances=None):
+        """
+        Validate every item with a single serializer instance.
+        Returns `(validated_data, errors)`, both lists.
+        """
+        serializer = self.get_serializer(context=self.get_bulk_context(items))
+        serializer.partial = instances is not None
+        validated, errors = [], []
+        for index, item in enumerate(items):
+            if instances is not None:
+                serializer.instance = instances.get(item.get('id'))
+                if serializer.instance is None:
+                    errors.append({"index": index, "status": "error", "errors": {"id": ["Not found."]}})
+                    continue
+            try:
+                validated.append(serializer.run_validation(item))
+            except serializers.ValidationError as exc:
+                errors.append({"index": index, "status": "error", "errors": exc.detail})
+        return validated, errors
+
+    def bulk_error_response(self, errors, total):
+        return Response(
+            {"invalid": len(errors), "total": total, "results": errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def bulk_integrity_error(self, exc):
+        """
+        Map a constraint violation raised while writing (e.g. a concurrent
+        insert) to a validation error; the transaction has been rolled back.
+        """
+        unique_violation = getattr(self.get_serializer_class(), 'unique_violation', None)
+        if unique_violation is not None:
+            return unique_violation(exc)
+        return ValidationError({"error": "The batch conflicts with existing data; nothing was written."})
+
+    def bump_cache_versions(self):
+        for model in getattr(self, 'cache_models', ()):
+            bump_model_version(model)
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        items = self.get_bulk_items(request, dict)
+        validated, errors = self.validate_bulk(items)
+        if errors:
+            return self.bulk_error_response(errors, len(items))
+
+        model = self.queryset.model
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    [model(**attrs) for attrs in validated],
+                    batch_size=get_bulk_settings()['BATCH_SIZE'],
+                )
+        except IntegrityError as exc:
+            raise self.bulk_integrity_error(exc)
+        self.bump_cache_versions()
+        index_objects(created)
+        publish_changes(model, [obj.pk for obj in created])
+        return Response(
+            {
+                "created": len(created),
+                "results": [
+                    {"index": index, "status": "created", "id": obj.pk}
+                    for index, obj in enumerate(created)
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class BulkMixin(BulkCreateMixin):
+    """
+    Batch create, update and delete for list endpoints.
+
+    - `POST` with a JSON array creates every item (see `BulkCreateMixin`).
+    - `PATCH` with an array of objects carrying `id` updates them with `bulk_update`.
+    - `DELETE` with an array of ids deletes them.
+
+    Rows are updated or deleted only if every one of them passes the view's
+    object permissions (as on the detail endpoint); otherwise the request is
+    refused with 403 and nothing is written. Views must list the detail
+    view's object permissions in `permission_classes`.
+    """
+
+    def check_bulk_permissions(self, request, instances):
+        for obj in instances:
+            self.check_object_permissions(request, obj)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request, dict)
+        model = self.queryset.model
+        instances = model.objects.in_bulk([item.get('id') for item in items if isinstance(item.get('id'), int)])
+        self.check_bulk_permissions(request, instances.values())
+        validated, errors = self.validate_bulk(items, instances)
+        if errors:
+            return self.bulk_error_response(errors, len(items))
+
+        # bulk_update does not run auto_now, so stamp updated_at by hand.
+        now = timezone.now()
+        fields = {'updated_at'}
+        updated = []
+        for item, attrs in zip(items, validated):
+            obj = instances[item['id']]
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            obj.updated_at = now
+            fields.update(attrs)
+            updated.append(obj)
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_update(updated, sorted(fields), batch_size=get_bulk_settings()['BATCH_SIZE'])
+        except IntegrityError as exc:
+            raise self.bulk_integrity_error(exc)
+        self.bump_cache_versions()
+        index_objects(updated)
+        publish_changes(model, [obj.pk for obj in updated])
+        return Response({
+            "updated": len(updated),
+            "results": [
+                {"index": index, "status": "updated", "id": obj.pk}
+                for index, obj in enumerate(updated)
+            ],
+        })
+
+    def delete(self, request, *args, **kwargs):
+        ids = self.get_bulk_items(request, int)
+        model = self.queryset.model
+        with transaction.atomic():
+            instances = model.objects.in_bulk(ids)
+            self.check_bulk_permissions(request, instances.values())
+            existing = set(instances)
+            # Regular delete() so tombstones and cache invalidation still run.
+            model.objects.filter(pk__in=existing).delete()
+        return Response({
+            "deleted": len(existing),
+            "results": [
+                {"index": index, "status": "deleted" if pk in existing else "not_found", "id": pk}
+                for index, pk in enumerate(ids)
+            ],
+        })
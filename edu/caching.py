@@ -0,0 +1,156 @@
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+DEFAULT_RESPONSE_CACHE = {
+    'ALIAS': 'default',  # Any alias from settings.CACHES (local-memory, Redis, Memcached...)
+    'TIMEOUT': 300,      # Seconds a cached response may live
+    'KEY_PREFIX': 'edu:response',
+}
+
+
+def get_cache_settings():
+    """
+    Return the response cache settings, with defaults filled in.
+    """
+    return {**DEFAULT_RESPONSE_CACHE, **getattr(settings, 'EDU_RESPONSE_CACHE', {})}
+
+
+def get_response_cache():
+    """
+    Return the cache backend configured for API responses.
+    """
+    return caches[get_cache_settings()['ALIAS']]
+
+
+# Model Version Counters
+def _version_key(model):
+    return f"{get_cache_settings()['KEY_PREFIX']}:version:{model._meta.label_lower}"
+
+
+def get_model_version(model):
+    """
+    Return the current version counter for `model`.
+
+    A missing counter (first use or eviction) is seeded with the current time
+    in milliseconds so it never collides with a version used before.
+    """
+    cache = get_response_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_model_version(model):
+    """
+    Invalidate every cached response that depends on `model`.
+    """
+    cache = get_response_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing: seed it; a fresh seed differs from any previous value.
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+# Hit/Miss Metrics
+class CacheMetrics:
+    """
+    Thread-safe, in-process hit/miss counters keyed by view name.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counts[name]['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        """
+        Return a copy of the counters with a hit ratio for each view.
+        """
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self._counts.items()}
+        for counts in stats.values():
+            total = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = counts['hits'] / total if total else 0.0
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+response_cache_metrics = CacheMetrics()
+
+
+# Read-through Response Cache
+class CachedResponseMixin:
+    """
+    Read-through cache for `list` and `retrieve`.
+
+    Cache keys combine the request scheme and host (payloads hold absolute
+    URLs), path, sorted query parameters and the version counters of every
+    model in `cache_models`, so a write to any of those models makes all
+    dependent entries unreachable at once.
+    Authentication and permissions still run on every request.
+    """
+    cache_models = ()
+    cache_name = None  # Key and metrics name; defaults to the class name
+
+    def get_cache_name(self):
+        return self.cache_name or type(self).__name__
+
+    def get_cache_key(self, request):
+        versions = ','.join(str(get_model_version(model)) for model in self.cache_models)
+        query = '&'.join(
+            f"{name}={value}"
+            for name in sorted(request.query_params)
+            for value in request.query_params.getlist(name)
+        )
+        raw = f"{request.scheme}|{request.get_host()}|{request.path}|{query}|{versions}"
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f"{get_cache_settings()['KEY_PREFIX']}:{self.get_cache_name()}:{digest}"
+
+    def cached_response(self, request, render, check=None):
+        cache = get_response_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        name = self.get_cache_name()
+
+        if data is not None:
+            if check is not None:
+                check()
+            response_cache_metrics.record(name, hit=True)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response_cache_metrics.record(name, hit=False)
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data, get_cache_settings()['TIMEOUT'])
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+            # Cached detail responses still honour object-level permissions.
+            check=self.get_plain_object,
+        )
@@ -0,0 +1,138 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .caching import get_cache_settings, get_model_version, get_response_cache
+from .query_planning import build_query_plan, related_model
+
+
+# Conditional GET
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for `list` and `retrieve`.
+
+    List validators come from a single aggregate query over `updated_at`
+    (plus the `updated_at` of nested relations and the row/link counts),
+    without fetching or serializing the page. Detail validators use the
+    object's own `updated_at` and its already-prefetched relations. A
+    matching `If-None-Match` or `If-Modified-Since` returns 304 Not Modified.
+
+    Keyset-paginated requests are passed through untouched, since the
+    aggregate would have to count the whole table.
+    """
+
+    def get_validator_relations(self):
+        """
+        Return the nested relation lookups whose rows carry `updated_at`.
+        """
+        model = self.queryset.model
+        select_related, prefetch_related = build_query_plan(self.get_serializer(), model)
+        relations = []
+        for lookup in select_related + prefetch_related:
+            if '__' in lookup:
+                continue
+            target = related_model(model, lookup)
+            if target is not None and any(f.name == 'updated_at' for f in target._meta.fields):
+                relations.append(lookup)
+        return relations
+
+    def make_etag(self, state, versioned=True):
+        # Cache version counters catch link changes that leave no timestamp behind.
+        versions = []
+        if versioned:
+            versions = [get_model_version(model) for model in getattr(self, 'cache_models', ())]
+        raw = '|'.join([
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            repr(state),
+            repr(versions),
+        ])
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def get_list_state(self, queryset):
+        """
+        Aggregate `updated_at` maxima and row/link counts for `queryset`.
+
+        Views with a versioned response cache keep the result under the same
+        versioned key, so repeat polls cost no queries at all.
+        """
+        aggregates = {'updated_at': Max('updated_at'), 'count': Count('pk', distinct=True)}
+        for lookup in self.get_validator_relations():
+            aggregates[f"{lookup}_updated_at"] = Max(f"{lookup}__updated_at")
+            aggregates[f"{lookup}_count"] = Count(f"{lookup}__pk")
+
+        if not hasattr(self, 'get_cache_key'):
+            return queryset.order_by().aggregate(**aggregates)
+        cache = get_response_cache()
+        key = f"{self.get_cache_key(self.request)}:validator"
+        state = cache.get(key)
+        if state is None:
+            state = queryset.order_by().aggregate(**aggregates)
+            cache.set(key, state, get_cache_settings()['TIMEOUT'])
+        return state
+
+    def get_list_validator(self, queryset):
+        """
+        Return `(etag, last_modified)` for the rows in `queryset`, or
+        `(None, None)` when it is empty.
+        """
+        state = self.get_list_state(queryset)
+        if not state['count']:
+            return None, None
+
+        etag = self.make_etag(sorted(state.items()))
+        timestamps = [value for key, value in state.items() if key.endswith('updated_at') and value]
+        return etag, max(timestamps)
+
+    def get_object_validator(self, obj):
+        """
+        Return `(etag, last_modified)` for a single object, reading nested
+        relations from the instance (prefetched by the query plan).
+        """
+        state, timestamps = [obj.pk, obj.updated_at], [obj.updated_at]
+        for lookup in self.get_validator_relations():
+            value = getattr(obj, lookup)
+            related = list(value.all()) if hasattr(value, 'all') else [value] if value else []
+            state.append(sorted((item.pk, item.updated_at) for item in related))
+            timestamps.extend(item.updated_at for item in related)
+        return self.make_etag(state, versioned=False), max(timestamps)
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # Weak comparison: compressed responses carry the ETag as W/"...".
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return etag in tags or if_none_match.strip() == '*'
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return if_modified_since is not None and int(last_modified.timestamp()) <= if_modified_since
+
+    def conditional_response(self, request, etag, last_modified, render):
+        if etag is None:
+            return render()
+        if self.is_not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        else:
+            response = render()
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        render = lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        is_keyset_request = getattr(self.paginator, 'is_keyset_request', None)
+        if is_keyset_request is not None and is_keyset_request(request):
+            return render()
+        etag, last_modified = self.get_list_validator(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(request, etag, last_modified, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Permission checks run in get_object() before a 304 can be returned.
+        etag, last_modified = self.get_object_validator(self.get_object())
+        return self.conditional_response(
+            request, etag, last_modified,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
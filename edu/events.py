@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule
+
+
+DEFAULT_EVENT_SETTINGS = {
+    'HEARTBEAT': 15,    # Seconds between comments that keep idle connections (and proxies) open
+    'RETRY': 3000,      # Reconnection delay suggested to clients, in milliseconds
+    'QUEUE_SIZE': 100,  # Events held per subscriber; one that falls further behind gets a `reset`
+    'BACKLOG': 1000,    # Recent events replayed to clients reconnecting with Last-Event-ID
+}
+
+# Event type (as in the sync feed URLs) -> model
+EVENT_TYPES = {
+    'child-profiles': ChildProfile,
+    'resources': Resource,
+    'phonetics-modules': PhoneticsModule,
+    'math-modules': MathModule,
+    'stem-modules': STEMModule,
+}
+EVENT_MODELS = {model: event_type for event_type, model in EVENT_TYPES.items()}
+
+# Sent instead of the events a client missed: it should resync from the sync feed.
+RESET_MESSAGE = b"event: reset\ndata: {}\n\n"
+HEARTBEAT_MESSAGE = b": keep-alive\n\n"
+
+
+def get_event_settings():
+    """
+    Return the change event settings, with defaults filled in.
+    """
+    return {**DEFAULT_EVENT_SETTINGS, **getattr(settings, 'EDU_EVENTS', {})}
+
+
+class ChangeEvent:
+    """
+    One change, encoded once as an SSE message for every subscriber.
+    """
+    __slots__ = ('sequence', 'type', 'message')
+
+    def __init__(self, epoch, sequence, event_type, data):
+        self.sequence = sequence
+        self.type = event_type
+        self.message = f"id: {epoch}-{sequence}\nevent: change\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class Subscription:
+    """
+    A client's queue of events of the types it asked for. Lives on one event
+    loop and is only touched from it.
+    """
+    def __init__(self, types, size, last_sequence):
+        self.types = types
+        self.queue = asyncio.Queue(size)
+        self.last_sequence = last_sequence  # Later events only; earlier ones are replayed
+
+    def offer(self, event):
+        if event.type not in self.types or event.sequence <= self.last_sequence:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind: drop the queue and have the client resync.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def next_messages(self, timeout):
+        """
+        Wait up to `timeout` seconds for events and return every queued
+        message as one chunk, or None if nothing arrived.
+        """
+        events = []
+        if self.queue.empty():
+            try:
+                events.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                return None
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return b''.join(RESET_MESSAGE if event is None else event.message for event in events)
+
+
+class ChangeBroker:
+    """
+    In-process fan-out of change events to SSE subscribers.
+
+    Publishing (from any thread) appends the events to a short backlog and
+    schedules one delivery per event loop with subscribers, which then puts
+    them on each matching subscriber's queue; messages are encoded once per
+    event. Event ids carry a per-process epoch, so clients reconnecting after
+    a restart (or to another process) are told to resync. Only changes made
+    in this process are seen.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # event loop -> set of subscriptions read on it
+        self._backlog = deque(maxlen=get_event_settings()['BACKLOG'])
+        self._epoch = uuid.uuid4().hex[:8]
+        self._sequence = 0
+
+    def parse_event_id(self, value):
+        """
+        Return the sequence number of an event id from this process, or None.
+        """
+        epoch, _, number = (value or '').partition('-')
+        return int(number) if epoch == self._epoch and number.isdigit() else None
+
+    def subscribe(self, types, last_event_id=None):
+        """
+        Subscribe the running event loop to events of `types`. Return
+        `(subscription, missed)`: `missed` holds the messages published
+        after `last_event_id`, or is None if they are no longer all known.
+        """
+        options = get_event_settings()
+        loop = asyncio.get_running_loop()
+        last = self.parse_event_id(last_event_id)
+        with self._lock:
+            subscription = Subscription(types, options['QUEUE_SIZE'], self._sequence)
+            self._subscribers.setdefault(loop, set()).add(subscription)
+            if last_event_id is None:
+                return subscription, []
+            missing = last is not None and last < self._sequence and (
+                not self._backlog or self._backlog[0].sequence > last + 1
+            )
+            if last is None or last > self._sequence or missing:
+                return subscription, None
+            return subscription, [
+                event.message for event in self._backlog if event.sequence > last and event.type in types
+            ]
+
+    def unsubscribe(self, subscription):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            subscriptions = self._subscribers.get(loop, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscribers.pop(loop, None)
+
+    def publish(self, event_type, pks, action):
+        """
+        Send a `change` event for each primary key to the subscribers of `event_type`.
+        """
+        with self._lock:
+            events = []
+            for pk in pks:
+                self._sequence += 1
+                data = {'type': event_type, 'id': pk, 'action': action}
+                events.append(ChangeEvent(self._epoch, self._sequence, event_type, data))
+            self._backlog.extend(events)
+            loops = list(self._subscribers)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, events)
+            except RuntimeError:
+                # The loop has closed, and its connections with it.
+                with self._lock:
+                    self._subscribers.pop(loop, None)
+
+    def _deliver(self, loop, events):
+        # Runs on `loop`, the only thread that changes its subscription set.
+        for subscription in self._subscribers.get(loop, ()):
+            for event in events:
+                subscription.offer(event)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+
+change_broker = ChangeBroker()
+
+
+def publish_changes(model, pks, action='saved'):
+    """
+    Publish changes to rows of `model` once the current transaction commits
+    (straight away outside a transaction). Models without an event type are ignored.
+    """
+    event_type = EVENT_MODELS.get(model)
+    pks = list(pks)
+    if event_type is not None and pks:
+        transaction.on_commit(lambda: change_broker.publish(event_type, pks, action))
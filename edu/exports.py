@@ -0,0 +1,77 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import UserProfile, ChildProfile
+
+
+# Export datasets: model, exported columns and the field linking a row to its owner
+EXPORT_DATASETS = {
+    'child-profiles': {
+        'model': ChildProfile,
+        'columns': ['id', 'user_id', 'user__username', 'name', 'age', 'created_at', 'updated_at'],
+        'owner_field': 'user',
+    },
+    'user-profiles': {
+        'model': UserProfile,
+        'columns': ['id', 'username', 'email', 'role', 'created_at', 'updated_at'],
+        'owner_field': None,
+    },
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer output
+    can be yielded line by line instead of buffered.
+    """
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_rows(queryset, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield value tuples for `columns`, streaming from a server-side cursor
+    (where the database supports one) in chunks of `chunk_size`.
+    """
+    return queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(rows, columns):
+    """
+    Yield a CSV header followed by one encoded line per row.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def iter_ndjson(rows, columns):
+    """
+    Yield one JSON object per line for each row.
+    """
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_export(queryset, columns, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream `queryset` as CSV or NDJSON text chunks with constant memory.
+    """
+    rows = iter_rows(queryset, columns, chunk_size)
+    if file_format == 'csv':
+        return iter_csv(rows, columns)
+    return iter_ndjson(rows, columns)
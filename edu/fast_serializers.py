@@ -0,0 +1,154 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class FieldPlan:
+    """
+    A serializer's readable fields compiled, in output order, to
+    `(name, column, convert)` steps; nested many-to-many serializers become
+    child plans (`column` is None for those).
+
+    `serialize()` turns `.values()` rows into the same dicts the serializer
+    would build from model instances: each step calls the bound DRF field's
+    own `to_representation`, so formatting (datetimes, file URLs, choices)
+    is unchanged, but no model instances, `get_attribute()` lookups or
+    per-object serializer bookkeeping are involved.
+    """
+    def __init__(self, model, steps, nested):
+        self.model = model
+        self.steps = steps    # [(name, column, convert)]
+        self.nested = nested  # {name: (query_name, child_plan)}
+
+    @property
+    def columns(self):
+        columns = [column for _, column, _ in self.steps if column is not None]
+        return columns if 'id' in columns else ['id', *columns]
+
+    def to_representation(self, row, nested_values=None):
+        data = {}
+        for name, column, convert in self.steps:
+            if column is None:
+                data[name] = nested_values[name].get(row['id'], [])
+            else:
+                value = row[column]
+                data[name] = None if value is None else convert(value)
+        return data
+
+    def serialize(self, rows):
+        """
+        Serialize a page of `.values(*self.columns)` rows. Each nested
+        relation costs one query for the whole page.
+        """
+        rows = list(rows)
+        ids = [row['id'] for row in rows]
+        nested_values = {}
+        for name, (query_name, child_plan) in self.nested.items():
+            related = child_plan.model._default_manager.filter(**{f"{query_name}__in": ids})
+            by_parent, by_id = {}, {}
+            for child in related.values(query_name, *child_plan.columns):
+                # A child linked to several rows on the page is serialized once.
+                data = by_id.get(child['id'])
+                if data is None:
+                    data = by_id[child['id']] = child_plan.to_representation(child)
+                by_parent.setdefault(child[query_name], []).append(data)
+            nested_values[name] = by_parent
+        return [self.to_representation(row, nested_values) for row in rows]
+
+
+def _datetime_converter(field):
+    """
+    `DateTimeField.to_representation` with the output format and timezone
+    resolved once per plan instead of once per value.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or field_timezone is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _column_converter(model_field, field):
+    """
+    Return a function mapping a raw column value to the field's output.
+    File columns come back as names and are wrapped like the model does.
+    """
+    if isinstance(model_field, models.FileField):
+        def convert(value):
+            return field.to_representation(model_field.attr_class(None, model_field, value))
+        return convert
+    if type(field) is serializers.DateTimeField:
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+def compile_plan(serializer, nested=True):
+    """
+    Compile a bound `ModelSerializer` into a `FieldPlan`, or return None if
+    it has fields the fast path cannot reproduce (method fields, related
+    fields, dotted sources, nested serializers that are not many-to-many).
+    """
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return None
+    model = serializer.Meta.model
+    steps, nested_plans = [], {}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = field.source
+        if source == '*' or '.' in source:
+            return None
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+
+        if isinstance(field, serializers.ListSerializer):
+            if not nested or not model_field.many_to_many or model_field.auto_created:
+                return None
+            child_plan = compile_plan(field.child, nested=False)
+            if child_plan is None:
+                return None
+            nested_plans[name] = (model_field.related_query_name(), child_plan)
+            steps.append((name, None, None))
+        elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField,
+                                serializers.SerializerMethodField)):
+            return None
+        elif model_field.is_relation:
+            return None
+        else:
+            steps.append((name, model_field.attname, _column_converter(model_field, field)))
+
+    return FieldPlan(model, steps, nested_plans)
+
+
+class FastListMixin:
+    """
+    Serve `list` from `.values()` rows through a compiled `FieldPlan`.
+
+    Opt in per view by adding the mixin. Output (including pagination) is
+    identical to the regular serializer path; serializers the plan cannot
+    reproduce fall back to it automatically.
+    """
+    def list(self, request, *args, **kwargs):
+        plan = compile_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # Keyset cursors are built from the ordering columns, even when
+        # `fields=` leaves them out of the output.
+        ordering = getattr(getattr(self.paginator, 'keyset_class', None), 'ordering', ())
+        columns = plan.columns + [column for column in ordering if column not in plan.columns]
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
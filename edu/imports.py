@@ -0,0 +1,212 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .caching import bump_model_version
+from .events import publish_changes
+from .models import Resource, PhoneticsModule, MathModule, STEMModule
+from .search import index_objects
+from .serializers import ResourceSerializer
+
+
+# Input columns linking a resource to modules, and the module model for each
+LINK_COLUMNS = {
+    'phonetics_modules': PhoneticsModule,
+    'math_modules': MathModule,
+    'stem_modules': STEMModule,
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_csv_rows(stream):
+    """
+    Yield `(line_number, row)` from a CSV file with a header row.
+    Link columns hold module ids separated by `;`.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        for column in LINK_COLUMNS:
+            value = row.get(column) or ''
+            row[column] = [part.strip() for part in value.split(';') if part.strip()]
+        yield reader.line_num, row
+
+
+def iter_jsonl_rows(stream):
+    """
+    Yield `(line_number, row)` from a file with one JSON object per line.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, {'__error__': f"Invalid JSON: {exc}"}
+            continue
+        yield line_number, row if isinstance(row, dict) else {'__error__': "Expected a JSON object."}
+
+
+class ImportReport:
+    """
+    Running totals for an import, with throughput.
+    """
+    def __init__(self):
+        self.started = time.monotonic()
+        self.processed = self.created = self.updated = self.links = 0
+        self.rejected = []  # (line_number, errors)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.processed} rows in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s): "
+            f"{self.created} created, {self.updated} updated, {self.links} module links added, "
+            f"{len(self.rejected)} rejected"
+        )
+
+
+class ResourceImporter:
+    """
+    Upsert resources and their module links from a stream of rows.
+
+    Rows are validated with `ResourceSerializer` (so `validate_content_url`
+    and the model field rules apply), matched to existing resources by
+    `content_url`, and written per batch with `bulk_create`/`bulk_update`.
+    Module links are inserted straight into the M2M through tables.
+    Each batch is its own transaction; rejected rows never stop the import.
+    """
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.serializer = ResourceSerializer()
+        self.report = ImportReport()
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        for model in (Resource, *LINK_COLUMNS.values()):
+            bump_model_version(model)  # bulk writes skip the invalidation signals
+        return self.report
+
+    def validate_batch(self, batch):
+        """
+        Return `[(line_number, validated_data, links)]` for the valid rows.
+        """
+        known_modules = self.resolve_modules(batch)
+        valid = []
+        for line_number, row in batch:
+            self.report.processed += 1
+            if '__error__' in row:
+                self.report.rejected.append((line_number, row['__error__']))
+                continue
+            try:
+                attrs = self.serializer.run_validation(
+                    {field: row.get(field) for field in ('title', 'description', 'content_url')}
+                )
+                links = self.validate_links(row, known_modules)
+            except serializers.ValidationError as exc:
+                self.report.rejected.append((line_number, exc.detail))
+                continue
+            valid.append((line_number, attrs, links))
+        return valid
+
+    def resolve_modules(self, batch):
+        """
+        Fetch the ids of every module referenced in the batch, one query per module type.
+        """
+        known = {}
+        for column, model in LINK_COLUMNS.items():
+            ids = {
+                int(value) for _, row in batch
+                for value in (row.get(column) or []) if str(value).isdigit()
+            }
+            known[column] = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+        return known
+
+    def validate_links(self, row, known_modules):
+        links, errors = {}, {}
+        for column in LINK_COLUMNS:
+            values = row.get(column) or []
+            if not isinstance(values, list):
+                errors[column] = "Expected a list of module ids."
+                continue
+            ids = [int(value) for value in values if str(value).isdigit()]
+            missing = [value for value in values if not str(value).isdigit() or int(value) not in known_modules[column]]
+            if missing:
+                errors[column] = f"Unknown module ids: {', '.join(map(str, missing))}."
+            links[column] = ids
+        if errors:
+            raise serializers.ValidationError(errors)
+        return links
+
+    def import_batch(self, batch):
+        valid = self.validate_batch(batch)
+        if not valid:
+            return
+
+        urls = {attrs['content_url'] for _, attrs, _ in valid}
+        existing = {}
+        for resource in Resource.objects.filter(content_url__in=urls).order_by('pk'):
+            existing.setdefault(resource.content_url, resource)
+
+        now = timezone.now()
+        to_create, to_update, resources = [], {}, []
+        for _, attrs, _ in valid:
+            resource = existing.get(attrs['content_url'])
+            if resource is None:
+                resource = Resource(**attrs)
+                existing[attrs['content_url']] = resource
+                to_create.append(resource)
+            else:
+                for name, value in attrs.items():
+                    setattr(resource, name, value)
+                if resource.pk is not None:
+                    resource.updated_at = now  # bulk_update does not run auto_now
+                    to_update[resource.pk] = resource
+            resources.append(resource)
+
+        with transaction.atomic():
+            Resource.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                Resource.objects.bulk_update(
+                    list(to_update.values()), ['title', 'description', 'updated_at'], batch_size=self.batch_size
+                )
+            for column, model in LINK_COLUMNS.items():
+                through = model.resources.through
+                module_field = f"{model._meta.model_name}_id"
+                rows = {
+                    (module_id, resource.pk)
+                    for resource, (_, _, links) in zip(resources, valid)
+                    for module_id in links[column]
+                }
+                linked = set(through.objects.filter(
+                    resource_id__in={resource_id for _, resource_id in rows},
+                    **{f"{module_field}__in": {module_id for module_id, _ in rows}},
+                ).values_list(module_field, 'resource_id')) if rows else set()
+                through.objects.bulk_create(
+                    [through(**{module_field: module_id, 'resource_id': resource_id}) for module_id, resource_id in rows - linked],
+                    batch_size=self.batch_size,
+                    ignore_conflicts=True,  # Links added by a concurrent import meanwhile
+                )
+                self.report.links += len(rows - linked)
+                publish_changes(model, {module_id for module_id, _ in rows})
+            index_objects(to_create + list(to_update.values()))
+            publish_changes(Resource, [resource.pk for resource in to_create + list(to_update.values())])
+
+        self.report.created += len(to_create)
+        self.report.updated += len(to_update)
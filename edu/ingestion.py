@@ -0,0 +1,183 @@
+import atexit
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import ChildProfile, ProgressEvent
+from .progress import record_completions
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INGEST_SETTINGS = {
+    'MAX_ITEMS': 5000,         # Largest batch accepted in a single request
+    'MAX_BUFFERED': 50000,     # Events held in memory before requests are refused
+    'BATCH_SIZE': 1000,        # Rows per INSERT statement
+    'FLUSH_INTERVAL': 1.0,     # Seconds between background flushes; None disables the flusher
+}
+
+# ModuleCompletion.module_type for each ProgressEvent module type code
+COMPLETION_MODULE_TYPES = dict(ProgressEvent.MODULE_TYPE_CHOICES)
+
+
+def get_ingest_settings():
+    """
+    Return the event ingestion settings, with defaults filled in.
+    """
+    return {**DEFAULT_INGEST_SETTINGS, **getattr(settings, 'EDU_INGEST', {})}
+
+
+class EventBuffer:
+    """
+    In-process buffer of validated progress events, drained with `bulk_create`.
+
+    `offer()` accepts a whole batch or none of it: when the buffer would grow
+    past `MAX_BUFFERED` it returns False and the caller should ask the client
+    to retry later. A daemon thread flushes every `FLUSH_INTERVAL` seconds, or
+    as soon as a full `BATCH_SIZE` is waiting. The thread is started on first
+    use (so it is recreated in forked workers) and remaining events are
+    flushed at interpreter exit.
+
+    Events still in memory are lost if the process is killed; the buffer
+    trades that for not holding a request open while rows are written.
+    """
+    def __init__(self):
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self.accepted = self.refused = self.written = self.failed = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def offer(self, events):
+        """
+        Queue a list of `ProgressEvent` instances. Returns False, queueing
+        nothing, if the buffer has no room for all of them.
+        """
+        options = get_ingest_settings()
+        with self._lock:
+            if len(self._events) + len(events) > options['MAX_BUFFERED']:
+                self.refused += len(events)
+                return False
+            self._events.extend(events)
+            self.accepted += len(events)
+            if len(self._events) >= options['BATCH_SIZE']:
+                self._wakeup.notify()
+        if options['FLUSH_INTERVAL'] is not None:
+            self._ensure_flusher()
+        return True
+
+    def flush(self):
+        """
+        Write every buffered event. Returns the number of rows written.
+        `module_completed` events are also recorded as completions, which
+        keeps the progress rollups current. Events whose child was deleted
+        after validation are dropped before the insert; if a batch still
+        fails, its events are written one by one so only the rows that
+        cannot be written are logged and dropped, rather than retried forever.
+        """
+        batch_size = get_ingest_settings()['BATCH_SIZE']
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._events.popleft() for _ in range(min(batch_size, len(self._events)))]
+                if not batch:
+                    break
+                batch = self._drop_orphans(batch)
+                try:
+                    self._write(batch, batch_size)
+                    count = len(batch)
+                except Exception:
+                    logger.warning("Writing %d progress events one by one after the batch failed.", len(batch), exc_info=True)
+                    count = self._write_each(batch)
+                written += count
+                self.written += count
+        return written
+
+    def _drop_orphans(self, batch):
+        child_ids = set(ChildProfile.objects.filter(
+            pk__in={event.child_id for event in batch}
+        ).values_list('pk', flat=True))
+        kept = [event for event in batch if event.child_id in child_ids]
+        if len(kept) < len(batch):
+            logger.warning("Dropped %d progress events of deleted children.", len(batch) - len(kept))
+            self.failed += len(batch) - len(kept)
+        return kept
+
+    def _write(self, batch, batch_size):
+        with transaction.atomic():
+            ProgressEvent.objects.bulk_create(batch, batch_size=batch_size)
+            record_completions(
+                (event.child_id, COMPLETION_MODULE_TYPES[event.module_type], event.module_id, event.occurred_at)
+                for event in batch if event.event_type == ProgressEvent.MODULE_COMPLETED
+            )
+
+    def _write_each(self, batch):
+        count = 0
+        for event in batch:
+            event.pk = None  # May have been set by the failed insert
+            try:
+                self._write([event], 1)
+            except Exception:
+                logger.exception("Dropped a progress event that could not be written.")
+                self.failed += 1
+            else:
+                count += 1
+        return count
+
+    def stats(self):
+        return {
+            'buffered': len(self._events),
+            'accepted': self.accepted,
+            'refused': self.refused,
+            'written': self.written,
+            'failed': self.failed,
+        }
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='edu-event-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                interval = get_ingest_settings()['FLUSH_INTERVAL'] or 1.0
+                with self._lock:
+                    if not self._stopping and len(self._events) < get_ingest_settings()['BATCH_SIZE']:
+                        self._wakeup.wait(timeout=interval)
+                    stopping = self._stopping
+                close_old_connections()
+                self.flush()
+                if stopping:
+                    break
+        finally:
+            connection.close()
+
+    def stop(self):
+        """
+        Stop the background flusher after a final flush.
+        """
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join()
+        else:
+            self.flush()
+
+
+event_buffer = EventBuffer()
+atexit.register(event_buffer.stop)
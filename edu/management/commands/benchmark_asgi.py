@@ -0,0 +1,189 @@
+import asyncio
+import importlib
+import io
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import clear_url_caches
+from rest_framework.authtoken.models import Token
+
+import edu.urls
+from edu.models import Resource, PhoneticsModule, MathModule, STEMModule
+from edu.throttling import BaseCounterStore
+
+
+class UncountedStore(BaseCounterStore):
+    """
+    Counter store that never counts, so the benchmark is not throttled.
+    """
+    def incr(self, key, timeout):
+        return 0
+
+    def get(self, key):
+        return 0
+
+
+def use_async_views(enabled):
+    """
+    Rebuild the API URLs with EDU_ASYNC_VIEWS set to `enabled`.
+    """
+    with override_settings(EDU_ASYNC_VIEWS=enabled):
+        importlib.reload(edu.urls)
+    clear_url_caches()
+
+
+def summarize(label, elapsed, results):
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(status != 200 for _, status in results)
+    return (
+        f"{label:<28}{len(results) / elapsed:>10.0f}{statistics.median(latencies) * 1000:>10.1f}"
+        f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}{errors:>8}"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare list/detail throughput under WSGI (a thread per request) and ASGI, with the "
+        "sync and the async views. Requests go through the full Django stack in-process; "
+        "--client-delay keeps each connection open as a slow client would. Sample rows and "
+        "a token-authenticated staff user are created for the run and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/resources/', help="Endpoint to request.")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Concurrent ASGI clients.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads.")
+        parser.add_argument('--client-delay', type=float, default=0, help="Milliseconds each client takes to read a response.")
+        parser.add_argument('--items', type=int, default=100, help="Sample rows per model.")
+        parser.add_argument('--cached', action='store_true', help="Repeat one URL, so the response cache answers.")
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['ENGINE'].endswith('sqlite3') and ':memory:' in str(settings.DATABASES['default']['NAME']):
+            raise CommandError("The benchmark needs a database that worker threads can share.")
+        marker = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f"benchmark-{marker}", is_staff=True)
+        token = Token.objects.create(user=user)
+        self.create_sample_data(marker, options['items'])
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        headers = {'Host': host, 'Authorization': f"Token {token.key}", 'Accept': 'application/json'}
+        separator = '&' if '?' in options['path'] else '?'
+        # Distinct query strings defeat the response cache unless --cached.
+        paths = [
+            options['path'] if options['cached'] else f"{options['path']}{separator}benchmark={i}"
+            for i in range(options['requests'])
+        ]
+        delay = options['client_delay'] / 1000
+
+        throttle = {**getattr(settings, 'EDU_THROTTLE', {}), 'STORE': f"{__name__}.UncountedStore"}
+        try:
+            with override_settings(EDU_THROTTLE=throttle):
+                self.stdout.write(f"{'mode':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+                use_async_views(False)
+                self.stdout.write(self.run_wsgi(paths, headers, options['threads'], delay))
+                self.stdout.write(asyncio.run(self.run_asgi("ASGI, sync views", paths, headers, options['concurrency'], delay)))
+                use_async_views(True)
+                self.stdout.write(asyncio.run(self.run_asgi("ASGI, async views", paths, headers, options['concurrency'], delay)))
+        finally:
+            use_async_views(settings.EDU_ASYNC_VIEWS)
+            self.delete_sample_data(marker)
+            user.delete()
+
+    def run_wsgi(self, paths, headers, threads, delay):
+        handler = get_wsgi_application()
+        environ_headers = {f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers.items()}
+
+        def request(path):
+            url_path, _, query = path.partition('?')
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': url_path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': headers['Host'], 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+                **environ_headers,
+            }
+            statuses = []
+            started = time.perf_counter()
+            response = handler(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+            try:
+                b''.join(response)
+                time.sleep(delay)  # The worker thread is held while the client reads.
+            finally:
+                response.close()
+            return time.perf_counter() - started, int(statuses[0][:3])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(request, paths))
+        return summarize(f"WSGI, {threads} threads", time.perf_counter() - started, results)
+
+    async def run_asgi(self, label, paths, headers, concurrency, delay):
+        handler = get_asgi_application()
+        raw_headers = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        pending = iter(paths)
+
+        async def request(path):
+            url_path, _, query = path.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': url_path, 'raw_path': url_path.encode(), 'root_path': '',
+                'query_string': query.encode(), 'headers': raw_headers,
+                'client': ('127.0.0.1', 0), 'server': (headers['Host'], 80),
+            }
+            done = asyncio.Event()
+            statuses = []
+            body_sent = False
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif not message.get('more_body'):
+                    await asyncio.sleep(delay)  # Only this coroutine waits on the client.
+                    done.set()
+
+            started = time.perf_counter()
+            await handler(scope, receive, send)
+            return time.perf_counter() - started, statuses[0]
+
+        async def client():
+            return [await request(path) for path in pending]
+
+        started = time.perf_counter()
+        results = [result for group in await asyncio.gather(*(client() for _ in range(concurrency))) for result in group]
+        return summarize(f"{label}, {concurrency} clients", time.perf_counter() - started, results)
+
+    def create_sample_data(self, marker, items):
+        resources = Resource.objects.bulk_create([
+            Resource(title=f"Benchmark {marker} {i}", description="Benchmark row " * 10, content_url=f"https://example.com/{i}")
+            for i in range(items)
+        ])
+        for model in (PhoneticsModule, MathModule, STEMModule):
+            modules = model.objects.bulk_create([
+                model(title=f"Benchmark {marker} {i}", description="Benchmark row " * 10, min_age=3, max_age=6)
+                for i in range(items)
+            ])
+            through = model.resources.through
+            module_field = f"{model._meta.model_name}_id"
+            through.objects.bulk_create([
+                through(**{module_field: module.pk, 'resource_id': resources[i].pk})
+                for i, module in enumerate(modules)
+            ])
+
+    def delete_sample_data(self, marker):
+        for model in (PhoneticsModule, MathModule, STEMModule, Resource):
+            model.objects.filter(title__startswith=f"Benchmark {marker} ").delete()
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from edu.fast_serializers import compile_plan
+from edu.models import Resource, PhoneticsModule, MathModule, STEMModule
+from edu.query_planning import optimize_queryset
+from edu.serializers import (
+    ResourceSerializer, PhoneticsModuleSerializer, MathModuleSerializer, STEMModuleSerializer,
+)
+
+
+BENCHMARKS = {
+    'resources': (Resource, ResourceSerializer),
+    'phonetics-modules': (PhoneticsModule, PhoneticsModuleSerializer),
+    'math-modules': (MathModule, MathModuleSerializer),
+    'stem-modules': (STEMModule, STEMModuleSerializer),
+}
+
+
+def render_regular(model, serializer_class, context, page_size):
+    queryset = optimize_queryset(model.objects.order_by('created_at', 'id'), serializer_class(context=context))
+    return JSONRenderer().render(serializer_class(queryset[:page_size], many=True, context=context).data)
+
+
+def render_fast(model, serializer_class, context, page_size):
+    plan = compile_plan(serializer_class(context=context))
+    rows = model.objects.order_by('created_at', 'id').values(*plan.columns)[:page_size]
+    return JSONRenderer().render(plan.serialize(rows))
+
+
+def best_time(render, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the regular and fast read-only serializer paths on list pages. "
+        "Sample rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100, help="Rows per page.")
+        parser.add_argument('--resources-per-module', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per path; the best is reported.")
+
+    def handle(self, *args, **options):
+        items, repeat = options['items'], options['repeat']
+        # File fields render absolute URLs, so the request needs an allowed host.
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        context = {'request': Request(RequestFactory().get('/api/v1/', HTTP_HOST=host))}
+
+        with transaction.atomic():
+            self.create_sample_data(items, options['resources_per_module'])
+            self.stdout.write(f"{'endpoint':<20}{'regular ms':>12}{'fast ms':>10}{'speedup':>10}")
+            for name, (model, serializer_class) in BENCHMARKS.items():
+                regular, expected = best_time(lambda: render_regular(model, serializer_class, context, items), repeat)
+                fast, body = best_time(lambda: render_fast(model, serializer_class, context, items), repeat)
+                if body != expected:
+                    raise CommandError(f"{name}: fast path output differs from the serializer output.")
+                self.stdout.write(f"{name:<20}{regular * 1000:>12.2f}{fast * 1000:>10.2f}{regular / fast:>9.1f}x")
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Outputs are byte-identical."))
+
+    def create_sample_data(self, items, resources_per_module):
+        resources = Resource.objects.bulk_create([
+            Resource(title=f"Resource {i}", description="Benchmark row " * 10, content_url=f"https://example.com/{i}")
+            for i in range(items)
+        ])
+        for model, extra in (
+            (PhoneticsModule, {'audio_file': 'phonetics_audio/sample.mp3'}),
+            (MathModule, {'difficulty_level': 'Medium'}),
+            (STEMModule, {'video_url': 'https://example.com/video'}),
+        ):
+            modules = model.objects.bulk_create([
+                model(title=f"Module {i}", description="Benchmark row " * 10, min_age=3, max_age=6, **extra)
+                for i in range(items)
+            ])
+            through = model.resources.through
+            module_field = f"{model._meta.model_name}_id"
+            through.objects.bulk_create([
+                through(**{module_field: module.pk, 'resource_id': resources[(i + j) % items].pk})
+                for i, module in enumerate(modules)
+                for j in range(resources_per_module)
+            ])
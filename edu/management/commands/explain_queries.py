@@ -0,0 +1,166 @@
+import re
+from datetime import timedelta
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models
+from django.test import RequestFactory
+from django.utils import timezone
+
+from edu import urls
+from edu.async_views import ChangeStreamView
+from edu.pagination import KeysetPagination
+from edu.exports import EXPORT_DATASETS
+from edu.models import Recommendation
+from edu.views import (
+    SYNC_FEEDS, CacheStatsView, CatalogView, ChildRecommendationsView, ExportView, ProgressEventIngestView, SearchView, SyncFeedView,
+)
+
+
+# Plan lines that mean "read the whole table" (or sort it) per database vendor
+FULL_SCAN_PATTERNS = {
+    'sqlite': [
+        re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b.*\bINDEX\b)'),
+        re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY)'),
+    ],
+    'postgresql': [
+        re.compile(r'Seq Scan on (\w+)'),
+    ],
+}
+
+# Queries that read every row by design (full exports)
+EXPECTED_FULL_SCANS = ('export[',)
+
+
+def find_full_scans(plan, vendor):
+    """
+    Return the plan lines that indicate a full table scan or sort.
+    """
+    patterns = FULL_SCAN_PATTERNS.get(vendor, [])
+    return [
+        line.strip() for line in plan.splitlines()
+        if any(pattern.search(line) for pattern in patterns)
+    ]
+
+
+def build_view(view_class, path, **kwargs):
+    """
+    Instantiate a DRF view with a synthetic GET request, ready for get_queryset().
+    """
+    view = view_class()
+    view.request = view.initialize_request(RequestFactory().get(path))
+    view.format_kwarg = None
+    view.args, view.kwargs = (), kwargs
+    return view
+
+
+def endpoint_queries():
+    """
+    Yield `(label, queryset)` for the main query of every registered endpoint.
+    """
+    now = timezone.now()
+    page_size = KeysetPagination.page_size
+    for pattern in urls.urlpatterns:
+        view_class = pattern.callback.cls
+        if view_class is SyncFeedView:
+            for resource_type in SYNC_FEEDS:
+                view = build_view(view_class, '/', resource_type=resource_type)
+                view.watermark, view.updated_since = now, now - timedelta(days=1)
+                yield f"{pattern.name}[{resource_type}]", view.get_queryset().order_by('updated_at', 'id')[:page_size]
+        elif view_class is SearchView:
+            continue  # Served from the search backend, not the ORM
+        elif view_class is CacheStatsView:
+            continue  # In-process counters only
+        elif view_class is ProgressEventIngestView:
+            continue  # Write-only; inserts are batched by the event buffer
+        elif view_class is ChangeStreamView:
+            continue  # Pushed from the in-process broker, no queries
+        elif view_class is CatalogView:
+            view = build_view(view_class, '/')
+            for section in view.get_sections():
+                yield f"{pattern.name}[{section}]", view.get_module_queryset(section)
+        elif view_class is ChildRecommendationsView:
+            yield pattern.name, Recommendation.objects.filter(age_band=0).order_by('rank')[:20]
+        elif view_class is ExportView:
+            for dataset, export in EXPORT_DATASETS.items():
+                queryset = export['model'].objects.order_by('pk').values_list(*export['columns'])
+                yield f"{pattern.name}[{dataset}]", queryset
+        elif 'pk' in pattern.pattern.converters:
+            yield pattern.name, build_view(view_class, '/', pk=1).get_queryset().filter(pk=1)
+        else:
+            queryset = build_view(view_class, '/').get_queryset()
+            ordering = KeysetPagination.ordering
+            yield f"{pattern.name} (page)", queryset.order_by(*ordering)[page_size:page_size * 2]
+            yield f"{pattern.name} (keyset)", queryset.order_by(*ordering).filter(created_at__gt=now)[:page_size]
+
+
+def sample_filter(model, name):
+    """
+    Return a filter on `name` shaped like the one the admin sidebar applies.
+    """
+    field = model._meta.get_field(name)
+    if isinstance(field, models.DateTimeField):
+        return {f"{name}__gte": timezone.now() - timedelta(days=7)}
+    if field.choices:
+        return {name: field.choices[0][0]}
+    if isinstance(field, models.IntegerField):
+        return {name: 1}
+    return {name: ''}
+
+
+def admin_queries():
+    """
+    Yield `(label, queryset)` for each admin changelist and list_filter option.
+    """
+    for model, model_admin in admin.site._registry.items():
+        if model._meta.app_label != 'edu':
+            continue
+        # The changelist appends -pk to make the ordering deterministic.
+        ordering = list(model_admin.ordering or ()) + ['-pk']
+        queryset = model._default_manager.order_by(*ordering)
+        label = f"admin:{model._meta.model_name}"
+        yield label, queryset[:100]
+        for name in model_admin.list_filter:
+            yield f"{label}?{name}", queryset.filter(**sample_filter(model, name))[:100]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN for every API endpoint and admin changelist query and flag full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help="Exit with an error if any query plan contains a full table scan.",
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help="Print the full query plan for every query.",
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            self.stderr.write(self.style.WARNING(f"Full scan detection is not supported on '{vendor}'; plans are printed only."))
+
+        flagged = []
+        for label, queryset in list(endpoint_queries()) + list(admin_queries()):
+            plan = queryset.explain()
+            scans = find_full_scans(plan, vendor)
+            if scans and label.startswith(EXPECTED_FULL_SCANS):
+                self.stdout.write(self.style.SUCCESS(f"ok (full)  {label}"))
+            elif scans:
+                flagged.append(label)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}"))
+                for line in scans:
+                    self.stdout.write(f"    {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok         {label}"))
+            if options['verbose_plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    | {line}")
+
+        self.stdout.write(f"\n{len(flagged)} quer{'y' if len(flagged) == 1 else 'ies'} with full scans.")
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f"Full table scans in: {', '.join(flagged)}")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from edu.exports import DEFAULT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream a full export of child or user profiles as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORT_DATASETS))
+        parser.add_argument('--format', dest='file_format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write to (defaults to stdout).")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+        dataset = EXPORT_DATASETS[options['dataset']]
+        chunks = iter_export(
+            dataset['model'].objects.all(), dataset['columns'], options['file_format'], options['chunk_size']
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
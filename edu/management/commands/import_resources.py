@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edu.imports import DEFAULT_BATCH_SIZE, ResourceImporter, iter_csv_rows, iter_jsonl_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream resources and their module links from a CSV or JSONL file, "
+        "upserting by content_url in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (with header) or JSONL file to import.")
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'jsonl'],
+                            help="Input format (defaults to the file extension).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--rejects', help="Write rejected lines and their errors to this JSONL file.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"No such file: {path}")
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size must be positive.")
+        file_format = options['file_format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Cannot infer the format; pass --format csv or --format jsonl.")
+
+        importer = ResourceImporter(batch_size=options['batch_size'])
+        with path.open(newline='', encoding='utf-8') as stream:
+            rows = iter_csv_rows(stream) if file_format == 'csv' else iter_jsonl_rows(stream)
+            report = importer.run(rows)
+
+        if options['rejects']:
+            with open(options['rejects'], 'w', encoding='utf-8') as rejects:
+                for line_number, errors in report.rejected:
+                    rejects.write(json.dumps({'line': line_number, 'errors': errors}) + '\n')
+        for line_number, errors in report.rejected[:20]:
+            self.stderr.write(f"line {line_number}: {json.dumps(errors)}")
+        if len(report.rejected) > 20:
+            self.stderr.write(f"... {len(report.rejected) - 20} more rejected lines")
+
+        self.stdout.write(self.style.SUCCESS(report.summary()))
@@ -0,0 +1,50 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from edu.audio import find_ffmpeg, process_module
+from edu.models import PhoneticsModule
+
+
+def _setup_worker():
+    # Spawned (non-forked) workers start without Django configured.
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Build renditions and duration/waveform metadata for phonetics audio that is "
+        "pending or failed (or all of it with --all), across a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Reprocess modules that are already done.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes.")
+
+    def handle(self, *args, **options):
+        queryset = PhoneticsModule.objects.exclude(audio_file='').exclude(audio_file__isnull=True)
+        if not options['all']:
+            queryset = queryset.exclude(audio_status='ready')
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+        if find_ffmpeg() is None:
+            self.stdout.write("ffmpeg not found: only PCM WAV uploads can be processed, into WAV renditions.")
+
+        started = time.monotonic()
+        workers = max(min(options['workers'], len(pks)), 1)
+        if workers == 1:
+            statuses = Counter(map(process_module, pks))
+        else:
+            # Workers open their own connections; forked ones must not share ours.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as pool:
+                statuses = Counter(pool.map(process_module, pks))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {statuses['ready']} of {len(pks)} modules ({statuses['failed']} failed) "
+            f"with {workers} workers in {time.monotonic() - started:.2f}s."
+        ))
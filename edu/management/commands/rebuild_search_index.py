@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from edu.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for resources and modules."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        started = time.monotonic()
+        with transaction.atomic():
+            backend.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {type(backend).__name__} index in {time.monotonic() - started:.2f}s."
+        ))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from edu.recommendations import AGE_BANDS, MAX_PER_BAND, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-age-band recommendation table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=MAX_PER_BAND, help="Rows kept per age band.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = refresh_recommendations(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} recommendations for {len(AGE_BANDS)} age bands in {time.monotonic() - started:.2f}s."
+        ))
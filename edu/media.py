@@ -0,0 +1,174 @@
+import hashlib
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .streaming import is_asgi, stream_content
+
+
+DEFAULT_MEDIA_SETTINGS = {
+    # None: Django sends the file (zero-copy through the server's
+    # wsgi.file_wrapper where available). 'x-sendfile' (Apache, lighttpd) or
+    # 'x-accel-redirect' (nginx): the front server sends it, ranges included.
+    'OFFLOAD': None,
+    'ACCEL_PREFIX': '/protected-media/',  # nginx `internal` location aliased to MEDIA_ROOT
+    'MAX_AGE': 86400,
+}
+
+
+# Read size when Django streams the file itself
+BLOCK_SIZE = 64 * 1024
+
+
+def get_media_settings():
+    """
+    Return the media delivery settings, with defaults filled in.
+    """
+    return {**DEFAULT_MEDIA_SETTINGS, **getattr(settings, 'EDU_MEDIA', {})}
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive `(start, end)` byte positions of a single-range
+    `Range: bytes=...` header, or None when the header should be ignored
+    (absent, malformed, or several ranges, which are answered with the full
+    file). Raise `RangeNotSatisfiable` when no byte of the file is requested.
+    """
+    unit, _, spec = (header or '').partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes.
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class FileRange:
+    """
+    Read-only view of `length` bytes of an open file from its current
+    position. `fileno()` is kept so servers whose `wsgi.file_wrapper` uses
+    `sendfile()` (gunicorn) still send the range without copying it.
+    """
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_validators(name, stat):
+    """
+    Return a strong ETag and the modification time of a stored file.
+    Stored names are not reused for different content (the storage picks a
+    fresh name on upload), and size and mtime catch files replaced in place.
+    """
+    raw = f"{name}|{stat.st_size}|{stat.st_mtime_ns}"
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), int(stat.st_mtime)
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return etag in tags or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def serve_file(request, field_file, content_type=None):
+    """
+    Respond with a stored file: conditional GET (304), single byte ranges
+    (206/416, honouring `If-Range`) and validators for client caches.
+    Files in storages without a local path are redirected to their URL.
+    """
+    options = get_media_settings()
+    storage, name = field_file.storage, field_file.name
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        return HttpResponseRedirect(storage.url(name))
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("The file is missing from storage.")
+
+    etag, last_modified = file_validators(name, stat)
+    content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        patch_cache_control(response, private=True, max_age=options['MAX_AGE'])
+        return response
+
+    if _not_modified(request, etag, last_modified):
+        return finish(HttpResponseNotModified())
+
+    if options['OFFLOAD']:
+        response = HttpResponse(content_type=content_type)
+        if options['OFFLOAD'] == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = options['ACCEL_PREFIX'].rstrip('/') + '/' + name.lstrip('/')
+        else:
+            response['X-Sendfile'] = path
+        return finish(response)
+
+    byte_range = None
+    # A range only applies to the version the client already holds.
+    if_range = request.headers.get('If-Range')
+    if if_range is None or if_range.strip() in (etag, http_date(last_modified)):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{stat.st_size}"
+            return finish(response)
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1), content_type=content_type, status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+    response.block_size = BLOCK_SIZE
+    if is_asgi(request):
+        source = response.file_to_stream  # The file or its range; the response's closers close it
+        response.streaming_content = stream_content(request, iter(lambda: source.read(BLOCK_SIZE), b''))
+    return finish(response)
@@ -0,0 +1,132 @@
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Optional; responses are then gzip-compressed only
+    brotli = None
+
+
+DEFAULT_COMPRESSION_SETTINGS = {
+    'MIN_SIZE': 1024,       # Smaller bodies are sent as they are
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,    # 0-11; higher is smaller but slower
+    # API and export media types only. HTML pages (the browsable API) carry a
+    # CSRF token and are left uncompressed, as compressing them would expose
+    # it to BREACH.
+    'CONTENT_TYPES': ('application/json', 'application/msgpack', 'application/x-ndjson', 'text/csv'),
+}
+
+
+def get_compression_settings():
+    """
+    Return the compression settings, with defaults filled in.
+    """
+    return {**DEFAULT_COMPRESSION_SETTINGS, **getattr(settings, 'EDU_COMPRESSION', {})}
+
+
+def parse_accept_encoding(header):
+    """
+    Map each coding in an Accept-Encoding header to its quality value.
+    """
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        codings[coding.strip().lower()] = quality
+    return codings
+
+
+def choose_encoding(header):
+    """
+    Return 'br' or 'gzip', whichever the client accepts and we support
+    (preferring the higher quality, then brotli), or None.
+    """
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get('*', 0.0)
+    candidates = [('br', 2), ('gzip', 1)] if brotli is not None else [('gzip', 1)]
+    quality, _, encoding = max((codings.get(name, wildcard), rank, name) for name, rank in candidates)
+    return encoding if quality > 0 else None
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        # Flush each chunk so streamed exports reach the client as they are produced.
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _brotli_stream(chunks, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli (when installed) or gzip response compression.
+
+    Only bodies of the configured content types (exact media types) and of
+    at least `MIN_SIZE` bytes are compressed; streamed responses (exports) are compressed chunk
+    by chunk. Responses that already have a Content-Encoding, partial
+    content and async streams are left alone. Strong ETags are weakened as
+    RFC 9110 requires; conditional requests compare them weakly.
+    """
+    def process_response(self, request, response):
+        options = get_compression_settings()
+        if response.status_code not in (200, 201) or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in options['CONTENT_TYPES']:
+            return response
+        if response.streaming:
+            if response.is_async:
+                return response
+        elif len(response.content) < options['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = _brotli_stream(response.streaming_content, options['BROTLI_QUALITY'])
+            else:
+                response.streaming_content = _gzip_stream(response.streaming_content, options['GZIP_LEVEL'])
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=options['BROTLI_QUALITY'])
+            else:
+                compressed = gzip.compress(response.content, compresslevel=options['GZIP_LEVEL'], mtime=0)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
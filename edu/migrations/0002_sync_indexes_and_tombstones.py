@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='childprofile',
+            index=models.Index(fields=['updated_at', 'id'], name='child_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mathmodule',
+            index=models.Index(fields=['updated_at', 'id'], name='math_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='phoneticsmodule',
+            index=models.Index(fields=['updated_at', 'id'], name='phonetics_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['updated_at', 'id'], name='resource_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stemmodule',
+            index=models.Index(fields=['updated_at', 'id'], name='stem_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx'),
+        ),
+    ]
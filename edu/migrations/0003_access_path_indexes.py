@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0002_sync_indexes_and_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='childprofile',
+            index=models.Index(fields=['created_at', 'id'], name='child_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='childprofile',
+            index=models.Index(fields=['user', 'created_at'], name='child_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='childprofile',
+            index=models.Index(fields=['age', 'created_at'], name='child_age_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mathmodule',
+            index=models.Index(fields=['created_at', 'id'], name='math_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mathmodule',
+            index=models.Index(fields=['difficulty_level', 'created_at'], name='math_difficulty_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='phoneticsmodule',
+            index=models.Index(fields=['created_at', 'id'], name='phonetics_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['created_at', 'id'], name='resource_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stemmodule',
+            index=models.Index(fields=['created_at', 'id'], name='stem_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['created_at', 'id'], name='user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['role', 'created_at'], name='user_role_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['updated_at'], name='user_updated_idx'),
+        ),
+    ]
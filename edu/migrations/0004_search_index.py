@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the FTS5 search table on SQLite; other databases use their own backend.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS edu_search_index USING fts5("
+        "title, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    # Index rows that already exist (rowid = pk * 4 + type code, see edu.search)
+    for code, table in enumerate(['edu_resource', 'edu_phoneticsmodule', 'edu_mathmodule', 'edu_stemmodule']):
+        schema_editor.execute(
+            f"INSERT INTO edu_search_index (rowid, title, description) "
+            f"SELECT id * 4 + {code}, title, description FROM {table}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS edu_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0003_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mathmodule',
+            name='max_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mathmodule',
+            name='min_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='phoneticsmodule',
+            name='max_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='phoneticsmodule',
+            name='min_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stemmodule',
+            name='max_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stemmodule',
+            name='min_age',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('age_band', models.PositiveSmallIntegerField()),
+                ('item_type', models.CharField(max_length=20)),
+                ('item_id', models.BigIntegerField()),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['age_band', 'rank'], name='recommendation_band_rank_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ModuleCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_type', models.CharField(choices=[('phonetics-module', 'Phonetics Module'), ('math-module', 'Math Module'), ('stem-module', 'STEM Module')], max_length=20)),
+                ('module_id', models.BigIntegerField()),
+                ('completed_at', models.DateTimeField(auto_now_add=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to='edu.childprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('child', 'module_type', 'module_id'), name='unique_module_completion')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0005_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.PositiveSmallIntegerField(choices=[(1, 'module_started'), (2, 'audio_played'), (3, 'problem_solved'), (4, 'module_completed')])),
+                ('module_type', models.PositiveSmallIntegerField(choices=[(1, 'phonetics-module'), (2, 'math-module'), (3, 'stem-module')])),
+                ('module_id', models.PositiveIntegerField()),
+                ('value', models.IntegerField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('child', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='progress_events', to='edu.childprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['child', 'occurred_at'], name='progress_child_occurred_idx')],
+            },
+        ),
+    ]
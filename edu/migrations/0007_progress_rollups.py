@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0006_progress_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChildProgressSummary',
+            fields=[
+                ('child', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress_summary', serialize=False, to='edu.childprofile')),
+                ('phonetics_completed', models.PositiveIntegerField(default=0)),
+                ('math_completed', models.PositiveIntegerField(default=0)),
+                ('stem_completed', models.PositiveIntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='modulecompletion',
+            name='completed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='ModuleProgressSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_type', models.CharField(choices=[('phonetics-module', 'Phonetics Module'), ('math-module', 'Math Module'), ('stem-module', 'STEM Module')], max_length=20)),
+                ('module_id', models.BigIntegerField()),
+                ('completions', models.PositiveIntegerField(default=0)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('module_type', 'module_id'), name='unique_module_progress')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0007_progress_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='phoneticsmodule',
+            name='audio_duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='phoneticsmodule',
+            name='audio_status',
+            field=models.CharField(blank=True, choices=[('', 'No audio'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='phoneticsmodule',
+            name='audio_waveform',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='AudioRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(max_length=10)),
+                ('content_type', models.CharField(max_length=50)),
+                ('file', models.FileField(upload_to='phonetics_audio/renditions/')),
+                ('size', models.PositiveIntegerField()),
+                ('sample_rate', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audio_renditions', to='edu.phoneticsmodule')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('module', 'codec'), name='unique_audio_rendition')],
+            },
+        ),
+    ]
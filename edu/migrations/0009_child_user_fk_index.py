@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu', '0008_audio_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='childprofile',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='edu.userprofile'),
+        ),
+    ]
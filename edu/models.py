@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # User Profile Models
 class UserProfile(models.Model):
@@ -16,6 +17,13 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='user_created_idx'),  # Admin ordering, keyset paging
+            models.Index(fields=['role', 'created_at'], name='user_role_created_idx'),  # Admin role filter
+            models.Index(fields=['updated_at'], name='user_updated_idx'),  # Admin updated_at filter
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"  # Include role in string representation
 
@@ -28,13 +36,22 @@ class ChildProfile(models.Model):
     user = models.ForeignKey(
         UserProfile, 
         on_delete=models.CASCADE, 
-        related_name="children"
+        related_name="children",
+        db_index=False,  # Covered by child_user_created_idx
     )  # Parent/Teacher link
     name = models.CharField(max_length=100)   # Child's name
     age = models.PositiveIntegerField()       # Child's age
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='child_updated_idx'),  # Delta sync feed
+            models.Index(fields=['created_at', 'id'], name='child_created_idx'),  # Admin ordering, keyset paging
+            models.Index(fields=['user', 'created_at'], name='child_user_created_idx'),  # Children of a user
+            models.Index(fields=['age', 'created_at'], name='child_age_created_idx'),  # Admin age filter
+        ]
+
     def __str__(self):
         return f"{self.name} (Age: {self.age})"
 
@@ -50,6 +67,12 @@ class Resource(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='resource_updated_idx'),  # Delta sync feed
+            models.Index(fields=['created_at', 'id'], name='resource_created_idx'),  # Admin ordering, keyset paging
+        ]
+
     def __str__(self):
         return self.title
 
@@ -66,14 +89,53 @@ class PhoneticsModule(models.Model):
         blank=True, 
         null=True
     )  # Allow blank or null files for flexibility
+    AUDIO_STATUS_CHOICES = [
+        ('', 'No audio'),
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    audio_status = models.CharField(max_length=10, choices=AUDIO_STATUS_CHOICES, blank=True, default='')
+    audio_duration = models.FloatField(blank=True, null=True)  # Seconds, measured by edu.audio
+    audio_waveform = models.JSONField(blank=True, null=True)   # Peak level (0-1) per slice, for players
+    min_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Youngest target age (open if empty)
+    max_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Oldest target age (open if empty)
     resources = models.ManyToManyField(Resource, blank=True)  # Related educational resources
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='phonetics_updated_idx'),  # Delta sync feed
+            models.Index(fields=['created_at', 'id'], name='phonetics_created_idx'),  # Admin ordering, keyset paging
+        ]
+
     def __str__(self):
         return self.title
 
 
+# Audio Rendition Model
+class AudioRendition(models.Model):
+    """
+    Compact copy of a phonetics module's audio, produced by edu.audio.
+    """
+    module = models.ForeignKey(PhoneticsModule, on_delete=models.CASCADE, related_name="audio_renditions")
+    codec = models.CharField(max_length=10)          # Key in edu.audio.RENDITIONS
+    content_type = models.CharField(max_length=50)
+    file = models.FileField(upload_to='phonetics_audio/renditions/')
+    size = models.PositiveIntegerField()             # Bytes
+    sample_rate = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['module', 'codec'], name='unique_audio_rendition'),
+        ]
+
+    def __str__(self):
+        return f"{self.module_id} {self.codec} ({self.size} bytes)"
+
+
 # Mathematics Module Model
 class MathModule(models.Model):
     """
@@ -90,10 +152,19 @@ class MathModule(models.Model):
             ('Hard', 'Hard'),
         ]
     )  # Added predefined difficulty choices
+    min_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Youngest target age (open if empty)
+    max_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Oldest target age (open if empty)
     resources = models.ManyToManyField(Resource, blank=True)  # Related educational resources
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='math_updated_idx'),  # Delta sync feed
+            models.Index(fields=['created_at', 'id'], name='math_created_idx'),  # Admin ordering, keyset paging
+            models.Index(fields=['difficulty_level', 'created_at'], name='math_difficulty_created_idx'),  # Difficulty filter
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.difficulty_level})"
 
@@ -106,12 +177,171 @@ class STEMModule(models.Model):
     title = models.CharField(max_length=255)  # Title of the STEM module
     description = models.TextField()          # Description of the module
     video_url = models.URLField(blank=True, null=True)  # Link to related videos
+    min_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Youngest target age (open if empty)
+    max_age = models.PositiveSmallIntegerField(blank=True, null=True)  # Oldest target age (open if empty)
     resources = models.ManyToManyField(Resource, blank=True)  # Related educational resources
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-set at creation
     updated_at = models.DateTimeField(auto_now=True)      # Auto-update on save
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='stem_updated_idx'),  # Delta sync feed
+            models.Index(fields=['created_at', 'id'], name='stem_created_idx'),  # Admin ordering, keyset paging
+        ]
+
     def __str__(self):
         return self.title
 
 
+# Deletion Tombstone Model
+class Tombstone(models.Model):
+    """
+    Record of a deleted row, so incremental sync clients can drop it locally.
+    """
+    model = models.CharField(max_length=100)     # Model label, e.g. "edu.childprofile"
+    object_id = models.BigIntegerField()         # Primary key of the deleted row
+    deleted_at = models.DateTimeField(auto_now_add=True)  # Auto-set at deletion
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} (deleted)"
 
+
+# Module Completion Model
+class ModuleCompletion(models.Model):
+    """
+    Model recording that a child has completed a learning module.
+    """
+    MODULE_TYPE_CHOICES = [
+        ('phonetics-module', 'Phonetics Module'),
+        ('math-module', 'Math Module'),
+        ('stem-module', 'STEM Module'),
+    ]
+    child = models.ForeignKey(
+        ChildProfile,
+        on_delete=models.CASCADE,
+        related_name="completions"
+    )  # Child who completed the module
+    module_type = models.CharField(max_length=20, choices=MODULE_TYPE_CHOICES)
+    module_id = models.BigIntegerField()                   # Primary key of the completed module
+    completed_at = models.DateTimeField(default=timezone.now)  # Defaults to the time of recording
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['child', 'module_type', 'module_id'], name='unique_module_completion'),
+        ]
+
+    def __str__(self):
+        return f"{self.child} completed {self.module_type} #{self.module_id}"
+
+
+# Progress Rollup Models
+class ChildProgressSummary(models.Model):
+    """
+    Completion counts per child, maintained incrementally by edu.progress.
+    """
+    child = models.OneToOneField(
+        ChildProfile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="progress_summary"
+    )
+    phonetics_completed = models.PositiveIntegerField(default=0)
+    math_completed = models.PositiveIntegerField(default=0)
+    stem_completed = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)  # Latest completion time
+
+    @property
+    def total_completed(self):
+        return self.phonetics_completed + self.math_completed + self.stem_completed
+
+    def __str__(self):
+        return f"{self.child}: {self.total_completed} completed"
+
+
+class ModuleProgressSummary(models.Model):
+    """
+    Completion counts per module, maintained incrementally by edu.progress.
+    """
+    module_type = models.CharField(max_length=20, choices=ModuleCompletion.MODULE_TYPE_CHOICES)
+    module_id = models.BigIntegerField()
+    completions = models.PositiveIntegerField(default=0)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['module_type', 'module_id'], name='unique_module_progress'),
+        ]
+
+    def __str__(self):
+        return f"{self.module_type} #{self.module_id}: {self.completions} completions"
+
+
+# Precomputed Recommendation Model
+class Recommendation(models.Model):
+    """
+    Model holding ranked recommendations materialized per age band.
+    """
+    age_band = models.PositiveSmallIntegerField()  # Index into edu.recommendations.AGE_BANDS
+    item_type = models.CharField(max_length=20)     # "resource" or a module type
+    item_id = models.BigIntegerField()              # Primary key of the recommended item
+    score = models.FloatField()                     # Higher is better
+    rank = models.PositiveIntegerField()            # 1-based position within the band
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['age_band', 'rank'], name='recommendation_band_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Band {self.age_band} #{self.rank}: {self.item_type} {self.item_id}"
+
+
+# Progress Event Model
+class ProgressEvent(models.Model):
+    """
+    Append-only log of child activity, written in batches by edu.ingestion.
+
+    Rows are never updated, so the table has no `updated_at`, and event and
+    module types are stored as small integer codes to keep rows narrow.
+    """
+    MODULE_STARTED = 1
+    AUDIO_PLAYED = 2
+    PROBLEM_SOLVED = 3
+    MODULE_COMPLETED = 4
+    EVENT_TYPE_CHOICES = [
+        (MODULE_STARTED, 'module_started'),
+        (AUDIO_PLAYED, 'audio_played'),
+        (PROBLEM_SOLVED, 'problem_solved'),
+        (MODULE_COMPLETED, 'module_completed'),
+    ]
+    MODULE_TYPE_CHOICES = [
+        (1, 'phonetics-module'),
+        (2, 'math-module'),
+        (3, 'stem-module'),
+    ]
+    id = models.BigAutoField(primary_key=True)
+    child = models.ForeignKey(
+        ChildProfile,
+        on_delete=models.CASCADE,
+        related_name="progress_events",
+        db_index=False,  # Covered by progress_child_occurred_idx
+    )
+    event_type = models.PositiveSmallIntegerField(choices=EVENT_TYPE_CHOICES)
+    module_type = models.PositiveSmallIntegerField(choices=MODULE_TYPE_CHOICES)
+    module_id = models.PositiveIntegerField()          # Primary key of the module
+    value = models.IntegerField(null=True, blank=True)  # Optional payload (score, seconds played...)
+    occurred_at = models.DateTimeField()                # Client-side event time
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['child', 'occurred_at'], name='progress_child_occurred_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.child_id} {self.get_event_type_display()} {self.get_module_type_display()} #{self.module_id}"
@@ -0,0 +1,255 @@
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.paginator import EmptyPage, InvalidPage, Page
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset Pagination
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered on `(created_at, id)` by default;
+    subclasses may order on another timestamp via `ordering`.
+
+    Each page is fetched with a `WHERE (timestamp, id) > (cursor)` filter
+    instead of `OFFSET`, and no `COUNT(*)` is issued, so deep pages cost the
+    same as the first one. Cursors are opaque base64 tokens.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('created_at', 'id')
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_cursor_parts(self, instance):
+        """
+        Return the position just past `instance` (a model instance or a
+        `.values()` row) as strings.
+        """
+        if isinstance(instance, dict):
+            timestamp, pk = instance[self.ordering[0]], instance['id']
+        else:
+            timestamp, pk = getattr(instance, self.ordering[0]), instance.pk
+        return [timestamp.isoformat(), str(pk)]
+
+    def encode_cursor(self, instance):
+        """
+        Build an opaque cursor pointing just past `instance`.
+        """
+        raw = '|'.join(self.get_cursor_parts(instance))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def read_cursor(self, cursor):
+        """
+        Return the parts encoded in `cursor`, as strings.
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            return base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def decode_cursor(self, cursor):
+        """
+        Return the `(timestamp, id)` position encoded in `cursor`.
+        """
+        parts = self.read_cursor(cursor)
+        try:
+            return datetime.fromisoformat(parts[0]), int(parts[1])
+        except (IndexError, ValueError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, pk = self.decode_cursor(cursor)
+            field = self.ordering[0]
+            queryset = queryset.filter(
+                Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, 'pk__gt': pk})
+            )
+        # Fetch one extra row to learn whether another page exists.
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[:self.page_size_value]
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request)])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+# Custom Pagination
+class CustomPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; clients can opt into keyset paging
+    per request with `?pagination=keyset` (or by sending a `cursor`).
+    Unordered querysets are paged in `(created_at, id)` order, which keeps
+    page boundaries stable and lets the database walk the index.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def is_keyset_request(self, request):
+        return (request.query_params.get(self.mode_query_param) == 'keyset'
+                or self.keyset_class.cursor_query_param in request.query_params)
+
+    def get_keyset(self, request):
+        if not self.is_keyset_request(request):
+            return None
+        keyset = self.keyset_class()
+        keyset.page_size = self.page_size
+        keyset.max_page_size = self.max_page_size
+        return keyset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.get_keyset(request)
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.keyset_class.ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        `paginate_queryset` for async views: the count and the page are read
+        with the async ORM.
+        """
+        self.keyset = self.get_keyset(request)
+        if self.keyset is not None:
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.keyset_class.ordering)
+
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()  # Paginator.count is a cached_property
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return self.page.object_list
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+# Catalog Pagination
+class CatalogPagination(CustomPagination):
+    """
+    Page-number pagination for one module type of the catalog, whose pages
+    hold the same page of every type: past a type's last page it returns an
+    empty page instead of a 404. A keyset cursor cannot describe several
+    types, so keyset paging is not offered.
+    """
+    def get_keyset(self, request):
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except EmptyPage as exc:
+            if int(page_number) < 1:
+                raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+            self.page = Page([], int(page_number), paginator)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        return list(self.page)
+
+    def is_past_end(self):
+        return self.page.number > self.page.paginator.num_pages
+
+    def get_previous_link(self):
+        if not self.is_past_end():
+            return super().get_previous_link()
+        url = self.request.build_absolute_uri()
+        if self.page.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page.number - 1)
+
+
+# Sync Feed Pagination
+class SyncPagination(KeysetPagination):
+    """
+    Keyset pagination over `(updated_at, id)` for the delta sync feed.
+    Cursors also carry the sync window, `(updated_since, watermark]`, so
+    every page of one sync reads the window its first page fixed.
+    """
+    page_size = 500
+    max_page_size = 1000
+    ordering = ('updated_at', 'id')
+    window = (None, None)  # (updated_since, watermark); set by the view
+
+    def get_cursor_parts(self, instance):
+        updated_since, watermark = self.window
+        return super().get_cursor_parts(instance) + [
+            watermark.isoformat(), updated_since.isoformat() if updated_since else '',
+        ]
+
+    def decode_window(self, cursor):
+        """
+        Return the `(updated_since, watermark)` window encoded in `cursor`.
+        """
+        parts = self.read_cursor(cursor)
+        try:
+            watermark, updated_since = datetime.fromisoformat(parts[2]), parts[3]
+            return (datetime.fromisoformat(updated_since) if updated_since else None), watermark
+        except (IndexError, ValueError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import (
+    PhoneticsModule, MathModule, STEMModule, ModuleCompletion, ChildProgressSummary, ModuleProgressSummary,
+)
+
+
+MODULE_MODELS = {
+    'phonetics-module': PhoneticsModule,
+    'math-module': MathModule,
+    'stem-module': STEMModule,
+}
+
+# ChildProgressSummary counter for each module type
+SUMMARY_FIELDS = {
+    'phonetics-module': 'phonetics_completed',
+    'math-module': 'math_completed',
+    'stem-module': 'stem_completed',
+}
+
+
+def record_completions(completions):
+    """
+    Record `(child_id, module_type, module_id, completed_at)` completions and
+    update the rollup tables in the same transaction.
+
+    Completions already on record are skipped. The affected child summary
+    rows are locked first, so concurrent writers for the same child cannot
+    both count one completion. Returns the `ModuleCompletion` rows created.
+    Runs a fixed number of queries regardless of the batch size.
+    """
+    pending = {}
+    for child_id, module_type, module_id, completed_at in completions:
+        key = (child_id, module_type, module_id)
+        if key not in pending or completed_at < pending[key].completed_at:
+            pending[key] = ModuleCompletion(
+                child_id=child_id, module_type=module_type, module_id=module_id, completed_at=completed_at
+            )
+    if not pending:
+        return []
+
+    child_ids = sorted({child_id for child_id, _, _ in pending})
+    with transaction.atomic():
+        ChildProgressSummary.objects.bulk_create(
+            [ChildProgressSummary(child_id=child_id) for child_id in child_ids], ignore_conflicts=True
+        )
+        summaries = {
+            summary.child_id: summary
+            for summary in ChildProgressSummary.objects.select_for_update().filter(child_id__in=child_ids).order_by('pk')
+        }
+
+        existing = set(
+            ModuleCompletion.objects.filter(
+                child_id__in=child_ids, module_id__in={module_id for _, _, module_id in pending}
+            ).values_list('child_id', 'module_type', 'module_id')
+        )
+        created = [completion for key, completion in pending.items() if key not in existing]
+        if not created:
+            return []
+        ModuleCompletion.objects.bulk_create(created)
+
+        update_child_summaries(summaries, created)
+        update_module_summaries(created)
+    return created
+
+
+def update_child_summaries(summaries, created):
+    fields = {'last_activity_at'}
+    for completion in created:
+        summary = summaries[completion.child_id]
+        field = SUMMARY_FIELDS[completion.module_type]
+        setattr(summary, field, getattr(summary, field) + 1)
+        fields.add(field)
+        if summary.last_activity_at is None or completion.completed_at > summary.last_activity_at:
+            summary.last_activity_at = completion.completed_at
+    ChildProgressSummary.objects.bulk_update(list(summaries.values()), sorted(fields))
+
+
+def update_module_summaries(created):
+    counts, latest = defaultdict(int), {}
+    for completion in created:
+        key = (completion.module_type, completion.module_id)
+        counts[key] += 1
+        if key not in latest or completion.completed_at > latest[key]:
+            latest[key] = completion.completed_at
+
+    ModuleProgressSummary.objects.bulk_create(
+        [ModuleProgressSummary(module_type=module_type, module_id=module_id) for module_type, module_id in counts],
+        ignore_conflicts=True,
+    )
+    condition = Q()
+    for module_type, module_id in counts:
+        condition |= Q(module_type=module_type, module_id=module_id)
+    summaries = list(ModuleProgressSummary.objects.select_for_update().filter(condition).order_by('pk'))
+    for summary in summaries:
+        key = (summary.module_type, summary.module_id)
+        summary.completions += counts[key]
+        if summary.last_completed_at is None or latest[key] > summary.last_completed_at:
+            summary.last_completed_at = latest[key]
+    ModuleProgressSummary.objects.bulk_update(summaries, ['completions', 'last_completed_at'])
+
+
+def child_progress(summary):
+    """
+    Summary payload for a child; `summary` may be None before any completion.
+    """
+    if summary is None:
+        summary = ChildProgressSummary()
+    return {
+        "completed": {module_type: getattr(summary, field) for module_type, field in SUMMARY_FIELDS.items()},
+        "total_completed": summary.total_completed,
+        "last_activity_at": summary.last_activity_at,
+    }
@@ -0,0 +1,86 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey, OneToOneField
+from rest_framework import serializers
+
+
+def _is_single_valued(model, field_name):
+    """
+    Return True if `field_name` on `model` is a forward FK/one-to-one relation
+    that can be joined with `select_related`.
+    """
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+    return isinstance(field, (ForeignKey, OneToOneField)) or (
+        field.one_to_one and field.auto_created
+    )
+
+
+def related_model(model, field_name):
+    """
+    Return the model on the other side of a relation, or None.
+    """
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return None
+    return field.related_model
+
+
+def build_query_plan(serializer, model, prefix='', in_prefetch=False):
+    """
+    Walk a serializer's fields and collect the relation lookups it will touch.
+
+    Returns a `(select_related, prefetch_related)` pair of lookup lists.
+    Forward FK chains are joined while we are still on the root query;
+    anything reached through a many-valued relation becomes a prefetch.
+    """
+    select_related, prefetch_related = [], []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        source = field.source
+        lookup = f"{prefix}{source}"
+
+        if isinstance(field, serializers.ListSerializer):
+            prefetch_related.append(lookup)
+            child_model = related_model(model, source)
+            if child_model is not None:
+                _, nested = build_query_plan(field.child, child_model, f"{lookup}__", True)
+                prefetch_related.extend(nested)
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch_related.append(lookup)
+        elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField)):
+            if isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization():
+                # Primary key fields read the local `<name>_id` column, no join needed.
+                continue
+            if not _is_single_valued(model, source):
+                continue
+            if in_prefetch:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+            child_model = related_model(model, source)
+            if isinstance(field, serializers.BaseSerializer) and child_model is not None:
+                nested_select, nested_prefetch = build_query_plan(
+                    field, child_model, f"{lookup}__", in_prefetch
+                )
+                select_related.extend(nested_select)
+                prefetch_related.extend(nested_prefetch)
+
+    return select_related, prefetch_related
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Apply the `select_related`/`prefetch_related` plan derived from
+    `serializer` to `queryset`.
+    """
+    select_related, prefetch_related = build_query_plan(serializer, queryset.model)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
@@ -0,0 +1,172 @@
+import numpy as np
+from django.db import transaction
+
+from .models import Resource, PhoneticsModule, MathModule, STEMModule, ModuleCompletion, Recommendation
+
+
+# Age bands (inclusive); recommendations are materialized once per band
+AGE_BANDS = ((0, 2), (3, 4), (5, 6), (7, 8), (9, 12), (13, 18))
+
+MODULE_TYPES = {
+    'phonetics-module': PhoneticsModule,
+    'math-module': MathModule,
+    'stem-module': STEMModule,
+}
+ITEM_TYPES = {'resource': Resource, **MODULE_TYPES}
+
+DIFFICULTY_LEVELS = {'Easy': 0.0, 'Medium': 1.0, 'Hard': 2.0}
+
+# Weights of the score components
+AGE_WEIGHT = 0.6
+DIFFICULTY_WEIGHT = 0.3
+POPULARITY_WEIGHT = 0.1
+# Resources inherit the best score of the modules they belong to, discounted
+RESOURCE_DISCOUNT = 0.9
+
+# Rows kept per band; enough to fill a page after dropping completed modules
+MAX_PER_BAND = 200
+
+
+def age_band_for(age):
+    """
+    Return the index of the band containing `age` (clamped to the outer bands).
+    """
+    for index, (low, high) in enumerate(AGE_BANDS):
+        if age <= high:
+            return index if age >= low else max(index - 1, 0)
+    return len(AGE_BANDS) - 1
+
+
+def load_features():
+    """
+    Load module and resource features into NumPy arrays.
+
+    Returns `(modules, resources, links)`, where `modules` holds parallel
+    arrays `types`, `ids`, `min_age`, `max_age` (NaN when open),
+    `difficulty` (NaN when unknown) and `popularity`; `resources` holds `ids`;
+    and `links` pairs module rows with resource rows.
+    """
+    types, ids, min_ages, max_ages, difficulty = [], [], [], [], []
+    link_modules, link_resources = [], []
+    resource_ids = np.array(list(Resource.objects.order_by('pk').values_list('pk', flat=True)), dtype=np.int64)
+    resource_index = {int(pk): index for index, pk in enumerate(resource_ids)}
+
+    for module_type, model in MODULE_TYPES.items():
+        fields = ['pk', 'min_age', 'max_age']
+        if model is MathModule:
+            fields.append('difficulty_level')
+        row_index = {}
+        for row in model.objects.order_by('pk').values_list(*fields):
+            row_index[row[0]] = len(ids)
+            types.append(module_type)
+            ids.append(row[0])
+            min_ages.append(np.nan if row[1] is None else row[1])
+            max_ages.append(np.nan if row[2] is None else row[2])
+            difficulty.append(DIFFICULTY_LEVELS.get(row[3], np.nan) if len(row) > 3 else np.nan)
+
+        through = model.resources.through
+        module_field = f"{model._meta.model_name}_id"
+        for module_id, resource_id in through.objects.values_list(module_field, 'resource_id'):
+            if module_id in row_index and resource_id in resource_index:
+                link_modules.append(row_index[module_id])
+                link_resources.append(resource_index[resource_id])
+
+    link_modules = np.array(link_modules, dtype=np.int64)
+    link_resources = np.array(link_resources, dtype=np.int64)
+    popularity = np.bincount(link_modules, minlength=len(ids)).astype(float)
+    modules = {
+        'types': np.array(types, dtype=object),
+        'ids': np.array(ids, dtype=np.int64),
+        'min_age': np.array(min_ages, dtype=float),
+        'max_age': np.array(max_ages, dtype=float),
+        'difficulty': np.array(difficulty, dtype=float),
+        'popularity': popularity,
+    }
+    return modules, {'ids': resource_ids}, (link_modules, link_resources)
+
+
+def score_modules(modules, age):
+    """
+    Score every module for a child of `age` in one vectorized pass.
+    """
+    low = np.where(np.isnan(modules['min_age']), -np.inf, modules['min_age'])
+    high = np.where(np.isnan(modules['max_age']), np.inf, modules['max_age'])
+    # 1 inside the target range, decaying with each year outside it
+    distance = np.maximum(low - age, 0) + np.maximum(age - high, 0)
+    age_fit = np.exp(-distance / 2.0)
+
+    # Easy suits 3-5 year olds, Hard 9 and up; unknown difficulty is neutral
+    target = np.clip((age - 3) / 3.0, 0.0, 2.0)
+    difficulty_fit = np.where(
+        np.isnan(modules['difficulty']), 0.5, 1.0 - np.abs(modules['difficulty'] - target) / 2.0
+    )
+
+    popularity = modules['popularity']
+    popularity_fit = np.log1p(popularity) / np.log1p(popularity.max()) if popularity.size and popularity.max() else np.zeros_like(popularity)
+
+    return AGE_WEIGHT * age_fit + DIFFICULTY_WEIGHT * difficulty_fit + POPULARITY_WEIGHT * popularity_fit
+
+
+def score_resources(module_scores, resources, links):
+    """
+    Give each resource the best score among its modules, discounted.
+    Resources not linked to any module score zero.
+    """
+    scores = np.zeros(len(resources['ids']))
+    link_modules, link_resources = links
+    if link_modules.size:
+        np.maximum.at(scores, link_resources, module_scores[link_modules] * RESOURCE_DISCOUNT)
+    return scores
+
+
+def rank_band(band, modules, resources, links, limit=MAX_PER_BAND):
+    """
+    Return the top `limit` `(item_type, item_id, score)` for an age band.
+    """
+    low, high = AGE_BANDS[band]
+    age = (low + high) / 2.0
+    module_scores = score_modules(modules, age)
+    resource_scores = score_resources(module_scores, resources, links)
+
+    types = np.concatenate([modules['types'], np.full(len(resources['ids']), 'resource', dtype=object)])
+    ids = np.concatenate([modules['ids'], resources['ids']])
+    scores = np.concatenate([module_scores, resource_scores])
+    # Stable sort: ties keep module-before-resource, then id order
+    order = np.argsort(-scores, kind='stable')[:limit]
+    return [(types[i], int(ids[i]), float(scores[i])) for i in order]
+
+
+def refresh_recommendations(limit=MAX_PER_BAND):
+    """
+    Recompute every age band and replace the materialized table.
+    Returns the number of rows written.
+    """
+    modules, resources, links = load_features()
+    rows = []
+    for band in range(len(AGE_BANDS)):
+        for rank, (item_type, item_id, score) in enumerate(rank_band(band, modules, resources, links, limit), start=1):
+            rows.append(Recommendation(age_band=band, item_type=item_type, item_id=item_id, score=score, rank=rank))
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        Recommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def recommendations_for(child, limit=20, item_types=None):
+    """
+    Return the precomputed rows for the child's age band, skipping modules
+    the child has completed.
+    """
+    completed = set(
+        ModuleCompletion.objects.filter(child=child).values_list('module_type', 'module_id')
+    )
+    queryset = Recommendation.objects.filter(age_band=age_band_for(child.age)).order_by('rank')
+    if item_types:
+        queryset = queryset.filter(item_type__in=item_types)
+    rows = []
+    for row in queryset[:limit + len(completed)]:
+        if (row.item_type, row.item_id) not in completed:
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    return rows
@@ -0,0 +1,77 @@
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Optional; JSON is then encoded by the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional; MessagePack is then not offered (see settings.py)
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+
+def _encode_default(obj):
+    # Types the fast encoders do not know (datetimes, decimals, UUIDs, lazy
+    # strings, querysets) are converted exactly as DRF's JSON encoder does.
+    return encoders.JSONEncoder().default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    `JSONRenderer` encoded with orjson when it is installed.
+
+    Output is the same as the standard renderer's: compact separators,
+    unescaped UTF-8, DRF's formatting for datetimes and decimals, and
+    U+2028/U+2029 escaped. Indented output (`; indent=4`, the browsable
+    API) and anything orjson refuses go through the standard encoder.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encode_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renders responses as MessagePack (`Accept: application/msgpack` or
+    `?format=msgpack`). Values are converted as for JSON, so clients get
+    the same strings for datetimes and decimals.
+    """
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses `Content-Type: application/msgpack` request bodies.
+    """
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
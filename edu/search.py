@@ -0,0 +1,176 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Resource, PhoneticsModule, MathModule, STEMModule
+
+
+# Searchable models, keyed by the `type` used in the API. The code is packed
+# into the index rowid (`pk * 4 + code`) so rows can be updated by rowid.
+SEARCH_TYPES = {
+    'resource': (0, Resource),
+    'phonetics-module': (1, PhoneticsModule),
+    'math-module': (2, MathModule),
+    'stem-module': (3, STEMModule),
+}
+SEARCH_MODELS = {model: (search_type, code) for search_type, (code, model) in SEARCH_TYPES.items()}
+TYPE_BY_CODE = {code: search_type for search_type, (code, model) in SEARCH_TYPES.items()}
+
+FTS_TABLE = 'edu_search_index'
+
+
+def parse_terms(query):
+    """
+    Split a user query into lower-case word terms, dropping FTS syntax.
+    """
+    return re.findall(r'\w+', query.lower())
+
+
+# Search Backends
+class BaseSearchBackend:
+    """
+    Interface for search backends.
+
+    `search()` returns `[(type, pk, score)]`, best match first. Every term
+    must match, and terms also match as word prefixes ("add" finds "addition").
+    """
+    def index(self, objs):
+        raise NotImplementedError
+
+    def remove(self, model, pks):
+        raise NotImplementedError
+
+    def search(self, query, types=None, limit=20):
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=1000):
+        """
+        Re-index every searchable row.
+        """
+        self.clear()
+        for model in SEARCH_MODELS:
+            batch = []
+            for obj in model.objects.only('pk', 'title', 'description').iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    self.index(batch)
+                    batch = []
+            self.index(batch)
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    Inverted index in an SQLite FTS5 table (created by migration 0004).
+
+    Titles are weighted ten times the description in BM25 ranking, and the
+    table keeps 2- and 3-character prefix indexes so `"ter"*` queries do not
+    scan the term list.
+    """
+    title_weight = 10.0
+    description_weight = 1.0
+
+    def index(self, objs):
+        rows = []
+        for obj in objs:
+            search_type, code = SEARCH_MODELS[type(obj)]
+            rows.append((obj.pk * 4 + code, obj.title, obj.description))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)", rows
+            )
+
+    def remove(self, model, pks):
+        search_type, code = SEARCH_MODELS[model]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk * 4 + code,) for pk in pks])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def search(self, query, types=None, limit=20):
+        terms = parse_terms(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+        sql = (
+            f"SELECT rowid, bm25({FTS_TABLE}, %s, %s) AS score FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [self.title_weight, self.description_weight, match]
+        if types:
+            codes = [SEARCH_TYPES[search_type][0] for search_type in types]
+            sql += f" AND rowid %% 4 IN ({', '.join(['%s'] * len(codes))})"
+            params += codes
+        sql += " ORDER BY score LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25() is lower-is-better; flip the sign so higher scores rank first
+            return [(TYPE_BY_CODE[rowid % 4], rowid // 4, -score) for rowid, score in cursor.fetchall()]
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Portable fallback for databases without a configured full-text backend.
+    Runs `icontains` filters per model, ranking title matches first.
+    """
+    def index(self, objs):
+        pass
+
+    def remove(self, model, pks):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, batch_size=1000):
+        pass
+
+    def search(self, query, types=None, limit=20):
+        terms = parse_terms(query)
+        if not terms:
+            return []
+        results = []
+        for search_type, (code, model) in SEARCH_TYPES.items():
+            if types and search_type not in types:
+                continue
+            condition = Q()
+            for term in terms:
+                condition &= Q(title__icontains=term) | Q(description__icontains=term)
+            for pk, title in model.objects.filter(condition).values_list('pk', 'title')[:limit]:
+                title_hits = sum(term in title.lower() for term in terms)
+                results.append((search_type, pk, float(title_hits)))
+        results.sort(key=lambda result: -result[2])
+        return results[:limit]
+
+
+def get_search_backend():
+    """
+    Return the configured backend: `settings.EDU_SEARCH_BACKEND` if set,
+    otherwise FTS5 on SQLite and the portable fallback elsewhere.
+    """
+    path = getattr(settings, 'EDU_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return DatabaseSearchBackend()
+
+
+def index_objects(objs):
+    """
+    Index searchable objects written without signals (bulk create/update).
+    """
+    objs = [obj for obj in objs if type(obj) in SEARCH_MODELS]
+    if objs:
+        get_search_backend().index(objs)
@@ -1,33 +1,135 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
-from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule
+from rest_framework.permissions import SAFE_METHODS
+from .progress import MODULE_MODELS
+from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule, ProgressEvent, ModuleCompletion
+
+
+# Sparse fieldsets and expansion
+class DynamicFieldsMixin:
+    """
+    Lets clients trim read responses with query parameters:
+
+    - `fields=id,title,updated_at` keeps only the listed fields;
+    - `expand=resources` lists the nested relations to include. Without
+      `expand`, nested relations are included unless `fields` leaves them out.
+
+    Only the top-level serializer of a `GET`/`HEAD` request is trimmed, and
+    before the query plan is built, so dropped relations are never fetched.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self.is_root_serializer():
+            return fields
+
+        params = getattr(request, 'query_params', request.GET)
+        requested = parse_field_names(params.get('fields'))
+        expand = parse_field_names(params.get('expand')) if 'expand' in params else None
+        expandable = {name for name, field in fields.items() if isinstance(field, serializers.BaseSerializer)}
+
+        errors = {}
+        if requested - set(fields):
+            errors['fields'] = f"Unknown fields: {', '.join(sorted(requested - set(fields)))}."
+        if expand and expand - expandable:
+            errors['expand'] = f"Cannot expand: {', '.join(sorted(expand - expandable))}."
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        keep = requested | (expand or set()) if requested else set(fields)
+        if expand is not None:
+            keep -= expandable - expand
+        return {name: field for name, field in fields.items() if name in keep}
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def parse_field_names(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
 
 
 # Serializer for UserProfile
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the UserProfile model.
     Handles serialization and validation of user profile data.
     """
+    # Unique fields and the error reported when a value is already in use
+    UNIQUE_FIELDS = {
+        'username': "This username is already taken.",
+        'email': "A user with this email already exists.",
+    }
 
     class Meta:
         model = UserProfile
         fields = ['id', 'username', 'email', 'role', 'created_at', 'updated_at']
+        # Uniqueness is checked in validate() with one query instead of one per field
+        extra_kwargs = {
+            'username': {'validators': []},
+            'email': {'validators': []},
+        }
 
-    def validate_email(self, value):
+    @classmethod
+    def find_taken_values(cls, items):
         """
-        Validate that the email is in the correct format and unique.
+        Return `{field: {value: pk}}` for every unique value in `items` that is
+        already stored, using a single query for any number of items.
+        Values repeated within `items` are reported as taken by no row (pk 0).
         """
-        if UserProfile.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
+        lookups = Q()
+        wanted = {}
+        for field in cls.UNIQUE_FIELDS:
+            # Other types are left to field validation to reject
+            values = [item.get(field) for item in items if isinstance(item.get(field), str) and item.get(field)]
+            wanted[field] = values
+            if values:
+                lookups |= Q(**{f"{field}__in": set(values)})
+
+        taken = {field: {} for field in cls.UNIQUE_FIELDS}
+        if lookups:
+            for row in UserProfile.objects.filter(lookups).values('pk', *cls.UNIQUE_FIELDS):
+                for field in cls.UNIQUE_FIELDS:
+                    taken[field][row[field]] = row['pk']
+        for field, values in wanted.items():
+            seen = set()
+            for value in values:
+                if value in seen:
+                    taken[field].setdefault(value, 0)
+                seen.add(value)
+        return taken
 
-    def validate_username(self, value):
+    def validate(self, attrs):
         """
-        Validate that the username is unique.
+        Validate that the username and email are unique.
+        Bulk requests resolve all values up front and pass them as `taken_values`.
         """
-        if UserProfile.objects.filter(username=value).exists():
-            raise serializers.ValidationError("This username is already taken.")
-        return value
+        taken = self.context.get('taken_values')
+        if taken is None:
+            taken = self.find_taken_values([attrs])
+        own_pk = self.instance.pk if self.instance is not None else None
+        errors = {
+            field: message
+            for field, message in self.UNIQUE_FIELDS.items()
+            if field in attrs and taken[field].get(attrs[field], own_pk) != own_pk
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    @classmethod
+    def unique_violation(cls, exc):
+        """
+        Map an IntegrityError from the unique constraints to a validation error.
+        """
+        message = str(exc)
+        errors = {field: text for field, text in cls.UNIQUE_FIELDS.items() if field in message}
+        return serializers.ValidationError(errors or {"error": "A user with these details already exists."})
 
     def validate_role(self, value):
         """
@@ -41,32 +143,74 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Override the create method to handle the creation of a UserProfile.
+        A concurrent insert of the same username or email is caught by the
+        database constraint and reported like any other validation error.
         """
-        user_profile = UserProfile.objects.create(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            role=validated_data['role'],
-        )
+        try:
+            with transaction.atomic():
+                user_profile = UserProfile.objects.create(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    role=validated_data['role'],
+                )
+        except IntegrityError as exc:
+            raise self.unique_violation(exc)
         return user_profile
 
+    def update(self, instance, validated_data):
+        """
+        Map unique constraint races on update to validation errors as well.
+        """
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as exc:
+            raise self.unique_violation(exc)
+
 
 # Serializer for ChildProfile
-class ChildProfileSerializer(serializers.ModelSerializer):
+class ChildProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the ChildProfile model.
     Provides nested user details using the UserProfileSerializer.
     """
     user = UserProfileSerializer(read_only=True)
+    user_id = serializers.IntegerField(write_only=True, required=False)
 
     class Meta:
         model = ChildProfile
-        fields = ['id', 'user', 'name', 'age', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'user_id', 'name', 'age', 'created_at', 'updated_at']
+
+    def validate_user_id(self, value):
+        """
+        Validate that the linked user profile exists.
+        Bulk requests resolve all ids up front and pass them as `known_user_ids`.
+        """
+        known_user_ids = self.context.get('known_user_ids')
+        if known_user_ids is not None:
+            exists = value in known_user_ids
+        else:
+            exists = UserProfile.objects.filter(pk=value).exists()
+        if not exists:
+            raise serializers.ValidationError("User profile does not exist.")
+        return value
+
+    def validate(self, attrs):
+        """
+        New child profiles must be linked to a user, by id or through the context.
+        """
+        if self.instance is None and 'user_id' not in attrs and not self.context.get('user'):
+            raise serializers.ValidationError({"user_id": "User must be provided."})
+        return attrs
 
     def create(self, validated_data):
         """
         Override the create method to handle the creation of a ChildProfile.
         """
-        # Extract the user from the context
+        # Use the explicit user_id, falling back to the user from the context
+        if 'user_id' in validated_data:
+            return ChildProfile.objects.create(**validated_data)
+
         user = self.context.get('user')
         if not user:
             raise serializers.ValidationError("User must be provided.")
@@ -76,7 +220,7 @@ class ChildProfileSerializer(serializers.ModelSerializer):
 
 
 # Serializer for Resource
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Resource model.
     Handles educational resources like videos, articles, or games.
@@ -96,7 +240,7 @@ class ResourceSerializer(serializers.ModelSerializer):
 
 
 # Serializer for PhoneticsModule
-class PhoneticsModuleSerializer(serializers.ModelSerializer):
+class PhoneticsModuleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the PhoneticsModule model.
     Includes nested resources for detailed information about associated educational content.
@@ -105,7 +249,12 @@ class PhoneticsModuleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PhoneticsModule
-        fields = ['id', 'title', 'description', 'audio_file', 'resources', 'created_at', 'updated_at']
+        fields = [
+            'id', 'title', 'description', 'audio_file', 'audio_status', 'audio_duration', 'audio_waveform',
+            'min_age', 'max_age', 'resources', 'created_at', 'updated_at',
+        ]
+        # Set by the audio pipeline (edu/audio.py)
+        read_only_fields = ['audio_status', 'audio_duration', 'audio_waveform']
 
     def validate_title(self, value):
         """
@@ -117,7 +266,7 @@ class PhoneticsModuleSerializer(serializers.ModelSerializer):
 
 
 # Serializer for MathModule
-class MathModuleSerializer(serializers.ModelSerializer):
+class MathModuleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the MathModule model.
     Includes nested resources for detailed information about associated educational content.
@@ -126,7 +275,7 @@ class MathModuleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MathModule
-        fields = ['id', 'title', 'description', 'difficulty_level', 'resources', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'description', 'difficulty_level', 'min_age', 'max_age', 'resources', 'created_at', 'updated_at']
 
     def validate_difficulty_level(self, value):
         """
@@ -138,7 +287,7 @@ class MathModuleSerializer(serializers.ModelSerializer):
 
 
 # Serializer for STEMModule
-class STEMModuleSerializer(serializers.ModelSerializer):
+class STEMModuleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the STEMModule model.
     Includes nested resources for detailed information about associated educational content.
@@ -147,7 +296,7 @@ class STEMModuleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = STEMModule
-        fields = ['id', 'title', 'description', 'video_url', 'resources', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'description', 'video_url', 'min_age', 'max_age', 'resources', 'created_at', 'updated_at']
 
     def validate_video_url(self, value):
         """
@@ -156,3 +305,91 @@ class STEMModuleSerializer(serializers.ModelSerializer):
         if not value.startswith(('http://', 'https://')):
             raise serializers.ValidationError("Video URL must start with 'http://' or 'https://'.")
         return value
+
+
+# Serializers for the combined catalog
+class CatalogResourceIdsMixin(serializers.Serializer):
+    """
+    Replaces the nested `resources` list with resource ids; the catalog
+    returns each resource once at the top level instead.
+    Expects `resource_ids` (`{module_id: [resource_id, ...]}`) in the context.
+    """
+    resources = serializers.SerializerMethodField()
+
+    def get_resources(self, obj):
+        return self.context['resource_ids'].get(obj.pk, [])
+
+
+class PhoneticsModuleCatalogSerializer(CatalogResourceIdsMixin, PhoneticsModuleSerializer):
+    class Meta(PhoneticsModuleSerializer.Meta):
+        pass
+
+
+class MathModuleCatalogSerializer(CatalogResourceIdsMixin, MathModuleSerializer):
+    class Meta(MathModuleSerializer.Meta):
+        pass
+
+
+class STEMModuleCatalogSerializer(CatalogResourceIdsMixin, STEMModuleSerializer):
+    class Meta(STEMModuleSerializer.Meta):
+        pass
+
+
+# Serializer for ingested progress events
+class ProgressEventSerializer(serializers.Serializer):
+    """
+    Validates one progress event and maps its type names to the stored codes.
+    Batches resolve every child and module up front and pass them as
+    `known_child_ids` and `known_module_ids` (`{module_type_code: {id, ...}}`).
+    """
+    EVENT_TYPES = {name: code for code, name in ProgressEvent.EVENT_TYPE_CHOICES}
+    MODULE_TYPES = {name: code for code, name in ProgressEvent.MODULE_TYPE_CHOICES}
+    MODULE_MODELS = {1: PhoneticsModule, 2: MathModule, 3: STEMModule}
+
+    child_id = serializers.IntegerField(min_value=1)
+    event_type = serializers.ChoiceField(choices=list(EVENT_TYPES))
+    module_type = serializers.ChoiceField(choices=list(MODULE_TYPES))
+    module_id = serializers.IntegerField(min_value=1)
+    value = serializers.IntegerField(required=False, allow_null=True)
+    occurred_at = serializers.DateTimeField(required=False)
+
+    def validate_child_id(self, value):
+        known_child_ids = self.context.get('known_child_ids')
+        if known_child_ids is not None:
+            exists = value in known_child_ids
+        else:
+            exists = ChildProfile.objects.filter(pk=value).exists()
+        if not exists:
+            raise serializers.ValidationError("Child profile does not exist.")
+        return value
+
+    def validate(self, attrs):
+        attrs['event_type'] = self.EVENT_TYPES[attrs['event_type']]
+        attrs['module_type'] = self.MODULE_TYPES[attrs['module_type']]
+        known_module_ids = self.context.get('known_module_ids')
+        if known_module_ids is not None:
+            exists = attrs['module_id'] in known_module_ids.get(attrs['module_type'], ())
+        else:
+            exists = self.MODULE_MODELS[attrs['module_type']].objects.filter(pk=attrs['module_id']).exists()
+        if not exists:
+            raise serializers.ValidationError({"module_id": "Module does not exist."})
+        attrs.setdefault('occurred_at', timezone.now())
+        return attrs
+
+
+# Serializer for ModuleCompletion
+class ModuleCompletionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for a child's completion of a module.
+    `completed_at` defaults to now.
+    """
+    class Meta:
+        model = ModuleCompletion
+        fields = ['id', 'module_type', 'module_id', 'completed_at']
+        extra_kwargs = {'completed_at': {'required': False}}
+
+    def validate(self, attrs):
+        if not MODULE_MODELS[attrs['module_type']].objects.filter(pk=attrs['module_id']).exists():
+            raise serializers.ValidationError({"module_id": "Module does not exist."})
+        attrs.setdefault('completed_at', timezone.now())
+        return attrs
@@ -0,0 +1,189 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from rest_framework.authtoken.models import Token
+
+from .access import invalidate_all_groups, invalidate_user_groups
+from .audio import audio_pipeline
+from .authentication import invalidate_tokens
+from .caching import bump_model_version
+from .events import EVENT_MODELS, publish_changes
+from .search import SEARCH_MODELS, get_search_backend
+from .models import AudioRendition, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule, Tombstone
+
+
+# Models whose cached API responses are invalidated on write
+CATALOG_MODELS = (Resource, PhoneticsModule, MathModule, STEMModule)
+
+# Models exposed through the delta sync feed; deletes leave a tombstone
+SYNC_MODELS = (ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule)
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Bump the cache version of a catalog model whenever a row is saved or deleted.
+    """
+    bump_model_version(sender)
+
+
+def invalidate_catalog_cache_on_m2m(sender, instance, action, model, **kwargs):
+    """
+    Bump both sides of a module/resource link when it is added, removed or cleared.
+    """
+    if not action.startswith('post_'):
+        return
+    for changed in (type(instance), model):
+        if changed in CATALOG_MODELS:
+            bump_model_version(changed)
+
+
+def publish_save(sender, instance, **kwargs):
+    """
+    Notify change stream subscribers of a saved row once it is committed.
+    """
+    publish_changes(sender, [instance.pk])
+
+
+def publish_delete(sender, instance, **kwargs):
+    """
+    Notify change stream subscribers of a deleted row once it is committed.
+    """
+    publish_changes(sender, [instance.pk], 'deleted')
+
+
+def publish_link_change(sender, instance, action, reverse, pk_set, model, **kwargs):
+    """
+    Modules embed their resources, so linking or unlinking changes the module.
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        publish_changes(type(instance), [instance.pk])
+    elif pk_set:
+        publish_changes(model, pk_set)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Leave a tombstone behind when a synced row is deleted.
+    """
+    Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
+
+
+def update_search_index(sender, instance, **kwargs):
+    """
+    Re-index a searchable row after it is saved.
+    """
+    get_search_backend().index([instance])
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    """
+    Drop a searchable row from the index when it is deleted.
+    """
+    get_search_backend().remove(sender, [instance.pk])
+
+
+def invalidate_group_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Forget cached groups of users added to or removed from a group.
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_groups([instance.pk])
+    elif action == 'post_clear':
+        invalidate_all_groups()  # pk_set is not provided for clear()
+    else:
+        invalidate_user_groups(pk_set)
+
+
+def invalidate_groups(sender, **kwargs):
+    """
+    Forget every user's cached groups when a group is renamed or deleted.
+    """
+    invalidate_all_groups()
+
+
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Stop authenticating with a token as soon as it is deleted.
+    """
+    invalidate_tokens([instance.key])
+
+
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """
+    Re-resolve a user's tokens after the user changes (e.g. is deactivated).
+    """
+    if not created:
+        invalidate_tokens(Token.objects.filter(user=instance).values_list('key', flat=True))
+
+
+def detect_audio_upload(sender, instance, update_fields=None, **kwargs):
+    """
+    Mark a phonetics module's audio as pending when a new file is uploaded
+    (and clear its metadata when the file is removed).
+    """
+    if update_fields is not None and 'audio_file' not in update_fields:
+        return
+    name = instance.audio_file.name or ''
+    if instance._state.adding:
+        changed = bool(name)
+    elif not instance.audio_file._committed:
+        changed = True  # A new upload, even if it has the old file's name
+    else:
+        changed = name != (sender.objects.filter(pk=instance.pk).values_list('audio_file', flat=True).first() or '')
+    if changed:
+        instance._audio_changed = True
+        instance.audio_status = 'pending' if name else ''
+        instance.audio_duration = instance.audio_waveform = None
+
+
+def process_audio_upload(sender, instance, **kwargs):
+    """
+    Queue a new upload for the audio pipeline once the transaction commits.
+    """
+    if not getattr(instance, '_audio_changed', False):
+        return
+    instance._audio_changed = False
+    if instance.audio_file:
+        transaction.on_commit(lambda pk=instance.pk: audio_pipeline.submit(pk))
+    else:
+        instance.audio_renditions.all().delete()
+
+
+def delete_rendition_file(sender, instance, **kwargs):
+    """
+    Remove a rendition's file from storage once its row is gone for good.
+    """
+    storage, name = instance.file.storage, instance.file.name
+    if name:
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+# Receivers are connected per sender so unrelated models keep Django's
+# fast-delete path (it is disabled for any model with delete receivers).
+for catalog_model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_cache, sender=catalog_model)
+    post_delete.connect(invalidate_catalog_cache, sender=catalog_model)
+for module_model in (PhoneticsModule, MathModule, STEMModule):
+    m2m_changed.connect(invalidate_catalog_cache_on_m2m, sender=module_model.resources.through)
+m2m_changed.connect(invalidate_group_membership, sender=User.groups.through)
+post_save.connect(invalidate_groups, sender=Group)
+post_delete.connect(invalidate_token, sender=Token)
+post_save.connect(invalidate_user_tokens, sender=User)
+post_delete.connect(invalidate_groups, sender=Group)
+pre_save.connect(detect_audio_upload, sender=PhoneticsModule)
+post_save.connect(process_audio_upload, sender=PhoneticsModule)
+post_delete.connect(delete_rendition_file, sender=AudioRendition)
+for event_model in EVENT_MODELS:
+    post_save.connect(publish_save, sender=event_model)
+    post_delete.connect(publish_delete, sender=event_model)
+for module_model in (PhoneticsModule, MathModule, STEMModule):
+    m2m_changed.connect(publish_link_change, sender=module_model.resources.through)
+for sync_model in SYNC_MODELS:
+    post_delete.connect(record_tombstone, sender=sync_model)
+for search_model in SEARCH_MODELS:
+    post_save.connect(update_search_index, sender=search_model)
+    post_delete.connect(remove_from_search_index, sender=search_model)
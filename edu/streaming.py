@@ -0,0 +1,43 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+# Chunks pulled from a sync iterator per worker-thread hop
+BATCH_SIZE = 64
+
+
+def _take(iterator, count):
+    chunks = []
+    for chunk in iterator:
+        chunks.append(chunk)
+        if len(chunks) == count:
+            break
+    return chunks
+
+
+async def _iterate_in_thread(iterator):
+    try:
+        while chunks := await sync_to_async(_take)(iterator, BATCH_SIZE):
+            for chunk in chunks:
+                yield chunk
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def stream_content(request, iterator):
+    """
+    Return `iterator` as the body of a streaming response. Under ASGI it is
+    wrapped in an async iterator that pulls a batch of chunks per
+    worker-thread hop; Django would otherwise read a sync iterator to the
+    end, into memory, before sending anything. Thread-sensitive hops keep
+    database cursors on the thread that opened them.
+    """
+    if is_asgi(request):
+        return _iterate_in_thread(iter(iterator))
+    return iterator
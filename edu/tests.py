@@ -1,7 +1,44 @@
-from django.test import TestCase
-from rest_framework.test import APIClient
-from django.contrib.auth.models import User
-from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule
+import datetime
+import decimal
+import gzip
+import asyncio
+import json
+import os
+import unittest
+import wave
+import tempfile
+from io import StringIO
+from unittest import mock
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import resolve
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from django.contrib.auth.models import Group, User
+from .models import (
+    UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule, Tombstone, AudioRendition,
+    ModuleCompletion, Recommendation, ProgressEvent, ChildProgressSummary, ModuleProgressSummary,
+)
+from .caching import response_cache_metrics
+from .authentication import _token_cache_key, get_local_token_cache, token_cache_metrics
+from .ingestion import event_buffer
+from .throttling import LocalCounterStore, throttles
+from .views import ResourceDetailView, ResourceListCreateView, SearchView
+from .async_views import async_view
+from .events import RESET_MESSAGE, ChangeEvent, Subscription, change_broker
+from rest_framework.authtoken.models import Token
+from .recommendations import age_band_for, refresh_recommendations
+from .serializers import UserProfileSerializer, PhoneticsModuleSerializer
+from .audio import process_module, resample
+from .middleware import choose_encoding
+from .media import RangeNotSatisfiable, parse_range
+from .renderers import FastJSONRenderer, msgpack
 
 
 class UserProfileTests(TestCase):
@@ -102,3 +139,1734 @@ class UserProfileTests(TestCase):
 
 
 
+class QueryBudgetTests(TestCase):
+    """
+    Each list/detail endpoint must run a fixed number of queries,
+    no matter how many rows are on the page.
+    """
+    # Endpoint URL -> expected number of queries (validator + count + page + prefetches)
+    LIST_BUDGETS = {
+        '/api/v1/user-profiles/': 3,
+        '/api/v1/child-profiles/': 3,
+        '/api/v1/resources/': 3,
+        '/api/v1/phonetics-modules/': 4,
+        '/api/v1/math-modules/': 4,
+        '/api/v1/stem-modules/': 4,
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def create_rows(self, count):
+        """
+        Create `count` rows for every model, each module linked to two resources.
+        """
+        offset = UserProfile.objects.count()
+        for i in range(offset, offset + count):
+            profile = UserProfile.objects.create(username=f"user{i}", email=f"user{i}@example.com", role="parent")
+            ChildProfile.objects.create(user=profile, name=f"Child {i}", age=5)
+            resources = [
+                Resource.objects.create(title=f"Resource {i}-{j}", description="Description", content_url="http://example.com")
+                for j in range(2)
+            ]
+            for model in (PhoneticsModule, MathModule, STEMModule):
+                module = model.objects.create(title=f"Module {i}", description="Description")
+                module.resources.set(resources)
+
+    def test_list_endpoints_run_constant_queries(self):
+        """
+        Query counts stay within budget for both a small and a full page.
+        """
+        for rows in (1, 9):
+            self.create_rows(rows)
+            for url, budget in self.LIST_BUDGETS.items():
+                with self.subTest(url=url, rows=rows), self.assertNumQueries(budget):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_detail_endpoints_run_constant_queries(self):
+        """
+        Detail endpoints fetch the object and its nested relations in a fixed number of queries.
+        """
+        self.create_rows(1)
+        budgets = {
+            f"/api/v1/child-profiles/{ChildProfile.objects.get().pk}/": 1,
+            f"/api/v1/math-modules/{MathModule.objects.get().pk}/": 2,
+            f"/api/v1/phonetics-modules/{PhoneticsModule.objects.get().pk}/": 2,
+            f"/api/v1/stem-modules/{STEMModule.objects.get().pk}/": 2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Keyset pagination walks a collection by `(created_at, id)` without counting it.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        self.resources = [
+            Resource.objects.create(title=f"Resource {i}", description="Description", content_url="http://example.com")
+            for i in range(25)
+        ]
+
+    def test_walks_all_rows_in_order(self):
+        """
+        Following `next` links visits every row exactly once, in creation order.
+        """
+        seen = []
+        url = '/api/v1/resources/?pagination=keyset&page_size=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [resource.id for resource in self.resources])
+
+    def test_deep_page_runs_no_count_query(self):
+        """
+        A page fetched from a cursor is a single query, however deep it is.
+        """
+        first = self.client.get('/api/v1/resources/?pagination=keyset&page_size=20')
+        with self.assertNumQueries(1):
+            response = self.client.get(first.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        """
+        A malformed cursor returns a 400 instead of a server error.
+        """
+        response = self.client.get('/api/v1/resources/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_number_mode_is_default(self):
+        """
+        Without opting in, list endpoints keep their page-number responses.
+        """
+        response = self.client.get('/api/v1/resources/')
+        self.assertEqual(response.data['count'], 25)
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Catalog responses are served from cache until a dependent model changes.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        response_cache_metrics.reset()
+        self.resource = Resource.objects.create(title="Counting", description="Description", content_url="http://example.com")
+        self.module = MathModule.objects.create(title="Math 101", description="Learn Math")
+        self.module.resources.add(self.resource)
+
+    def test_second_request_is_served_from_cache(self):
+        """
+        A repeated GET runs no queries and is reported as a hit.
+        """
+        first = self.client.get('/api/v1/math-modules/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/math-modules/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+        stats = response_cache_metrics.snapshot()['MathModuleListCreateView']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_query_params_are_part_of_the_key(self):
+        """
+        Different query strings are cached separately.
+        """
+        self.client.get('/api/v1/math-modules/')
+        response = self.client.get('/api/v1/math-modules/?page_size=5')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_scheme_is_part_of_the_key(self):
+        """
+        Payloads hold absolute URLs, so http and https responses are cached separately.
+        """
+        self.client.get('/api/v1/math-modules/')
+        response = self.client.get('/api/v1/math-modules/', secure=True)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_nested_resource_change_invalidates_module_list(self):
+        """
+        Editing a resource invalidates module responses that embed it.
+        """
+        self.client.get('/api/v1/math-modules/')
+        self.resource.title = "Counting to ten"
+        self.resource.save()
+        response = self.client.get('/api/v1/math-modules/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['resources'][0]['title'], "Counting to ten")
+
+    def test_m2m_change_invalidates_detail(self):
+        """
+        Unlinking a resource from a module invalidates the module detail.
+        """
+        url = f"/api/v1/math-modules/{self.module.pk}/"
+        self.client.get(url)
+        self.module.resources.remove(self.resource)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['resources'], [])
+
+    def test_cached_detail_still_returns_404_for_deleted_rows(self):
+        """
+        Deleting a module invalidates its cached detail response.
+        """
+        url = f"/api/v1/math-modules/{self.module.pk}/"
+        self.client.get(url)
+        self.module.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    List and detail endpoints answer conditional GETs with 304 when nothing changed.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        self.profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        self.child = ChildProfile.objects.create(user=self.profile, name="Ada", age=4)
+        self.resource = Resource.objects.create(title="Counting", description="Description", content_url="http://example.com")
+        self.module = STEMModule.objects.create(title="Magnets", description="Description")
+        self.module.resources.add(self.resource)
+
+    def test_list_returns_304_for_matching_etag(self):
+        """
+        Re-sending the list ETag returns 304 without counting or fetching the page.
+        """
+        first = self.client.get('/api/v1/child-profiles/')
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/child-profiles/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_changes_after_update(self):
+        """
+        Editing a row changes the list validator.
+        """
+        first = self.client.get('/api/v1/child-profiles/')
+        self.child.age = 5
+        self.child.save()
+        response = self.client.get('/api/v1/child-profiles/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_list_etag_changes_after_delete(self):
+        """
+        Deleting a row changes the row count, and therefore the validator.
+        """
+        ChildProfile.objects.create(user=self.profile, name="Grace", age=6)
+        first = self.client.get('/api/v1/child-profiles/')
+        self.child.delete()
+        response = self.client.get('/api/v1/child-profiles/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_etag_tracks_nested_resources(self):
+        """
+        Unlinking a nested resource changes the module's detail ETag.
+        """
+        url = f"/api/v1/stem-modules/{self.module.pk}/"
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.module.resources.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_if_modified_since(self):
+        """
+        A client holding the current Last-Modified date gets a 304.
+        """
+        url = f"/api/v1/child-profiles/{self.child.pk}/"
+        first = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(EDU_SYNC_SETTLE_SECONDS=0)
+class SyncFeedTests(TestCase):
+    """
+    The delta sync feed returns rows changed and deleted since a watermark.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        self.children = [ChildProfile.objects.create(user=self.profile, name=f"Child {i}", age=4) for i in range(3)]
+
+    def test_full_sync_returns_everything(self):
+        """
+        Without `updated_since` every row is returned and nothing is deleted.
+        """
+        response = self.client.get('/api/v1/sync/child-profiles/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['changed']], [child.id for child in self.children])
+        self.assertEqual(response.data['deleted'], [])
+
+    def test_incremental_sync_returns_changes_and_tombstones(self):
+        """
+        A sync from the previous watermark sees only the edit and the delete.
+        """
+        watermark = self.client.get('/api/v1/sync/child-profiles/').data['watermark']
+        edited, deleted = self.children[0], self.children[1]
+        edited.age = 5
+        edited.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        response = self.client.get('/api/v1/sync/child-profiles/', {'updated_since': watermark})
+        self.assertEqual([row['id'] for row in response.data['changed']], [edited.id])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+
+    def test_changed_rows_are_paginated(self):
+        """
+        Large change sets are split into keyset pages linked by `next`.
+        """
+        response = self.client.get('/api/v1/sync/child-profiles/', {'page_size': 2})
+        self.assertEqual(len(response.data['changed']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['changed']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_pages_share_the_first_page_window(self):
+        """
+        A row deleted while later pages are fetched is left for the next sync,
+        and every page reports the same watermark.
+        """
+        since = self.client.get('/api/v1/sync/child-profiles/').data['watermark']
+        for child in self.children:
+            child.save()
+        first = self.client.get('/api/v1/sync/child-profiles/', {'updated_since': since, 'page_size': 2})
+        self.assertEqual(len(first.data['changed']), 2)
+        deleted_id = self.children[0].id
+        self.children[0].delete()
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(second.data['watermark'], first.data['watermark'])
+        self.assertEqual(second.data['deleted'], [])
+        self.assertEqual([row['id'] for row in second.data['changed']], [self.children[2].id])
+
+        response = self.client.get('/api/v1/sync/child-profiles/', {'updated_since': second.data['watermark']})
+        self.assertEqual(response.data['deleted'], [deleted_id])
+
+    def test_tombstone_is_recorded_on_delete(self):
+        """
+        Deleting a synced row leaves a tombstone with its model label.
+        """
+        child_id = self.children[2].id
+        self.children[2].delete()
+        self.assertTrue(Tombstone.objects.filter(model='edu.childprofile', object_id=child_id).exists())
+
+    def test_invalid_watermark_and_unknown_feed(self):
+        """
+        Bad input is reported as 400 and unknown feeds as 404.
+        """
+        self.assertEqual(self.client.get('/api/v1/sync/child-profiles/', {'updated_since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/sync/widgets/').status_code, 404)
+
+
+class ExplainQueriesCommandTests(TestCase):
+    """
+    The explain_queries command checks endpoint and admin query plans.
+    """
+    def test_registered_queries_use_indexes(self):
+        """
+        Every endpoint and admin query is served by an index.
+        """
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('0 queries with full scans.', out.getvalue())
+        self.assertIn('sync-feed[child-profiles]', out.getvalue())
+
+    def test_full_scan_detection(self):
+        """
+        Plain table scans and temporary sorts are flagged; index scans are not.
+        """
+        from .management.commands.explain_queries import find_full_scans
+        self.assertEqual(find_full_scans("2 0 0 SCAN edu_resource", 'sqlite'), ["2 0 0 SCAN edu_resource"])
+        self.assertTrue(find_full_scans("7 0 0 USE TEMP B-TREE FOR ORDER BY", 'sqlite'))
+        self.assertFalse(find_full_scans("8 0 0 SCAN edu_resource USING INDEX resource_created_idx", 'sqlite'))
+        self.assertTrue(find_full_scans("Seq Scan on edu_resource  (cost=0.00..1.01 rows=1)", 'postgresql'))
+
+
+class BulkEndpointTests(TestCase):
+    """
+    List endpoints accept arrays for batch create, update and delete.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        self.profile = UserProfile.objects.create(username="teacher", email="teacher@example.com", role="teacher")
+
+    def test_bulk_create_child_profiles_in_constant_queries(self):
+        """
+        A whole class is created with a fixed number of queries.
+        """
+        payload = [{"user_id": self.profile.id, "name": f"Child {i}", "age": 5} for i in range(50)]
+        with self.assertNumQueries(4):  # user lookup, savepoint, insert, release
+            response = self.client.post('/api/v1/child-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 50)
+        self.assertEqual(ChildProfile.objects.filter(user=self.profile).count(), 50)
+        self.assertEqual(len({result['id'] for result in response.data['results']}), 50)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        """
+        One invalid item rejects the batch and is reported by index.
+        """
+        payload = [
+            {"title": "Good", "description": "Description", "content_url": "http://example.com"},
+            {"title": "Bad", "description": "Description", "content_url": "ftp://example.com"},
+        ]
+        response = self.client.post('/api/v1/resources/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][0]['index'], 1)
+        self.assertFalse(Resource.objects.exists())
+
+    def test_bulk_create_rejects_unknown_user(self):
+        """
+        Child profiles pointing at a missing user profile fail validation.
+        """
+        payload = [{"user_id": self.profile.id + 100, "name": "Ghost", "age": 5}]
+        response = self.client.post('/api/v1/child-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user_id', response.data['results'][0]['errors'])
+
+    def test_bulk_update_and_delete_resources(self):
+        """
+        Updates bump `updated_at` and invalidate the cache; deletes leave tombstones.
+        """
+        resources = [
+            Resource.objects.create(title=f"Resource {i}", description="Description", content_url="http://example.com")
+            for i in range(3)
+        ]
+        before = self.client.get('/api/v1/resources/')
+        response = self.client.patch(
+            '/api/v1/resources/', [{"id": resource.id, "title": "Renamed"} for resource in resources], format='json'
+        )
+        self.assertEqual(response.data['updated'], 3)
+        after = self.client.get('/api/v1/resources/')
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual({item['title'] for item in after.data['results']}, {"Renamed"})
+
+        response = self.client.delete('/api/v1/resources/', [resources[0].id, 999999], format='json')
+        self.assertEqual(response.data['deleted'], 1)
+        self.assertEqual(response.data['results'][1]['status'], 'not_found')
+        self.assertTrue(Tombstone.objects.filter(model='edu.resource', object_id=resources[0].id).exists())
+
+    def test_bulk_update_and_delete_check_object_permissions(self):
+        """
+        Rows the detail endpoint would refuse to change are refused in bulk too, and nothing is written.
+        """
+        child = ChildProfile.objects.create(user=self.profile, name="Ada", age=5)
+        resource = Resource.objects.create(title="Counting", description="Description", content_url="http://example.com")
+        creator = User.objects.create_user(username='creator', password='password123')
+        creator.groups.add(Group.objects.create(name='resource_creator'))
+        self.client.force_authenticate(user=creator)
+        for url, obj in (('/api/v1/child-profiles/', child), ('/api/v1/resources/', resource)):
+            with self.subTest(url=url):
+                response = self.client.patch(url, [{"id": obj.id, "title": "pwned", "name": "pwned"}], format='json')
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(self.client.delete(url, [obj.id], format='json').status_code, 403)
+                self.assertEqual(self.client.delete(f"{url}{obj.id}/").status_code, 403)
+        child.refresh_from_db()
+        resource.refresh_from_db()
+        self.assertEqual((child.name, resource.title), ("Ada", "Counting"))
+
+
+class UserProfileUniquenessTests(TestCase):
+    """
+    Username and email uniqueness is checked with one set-based query.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.existing = UserProfile.objects.create(username="taken", email="taken@example.com", role="parent")
+
+    def test_single_create_uses_one_uniqueness_query(self):
+        """
+        Creating a profile checks both unique fields in one query.
+        """
+        payload = {"username": "new", "email": "new@example.com", "role": "teacher"}
+        with self.assertNumQueries(4):  # uniqueness check, savepoint, insert, release
+            response = self.client.post('/api/v1/user-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_duplicate_values_are_reported_per_field(self):
+        """
+        Both taken fields are reported with their own message.
+        """
+        payload = {"username": "taken", "email": "taken@example.com", "role": "teacher"}
+        response = self.client.post('/api/v1/user-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(str(response.data['username'][0]), "This username is already taken.")
+        self.assertEqual(str(response.data['email'][0]), "A user with this email already exists.")
+
+    def test_update_keeps_own_values(self):
+        """
+        Re-saving a profile with its own username and email is valid.
+        """
+        serializer = UserProfileSerializer(self.existing, data={"username": "taken", "email": "taken@example.com", "role": "admin"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_race_is_mapped_from_integrity_error(self):
+        """
+        A row inserted after validation surfaces as a validation error, not a 500.
+        """
+        serializer = UserProfileSerializer(data={"username": "racer", "email": "racer@example.com", "role": "parent"})
+        self.assertTrue(serializer.is_valid())
+        UserProfile.objects.create(username="racer", email="other@example.com", role="parent")
+        with self.assertRaises(ValidationError) as context:
+            serializer.save()
+        self.assertIn('username', context.exception.detail)
+
+    def test_bulk_import_checks_uniqueness_once(self):
+        """
+        A bulk import resolves uniqueness for every row in one query, including in-batch duplicates.
+        """
+        payload = [{"username": f"user{i}", "email": f"user{i}@example.com", "role": "parent"} for i in range(100)]
+        with self.assertNumQueries(4):  # uniqueness check, savepoint, insert, release
+            response = self.client.post('/api/v1/user-profiles/', payload, format='json')
+        self.assertEqual(response.data['created'], 100)
+
+        payload = [
+            {"username": "dup", "email": "dup1@example.com", "role": "parent"},
+            {"username": "dup", "email": "dup2@example.com", "role": "parent"},
+        ]
+        response = self.client.post('/api/v1/user-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['invalid'], 2)
+
+    def test_bulk_values_of_the_wrong_type_are_rejected(self):
+        """
+        Non-string usernames and emails fail field validation instead of the uniqueness lookup.
+        """
+        payload = [{"username": ["x"], "email": {"a": 1}, "role": "parent"}]
+        response = self.client.post('/api/v1/user-profiles/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('username', response.data['results'][0]['errors'])
+
+    def test_profiles_cannot_be_updated_or_deleted_in_bulk(self):
+        """
+        Only bulk create is offered; changes go through the permission-checked detail endpoint.
+        """
+        response = self.client.patch('/api/v1/user-profiles/', [{"id": self.existing.id, "username": "x"}], format='json')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(self.client.delete('/api/v1/user-profiles/', [self.existing.id], format='json').status_code, 405)
+        self.assertTrue(UserProfile.objects.filter(pk=self.existing.pk).exists())
+
+
+class ExportTests(TestCase):
+    """
+    Exports stream every row as CSV or NDJSON, scoped like IsOwnerOrAdmin.
+    """
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        for i in range(5):
+            ChildProfile.objects.create(user=self.profile, name=f"Child, {i}", age=4 + i)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_all_rows(self):
+        """
+        The CSV export has a header and one properly quoted line per child.
+        """
+        response = self.client.get('/api/v1/exports/child-profiles/')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.read(response).splitlines()
+        self.assertEqual(lines[0], 'id,user_id,user__username,name,age,created_at,updated_at')
+        self.assertEqual(len(lines), 6)
+        self.assertIn('"Child, 0"', lines[1])
+
+    def test_export_accepts_its_own_media_types(self):
+        """
+        Clients asking for the export's media type get the stream, not a 406.
+        """
+        for file_format, accept in (('csv', 'text/csv'), ('ndjson', 'application/x-ndjson')):
+            response = self.client.get('/api/v1/exports/child-profiles/', {'export_format': file_format}, HTTP_ACCEPT=accept)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'], accept)
+            self.assertEqual(len(self.read(response).splitlines()), 6 if file_format == 'csv' else 5)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        """
+        Under ASGI the export body is an async iterator, so rows are not all read into memory first.
+        """
+        token = await Token.objects.acreate(user=self.admin)
+        response = await AsyncClient().get('/api/v1/exports/child-profiles/', headers={'Authorization': f'Token {token.key}'})
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_ndjson_export(self):
+        """
+        The NDJSON export has one JSON object per line.
+        """
+        response = self.client.get('/api/v1/exports/user-profiles/', {'export_format': 'ndjson'})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(rows, [{
+            "id": self.profile.id, "username": "parent", "email": "parent@example.com", "role": "parent",
+            "created_at": rows[0]['created_at'], "updated_at": rows[0]['updated_at'],
+        }])
+
+    def test_non_admin_sees_only_owned_rows(self):
+        """
+        Non-admin users are not owners of these rows, so the export is empty.
+        """
+        self.client.force_authenticate(user=User.objects.create_user(username='guest', password='password123'))
+        lines = self.read(self.client.get('/api/v1/exports/child-profiles/')).splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_management_command(self):
+        """
+        export_data writes the same stream from the command line.
+        """
+        out = StringIO()
+        call_command('export_data', 'child-profiles', '--format', 'ndjson', '--chunk-size', '2', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+
+class ImportResourcesCommandTests(TestCase):
+    """
+    import_resources streams rows in batches, upserting by content_url.
+    """
+    def setUp(self):
+        self.math = MathModule.objects.create(title="Math 101", description="Learn Math")
+        self.stem = STEMModule.objects.create(title="STEM 101", description="Learn STEM")
+        self.existing = Resource.objects.create(title="Old", description="Old", content_url="http://example.com/0")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        return path
+
+    def test_csv_import_upserts_and_links(self):
+        """
+        Existing URLs are updated, new ones created, links inserted and bad rows rejected.
+        """
+        rows = ["title,description,content_url,math_modules,stem_modules"]
+        rows += [f"Resource {i},Description,http://example.com/{i},{self.math.id},{self.stem.id}" for i in range(5)]
+        rows.append("Bad,Description,ftp://example.com/x,,")
+        rows.append(f"Unlinked,Description,http://example.com/9,{self.math.id + 100},")
+        path = self.write('resources.csv', '\n'.join(rows) + '\n')
+        rejects = os.path.join(self.tmpdir.name, 'rejects.jsonl')
+
+        out, err = StringIO(), StringIO()
+        call_command('import_resources', path, '--batch-size', '2', '--rejects', rejects, stdout=out, stderr=err)
+
+        self.assertEqual(Resource.objects.count(), 5)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, "Resource 0")
+        self.assertEqual(self.math.resources.count(), 5)
+        self.assertEqual(self.stem.resources.count(), 5)
+        self.assertIn('4 created, 1 updated', out.getvalue())
+        with open(rejects, encoding='utf-8') as handle:
+            rejected = [json.loads(line) for line in handle]
+        self.assertEqual([row['line'] for row in rejected], [7, 8])
+        self.assertIn('content_url', rejected[0]['errors'])
+        self.assertIn('math_modules', rejected[1]['errors'])
+
+    def test_jsonl_import_is_idempotent(self):
+        """
+        Importing the same JSONL file twice creates no duplicate resources or links.
+        """
+        lines = [
+            json.dumps({"title": f"R{i}", "description": "D", "content_url": f"https://example.com/r{i}", "math_modules": [self.math.id]})
+            for i in range(3)
+        ]
+        path = self.write('resources.jsonl', '\n'.join(lines) + '\nnot json\n')
+        for links in (3, 0):
+            out = StringIO()
+            call_command('import_resources', path, stdout=out, stderr=StringIO())
+            self.assertIn(f'{links} module links added', out.getvalue())
+        self.assertEqual(Resource.objects.filter(content_url__startswith='https://').count(), 3)
+        self.assertEqual(self.math.resources.count(), 3)
+
+
+class SearchTests(TestCase):
+    """
+    Search ranks resources and modules from the full-text index.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.addition = Resource.objects.create(title="Addition games", description="Practice sums", content_url="http://example.com/a")
+        self.mention = Resource.objects.create(title="Shapes", description="Includes some addition", content_url="http://example.com/s")
+        self.module = MathModule.objects.create(title="Adding and subtracting", description="Early arithmetic")
+        self.stem = STEMModule.objects.create(title="Magnets", description="Attract and repel")
+
+    def search(self, **params):
+        response = self.client.get('/api/v1/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_title_matches_rank_first(self):
+        """
+        A title match outranks a description-only match.
+        """
+        self.assertEqual(self.search(q='addition')[:2], [('resource', self.addition.id), ('resource', self.mention.id)])
+
+    def test_prefix_matching_and_type_filter(self):
+        """
+        A prefix finds resources and modules; `type` narrows the result set.
+        """
+        self.assertIn(('math-module', self.module.id), self.search(q='add'))
+        self.assertEqual(self.search(q='add', type='math-module'), [('math-module', self.module.id)])
+
+    def test_index_follows_saves_and_deletes(self):
+        """
+        Signals keep the index in sync with edits and deletions.
+        """
+        self.stem.title = "Rainbows"
+        self.stem.save()
+        self.assertEqual(self.search(q='magnets'), [])
+        self.assertEqual(self.search(q='rainbow'), [('stem-module', self.stem.id)])
+        self.stem.delete()
+        self.assertEqual(self.search(q='rainbow'), [])
+
+    def test_bulk_created_rows_are_searchable(self):
+        """
+        Rows written by the bulk endpoint are indexed too.
+        """
+        payload = [{"title": "Phonics flashcards", "description": "Letters", "content_url": "http://example.com/f"}]
+        created = self.client.post('/api/v1/resources/', payload, format='json').data['results'][0]['id']
+        self.assertEqual(self.search(q='flash'), [('resource', created)])
+
+    def test_query_syntax_is_not_passed_through(self):
+        """
+        FTS operators in user input are treated as plain words.
+        """
+        self.assertEqual(self.search(q='"magnets" OR NEAR('), [])
+        self.assertEqual(self.client.get('/api/v1/search/').status_code, 400)
+
+    def test_rebuild_command(self):
+        """
+        Rebuilding the index restores every searchable row.
+        """
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(q='magnets'), [('stem-module', self.stem.id)])
+
+
+class CatalogTests(TestCase):
+    """
+    The catalog returns every module type and their resources in one response.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        self.shared = Resource.objects.create(title="Shared", description="D", content_url="http://example.com/shared")
+        self.extra = Resource.objects.create(title="Extra", description="D", content_url="http://example.com/extra")
+        self.phonetics = PhoneticsModule.objects.create(title="Sounds", description="D")
+        self.easy = MathModule.objects.create(title="Counting", description="D", difficulty_level="Easy")
+        self.hard = MathModule.objects.create(title="Fractions", description="D", difficulty_level="Hard")
+        self.stem = STEMModule.objects.create(title="Magnets", description="D")
+        self.phonetics.resources.add(self.shared)
+        self.easy.resources.add(self.shared, self.extra)
+        self.stem.resources.add(self.extra)
+
+    def test_catalog_uses_fixed_queries(self):
+        """
+        A count and a page query per module type, one link UNION and one resource query, then cached.
+        """
+        with self.assertNumQueries(8):
+            response = self.client.get('/api/v1/catalog/')
+        self.assertEqual([module['id'] for module in response.data['math_modules']], [self.easy.id, self.hard.id])
+        self.assertEqual(response.data['math_modules'][0]['resources'], [self.shared.id, self.extra.id])
+        self.assertEqual(response.data['phonetics_modules'][0]['resources'], [self.shared.id])
+        self.assertEqual([resource['id'] for resource in response.data['resources']], [self.shared.id, self.extra.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/v1/catalog/')['X-Cache'], 'HIT')
+
+    def test_module_fields_match_module_endpoints(self):
+        """
+        Catalog modules carry the same fields as the module endpoints.
+        """
+        catalog = self.client.get('/api/v1/catalog/').data['stem_modules'][0]
+        detail = self.client.get(f'/api/v1/stem-modules/{self.stem.id}/').data
+        self.assertEqual(set(catalog), set(detail))
+        self.assertEqual(catalog['resources'], [resource['id'] for resource in detail['resources']])
+
+    def test_filters(self):
+        """
+        `types` and `difficulty_level` narrow the catalog.
+        """
+        response = self.client.get('/api/v1/catalog/', {'types': 'math', 'difficulty_level': 'Hard'})
+        self.assertEqual(set(response.data), {'count', 'next', 'previous', 'math_modules', 'resources'})
+        self.assertEqual(response.data['count'], {'math_modules': 1})
+        self.assertEqual([module['id'] for module in response.data['math_modules']], [self.hard.id])
+        self.assertEqual(response.data['resources'], [])
+        self.assertEqual(self.client.get('/api/v1/catalog/', {'types': 'art'}).status_code, 400)
+
+
+    def test_pages_hold_a_page_of_every_type(self):
+        """
+        Each page holds that page of every module type and only the resources they link.
+        """
+        response = self.client.get('/api/v1/catalog/', {'page_size': 1})
+        self.assertEqual(response.data['count'], {'phonetics_modules': 1, 'math_modules': 2, 'stem_modules': 1})
+        self.assertEqual([module['id'] for module in response.data['math_modules']], [self.easy.id])
+        self.assertEqual([resource['id'] for resource in response.data['resources']], [self.shared.id, self.extra.id])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([module['id'] for module in response.data['math_modules']], [self.hard.id])
+        self.assertEqual(response.data['phonetics_modules'], [])
+        self.assertEqual(response.data['resources'], [])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual(self.client.get('/api/v1/catalog/', {'page_size': 1, 'page': 3}).status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/catalog/', {'page': 'x'}).status_code, 404)
+
+class RecommendationTests(TestCase):
+    """
+    Recommendations are scored per age band and exclude completed modules.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        self.child = ChildProfile.objects.create(user=profile, name="Ada", age=4)
+        self.counting = MathModule.objects.create(title="Counting", description="D", difficulty_level="Easy", min_age=3, max_age=5)
+        self.fractions = MathModule.objects.create(title="Fractions", description="D", difficulty_level="Hard", min_age=9, max_age=12)
+        self.sounds = PhoneticsModule.objects.create(title="Sounds", description="D", min_age=2, max_age=5)
+        self.video = Resource.objects.create(title="Video", description="D", content_url="http://example.com/video")
+        self.counting.resources.add(self.video)
+        refresh_recommendations()
+
+    def test_age_bands(self):
+        self.assertEqual([age_band_for(age) for age in (0, 4, 6, 10, 30)], [0, 1, 2, 4, 5])
+
+    def test_ranks_age_appropriate_items_first(self):
+        response = self.client.get(f'/api/v1/child-profiles/{self.child.id}/recommendations/')
+        self.assertEqual(response.status_code, 200)
+        titles = [result['title'] for result in response.data['results']]
+        self.assertEqual(titles[0], "Counting")
+        self.assertLess(titles.index("Sounds"), titles.index("Fractions"))
+        # Resources inherit a discounted score from their modules
+        self.assertLess(titles.index("Counting"), titles.index("Video"))
+
+    def test_excludes_completed_modules(self):
+        ModuleCompletion.objects.create(child=self.child, module_type='math-module', module_id=self.counting.id)
+        with self.assertNumQueries(4):  # child, completions, recommendations, titles
+            response = self.client.get(
+                f'/api/v1/child-profiles/{self.child.id}/recommendations/?type=math-module&limit=5'
+            )
+        self.assertEqual([result['id'] for result in response.data['results']], [self.fractions.id])
+
+    def test_refresh_replaces_rows(self):
+        before = Recommendation.objects.count()
+        self.assertEqual(refresh_recommendations(), before)
+        self.assertEqual(Recommendation.objects.filter(age_band=0).count(), 4)
+
+    def test_rejects_unknown_type(self):
+        response = self.client.get(f'/api/v1/child-profiles/{self.child.id}/recommendations/?type=video')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(EDU_INGEST={'MAX_BUFFERED': 10, 'BATCH_SIZE': 4, 'FLUSH_INTERVAL': None})
+class ProgressEventTests(TestCase):
+    """
+    Events are validated per batch, buffered, and written on flush.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        self.child = ChildProfile.objects.create(user=profile, name="Ada", age=4)
+        self.math = MathModule.objects.create(title="Counting", description="D", difficulty_level="Easy")
+        self.stem = STEMModule.objects.create(title="Magnets", description="D")
+
+    def tearDown(self):
+        event_buffer.flush()
+
+    def event(self, **overrides):
+        return {
+            "child_id": self.child.id, "event_type": "problem_solved",
+            "module_type": "math-module", "module_id": self.math.id, "value": 3,
+            **overrides,
+        }
+
+    def test_batch_is_buffered_then_flushed(self):
+        events = [self.event(), self.event(event_type="module_started", module_type="stem-module", module_id=self.stem.id)]
+        with self.assertNumQueries(3):  # children, math modules, STEM modules
+            response = self.client.post('/api/v1/progress-events/', events, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual(ProgressEvent.objects.count(), 0)
+
+        self.assertEqual(event_buffer.flush(), 2)
+        stored = ProgressEvent.objects.order_by('id')
+        self.assertEqual(
+            [(event.event_type, event.module_type, event.module_id) for event in stored],
+            [(ProgressEvent.PROBLEM_SOLVED, 2, self.math.id), (ProgressEvent.MODULE_STARTED, 3, self.stem.id)],
+        )
+
+    def test_invalid_event_rejects_batch(self):
+        events = [self.event(), self.event(module_id=999), self.event(event_type="napped")]
+        response = self.client.post('/api/v1/progress-events/', events, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['index'] for result in response.data['results']], [1, 2])
+        self.assertEqual(len(event_buffer), 0)
+
+    def test_full_buffer_applies_backpressure(self):
+        self.assertEqual(self.client.post('/api/v1/progress-events/', [self.event()] * 8, format='json').status_code, 202)
+        response = self.client.post('/api/v1/progress-events/', [self.event()] * 3, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(len(event_buffer), 8)
+        event_buffer.flush()
+        self.assertEqual(self.client.post('/api/v1/progress-events/', [self.event()] * 3, format='json').status_code, 202)
+
+    def test_deleted_child_does_not_drop_the_batch(self):
+        """
+        Events of a child deleted before the flush are dropped; the rest of the batch is written.
+        """
+        profile = UserProfile.objects.get(username="parent")
+        other = ChildProfile.objects.create(user=profile, name="Grace", age=5)
+        events = [self.event(), self.event(child_id=other.id), self.event()]
+        self.assertEqual(self.client.post('/api/v1/progress-events/', events, format='json').status_code, 202)
+        other.delete()
+        failed = event_buffer.failed
+        with self.assertLogs('edu.ingestion', 'WARNING'):
+            self.assertEqual(event_buffer.flush(), 2)
+        self.assertEqual(event_buffer.failed, failed + 1)
+        self.assertEqual(list(ProgressEvent.objects.values_list('child_id', flat=True)), [self.child.id] * 2)
+
+    def test_failed_batch_is_written_row_by_row(self):
+        """
+        When a batch insert fails, the events that can be written still are.
+        """
+        self.assertEqual(self.client.post('/api/v1/progress-events/', [self.event()] * 3, format='json').status_code, 202)
+        real_bulk_create = ProgressEvent.objects.bulk_create
+
+        def bulk_create(objs, **kwargs):
+            if len(objs) > 1 or objs[0] is bad:
+                raise IntegrityError("Simulated failure")
+            return real_bulk_create(objs, **kwargs)
+
+        bad = event_buffer._events[1]
+        with mock.patch.object(ProgressEvent.objects, 'bulk_create', side_effect=bulk_create), \
+                self.assertLogs('edu.ingestion', 'WARNING') as logs:
+            self.assertEqual(event_buffer.flush(), 2)
+        self.assertIn("Dropped a progress event", logs.output[-1])
+        self.assertEqual(ProgressEvent.objects.count(), 2)
+
+    def test_non_staff_cannot_write_for_other_children(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='guest', password='password123'))
+        response = self.client.post('/api/v1/progress-events/', self.event(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('child_id', response.data['results'][0]['errors'])
+
+
+class ProgressRollupTests(TestCase):
+    """
+    Completions keep per-child and per-module rollups current at write time.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        self.child = ChildProfile.objects.create(user=profile, name="Ada", age=4)
+        self.other = ChildProfile.objects.create(user=profile, name="Bo", age=5)
+        self.math = MathModule.objects.create(title="Counting", description="D", difficulty_level="Easy")
+        self.stem = STEMModule.objects.create(title="Magnets", description="D")
+
+    def complete(self, child, module_type, module_id, **extra):
+        return self.client.post(
+            f'/api/v1/child-profiles/{child.id}/completions/',
+            {"module_type": module_type, "module_id": module_id, **extra},
+            format='json',
+        )
+
+    def test_completion_updates_rollups(self):
+        self.assertEqual(self.complete(self.child, 'math-module', self.math.id).status_code, 201)
+        self.assertEqual(self.complete(self.child, 'stem-module', self.stem.id).status_code, 201)
+        self.assertEqual(self.complete(self.other, 'math-module', self.math.id).status_code, 201)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/child-profiles/{self.child.id}/progress/')
+        self.assertEqual(response.data['completed'], {'phonetics-module': 0, 'math-module': 1, 'stem-module': 1})
+        self.assertEqual(response.data['total_completed'], 2)
+        self.assertIsNotNone(response.data['last_activity_at'])
+
+        response = self.client.get(f'/api/v1/module-progress/math-module/{self.math.id}/')
+        self.assertEqual(response.data['completions'], 2)
+
+    def test_repeated_completion_is_counted_once(self):
+        self.assertEqual(self.complete(self.child, 'math-module', self.math.id).status_code, 201)
+        response = self.complete(self.child, 'math-module', self.math.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ChildProgressSummary.objects.get(child=self.child).math_completed, 1)
+        self.assertEqual(ModuleProgressSummary.objects.get(module_id=self.math.id).completions, 1)
+        listed = self.client.get(f'/api/v1/child-profiles/{self.child.id}/completions/')
+        self.assertEqual(listed.data['count'], 1)
+
+    def test_unknown_module_is_rejected(self):
+        response = self.complete(self.child, 'math-module', 999)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ChildProgressSummary.objects.exists())
+
+    def test_child_without_completions(self):
+        response = self.client.get(f'/api/v1/child-profiles/{self.child.id}/progress/')
+        self.assertEqual(response.data['total_completed'], 0)
+        self.assertIsNone(response.data['last_activity_at'])
+
+    @override_settings(EDU_INGEST={'FLUSH_INTERVAL': None})
+    def test_completed_events_update_rollups_on_flush(self):
+        event = {
+            "child_id": self.child.id, "event_type": "module_completed",
+            "module_type": "stem-module", "module_id": self.stem.id,
+        }
+        self.client.post('/api/v1/progress-events/', [event, event], format='json')
+        event_buffer.flush()
+        self.assertEqual(ChildProgressSummary.objects.get(child=self.child).stem_completed, 1)
+        self.assertEqual(ModuleCompletion.objects.filter(child=self.child).count(), 1)
+
+
+class PermissionCacheTests(TestCase):
+    """
+    Group lookups are cached across requests and dropped on membership changes.
+    """
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name='resource_creator')
+        self.user = User.objects.create_user(username='creator', password='password123')
+        self.user.groups.add(self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.resource = Resource.objects.create(title="Video", description="D", content_url="http://example.com/video")
+
+    def test_group_lookup_is_cached(self):
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 200)
+        with self.assertNumQueries(0):  # groups and the response both come from the cache
+            self.assertEqual(self.client.get('/api/v1/resources/').status_code, 200)
+
+    def test_membership_change_invalidates(self):
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 200)
+        self.user.groups.remove(self.group)
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 403)
+        self.group.user_set.add(self.user)
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 200)
+
+    def test_group_rename_invalidates(self):
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 200)
+        self.group.name = 'reviewer'
+        self.group.save()
+        self.assertEqual(self.client.get('/api/v1/resources/').status_code, 403)
+
+    def test_owner_check_without_owner_field(self):
+        """
+        Objects without an owner are denied to non-admins instead of erroring.
+        """
+        response = self.client.get(f'/api/v1/resources/{self.resource.id}/')
+        self.assertEqual(response.status_code, 403)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Token lookups are served from the cache until the token or user changes.
+    """
+    def setUp(self):
+        cache.clear()
+        get_local_token_cache().clear()
+        token_cache_metrics.reset()
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        ChildProfile.objects.create(
+            user=UserProfile.objects.create(username="parent", email="parent@example.com", role="parent"),
+            name="Ada", age=4,
+        )
+
+    def test_second_request_skips_token_query(self):
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        with self.assertNumQueries(3):  # Only the list budget; no token/user join
+            self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        self.assertEqual(token_cache_metrics.snapshot()['local'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 401)
+
+    def test_inactive_cached_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        get_local_token_cache().get(_token_cache_key(self.token.key))[1].is_active = False
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 401)
+
+    @override_settings(EDU_TOKEN_CACHE={'SHARED_ALIAS': 'default'})
+    def test_revocation_reaches_other_processes(self):
+        """
+        With a shared cache, an entry another process still holds is not used after a revoke.
+        """
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        digest = _token_cache_key(self.token.key)
+        entry = get_local_token_cache().get(digest)
+        self.user.is_active = False
+        self.user.save()
+        get_local_token_cache().set(digest, entry)  # As if cached by another process
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 401)
+
+    @override_settings(EDU_TOKEN_CACHE={'SHARED_ALIAS': 'default'})
+    def test_shared_cache_fills_other_processes(self):
+        self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        get_local_token_cache().clear()  # As if another process served the next request
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get('/api/v1/child-profiles/').status_code, 200)
+        self.assertEqual(token_cache_metrics.snapshot()['shared']['hits'], 1)
+
+    def test_cache_stats_endpoint(self):
+        self.client.get('/api/v1/child-profiles/')
+        response = self.client.get('/api/v1/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('local', response.data['tokens'])
+
+
+@override_settings(EDU_THROTTLE={'STORE': 'edu.throttling.LocalCounterStore'})
+class ThrottleTests(TestCase):
+    """
+    Sliding-window throttles keep two counters per client.
+    """
+    def setUp(self):
+        LocalCounterStore.clear()
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.factory = APIRequestFactory()
+        self.now = 600.0
+
+    def make_view(self, rate):
+        throttle_classes = throttles('test', user=rate)
+        for throttle_class in throttle_classes:
+            throttle_class.timer = lambda throttle: self.now
+        return SearchView.as_view(throttle_classes=throttle_classes)
+
+    def get(self, view):
+        request = self.factory.get('/api/v1/search/?q=sounds')
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def test_limit_and_retry_after(self):
+        view = self.make_view('3/min')
+        self.assertEqual([self.get(view).status_code for _ in range(4)], [200, 200, 200, 429])
+        self.assertEqual(self.get(view)['Retry-After'], '60')
+
+    def test_previous_window_is_weighted(self):
+        view = self.make_view('4/min')
+        for _ in range(4):
+            self.get(view)
+        self.now += 90  # Halfway through the next window: 4 * 0.5 = 2 estimated
+        self.assertEqual([self.get(view).status_code for _ in range(3)], [200, 200, 429])
+
+    def test_endpoint_rates_are_configured_in_urls(self):
+        throttle_classes = resolve('/api/v1/search/').func.view_initkwargs['throttle_classes']
+        self.assertEqual({throttle.scope for throttle in throttle_classes}, {'search'})
+        self.assertEqual({throttle.rate for throttle in throttle_classes}, {'120/min', '20/min'})
+
+
+class FastListTests(TestCase):
+    """
+    The fast read path renders list pages byte-for-byte like the serializers.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        resources = [
+            Resource.objects.create(title=f"Resource {i}", description="D", content_url=f"http://example.com/{i}")
+            for i in range(3)
+        ]
+        for i in range(3):
+            module = PhoneticsModule.objects.create(
+                title=f"Sounds {i}", description="D", min_age=3 if i else None,
+                audio_file='phonetics_audio/a.mp3' if i else None,
+            )
+            module.resources.add(*resources[i:])
+
+    def test_output_matches_serializer(self):
+        response = self.client.get('/api/v1/phonetics-modules/')
+        modules = PhoneticsModule.objects.prefetch_related('resources').order_by('created_at', 'id')
+        expected = PhoneticsModuleSerializer(modules, many=True, context={'request': response.wsgi_request}).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+        self.assertTrue(response.data['results'][1]['audio_file'].startswith('http://testserver/'))
+
+    def test_keyset_pages_from_rows(self):
+        first = self.client.get('/api/v1/resources/?pagination=keyset&page_size=2')
+        second = self.client.get(first.data['next'])
+        self.assertEqual([item['title'] for item in second.data['results']], ["Resource 2"])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', items=5, repeat=1, stdout=out)
+        self.assertIn('byte-identical', out.getvalue())
+        self.assertEqual(Resource.objects.count(), 3)  # Sample rows are rolled back
+
+
+class SparseFieldsetTests(TestCase):
+    """
+    `fields=` and `expand=` trim responses and the queries behind them.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        resource = Resource.objects.create(title="Video", description="D", content_url="http://example.com/video")
+        for i in range(2):
+            MathModule.objects.create(title=f"Counting {i}", description="Long text").resources.add(resource)
+
+    def test_fields_skip_nested_queries(self):
+        with self.assertNumQueries(3):  # Validator, count and page; no resource join or prefetch
+            response = self.client.get('/api/v1/math-modules/?fields=id,title,updated_at')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'updated_at'])
+
+    def test_expand_adds_relation(self):
+        response = self.client.get('/api/v1/math-modules/?fields=id,title&expand=resources')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'resources'])
+        self.assertEqual(response.data['results'][0]['resources'][0]['title'], "Video")
+
+    def test_empty_expand_drops_relations(self):
+        response = self.client.get(f'/api/v1/math-modules/{MathModule.objects.first().id}/?expand=')
+        self.assertNotIn('resources', response.data)
+        self.assertIn('description', response.data)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/v1/resources/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/math-modules/?expand=title')
+        self.assertEqual(response.status_code, 400)
+
+    def test_keyset_paging_without_ordering_fields(self):
+        first = self.client.get('/api/v1/math-modules/?fields=title&pagination=keyset&page_size=1')
+        second = self.client.get(first.data['next'])
+        self.assertEqual(second.data['results'], [{'title': "Counting 1"}])
+
+    def test_writes_are_not_trimmed(self):
+        response = self.client.post('/api/v1/resources/?fields=id', {
+            "title": "New", "description": "D", "content_url": "http://example.com/new",
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('title', response.data)
+
+
+class CompressionTests(TestCase):
+    """
+    Large responses are compressed when the client accepts it; small ones are not.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        for i in range(20):
+            Resource.objects.create(title=f"Resource {i}", description="Long text " * 10, content_url="http://example.com")
+
+    def test_large_response_is_gzipped(self):
+        plain = self.client.get('/api/v1/resources/?page_size=20')
+        response = self.client.get('/api/v1/resources/?page_size=20', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_response_is_not_compressed(self):
+        response = self.client.get('/api/v1/resources/?page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_weakened_etag_still_matches(self):
+        first = self.client.get('/api/v1/resources/?page_size=20', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        response = self.client.get('/api/v1/resources/?page_size=20', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_streamed_export_is_gzipped(self):
+        profile = UserProfile.objects.create(username="parent", email="parent@example.com", role="parent")
+        for i in range(20):
+            ChildProfile.objects.create(user=profile, name=f"Child {i}", age=4)
+        response = self.client.get('/api/v1/exports/child-profiles/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 21)
+
+    def test_html_is_not_compressed(self):
+        """
+        Browsable API pages carry a CSRF token, so they are never compressed (BREACH).
+        """
+        response = self.client.get('/api/v1/resources/?page_size=20', HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertGreater(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_accept_encoding_negotiation(self):
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding('gzip;q=0, identity'))
+        self.assertEqual(choose_encoding('deflate, gzip;q=0.5'), 'gzip')
+        self.assertEqual(choose_encoding('*'), 'br' if choose_encoding('br') else 'gzip')
+
+
+class RendererTests(TestCase):
+    """
+    The fast JSON renderer matches DRF's output; MessagePack is negotiated when available.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def test_fast_json_matches_drf(self):
+        data = {
+            'title': "Ünïcode \u2028 line",
+            'when': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2024, 5, 1),
+            'price': decimal.Decimal('1.50'),
+            'items': [1, 2.5, None, True],
+            3: 'non-string key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_round_trip(self):
+        Resource.objects.create(title="Video", description="D", content_url="http://example.com/video")
+        response = self.client.get('/api/v1/resources/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['title'], "Video")
+
+        body = msgpack.packb({"title": "New", "description": "D", "content_url": "http://example.com/new"})
+        response = self.client.post('/api/v1/resources/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+
+    @unittest.skipIf(msgpack, "msgpack is installed")
+    def test_msgpack_not_offered_without_package(self):
+        response = self.client.get('/api/v1/resources/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, 406)
+
+
+class AudioDeliveryTests(TestCase):
+    """
+    Phonetics audio is served with byte ranges and strong validators.
+    """
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root.name, 'phonetics_audio'))
+        self.audio = bytes(range(256)) * 4
+        with open(os.path.join(self.media_root.name, 'phonetics_audio', 'a.mp3'), 'wb') as f:
+            f.write(self.audio)
+
+        self.user = User.objects.create_user(username='child', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.module = PhoneticsModule.objects.create(title="Vowels", description="D", audio_file='phonetics_audio/a.mp3')
+        self.url = f'/api/v1/phonetics-modules/{self.module.pk}/audio/'
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_file(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='audio/*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertEqual(self.read(response), self.audio)
+
+    def test_byte_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.read(response), self.audio[10:20])
+
+    async def test_asgi_byte_range_streams_asynchronously(self):
+        token = await Token.objects.acreate(user=self.user)
+        headers = {'Authorization': f'Token {token.key}', 'Range': 'bytes=10-1009'}
+        response = await AsyncClient().get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.audio[10:1010])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_if_range_mismatch_sends_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.read(response)), 1024)
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_offload_header(self):
+        with self.settings(EDU_MEDIA={'OFFLOAD': 'x-accel-redirect'}):
+            response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/phonetics_audio/a.mp3')
+        self.assertEqual(response.content, b'')
+
+    def test_module_without_audio(self):
+        module = PhoneticsModule.objects.create(title="Silent", description="D")
+        response = self.client.get(f'/api/v1/phonetics-modules/{module.pk}/audio/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=-100', 1024), (924, 1023))
+        self.assertEqual(parse_range('bytes=1000-2000', 1024), (1000, 1023))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1024))
+        self.assertIsNone(parse_range('items=0-1', 1024))
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=-0', 1024)
+
+
+def make_wav(seconds=1.0, rate=44100, channels=2, frequency=440, amplitude=0.25):
+    samples = amplitude * np.sin(2 * np.pi * frequency * np.arange(int(seconds * rate)) / rate)
+    pcm = (np.repeat(samples[:, None], channels, axis=1) * 32767).astype('<i2')
+    buffer = tempfile.SpooledTemporaryFile()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    buffer.seek(0)
+    return buffer.read()
+
+
+class AudioPipelineTests(TestCase):
+    """
+    Uploads are normalized, downsampled and stored as compact renditions with metadata.
+    """
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        # No ffmpeg, so the results do not depend on the machine
+        override = override_settings(MEDIA_ROOT=self.media_root.name, EDU_AUDIO={'WORKERS': 0, 'FFMPEG': ''})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user(username='child', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, name, content, module=None):
+        module = module or PhoneticsModule(title="Vowels", description="D")
+        with self.captureOnCommitCallbacks(execute=True):
+            module.audio_file.save(name, ContentFile(content))
+        module.refresh_from_db()
+        return module
+
+    def test_wav_upload_is_processed(self):
+        original = make_wav()
+        module = self.upload('vowels.wav', original)
+        self.assertEqual(module.audio_status, 'ready')
+        self.assertAlmostEqual(module.audio_duration, 1.0, places=2)
+        self.assertEqual(len(module.audio_waveform), 100)
+        self.assertEqual(max(module.audio_waveform), 1.0)
+
+        rendition = module.audio_renditions.get()
+        self.assertEqual((rendition.codec, rendition.sample_rate), ('wav', 16000))
+        self.assertLess(rendition.size, len(original) / 5)
+        with rendition.file.open('rb') as f, wave.open(f) as reader:
+            self.assertEqual((reader.getnchannels(), reader.getframerate()), (1, 16000))
+            peak = np.abs(np.frombuffer(reader.readframes(reader.getnframes()), dtype='<i2')).max() / 32767
+        self.assertAlmostEqual(peak, 10 ** (-1 / 20), places=2)  # Normalized to -1 dBFS
+
+    def test_endpoint_serves_smallest_rendition(self):
+        module = self.upload('vowels.wav', make_wav())
+        url = f'/api/v1/phonetics-modules/{module.pk}/audio/'
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'audio/wav')
+        self.assertEqual(int(response['Content-Length']), module.audio_renditions.get().size)
+        self.assertIn('Accept', response['Vary'])
+
+        response = self.client.get(url, {'rendition': 'original'})
+        self.assertEqual(int(response['Content-Length']), module.audio_file.size)
+        self.assertEqual(self.client.get(url, {'rendition': 'opus'}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'rendition': 'flac'}).status_code, 400)
+
+    def test_unreadable_upload_fails_and_original_is_served(self):
+        with self.assertLogs('edu.audio', 'WARNING'):
+            module = self.upload('vowels.mp3', b'not really audio')
+        self.assertEqual(module.audio_status, 'failed')
+        response = self.client.get(f'/api/v1/phonetics-modules/{module.pk}/audio/')
+        self.assertEqual(b''.join(response.streaming_content), b'not really audio')
+
+    def test_failed_processing_changes_the_etag(self):
+        module = PhoneticsModule(title="Vowels", description="D")
+        module.audio_file.save('vowels.mp3', ContentFile(b'not really audio'))  # Not processed yet
+        url = f'/api/v1/phonetics-modules/{module.pk}/'
+        self.client.force_authenticate(user=User.objects.create_user(username='admin', password='password123', is_staff=True))
+        pending = self.client.get(url)
+        self.assertEqual(pending.data['audio_status'], 'pending')
+        with self.assertLogs('edu.audio', 'WARNING'):
+            self.assertEqual(process_module(module.pk), 'failed')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=pending['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], pending['ETag'])
+        self.assertEqual(response.data['audio_status'], 'failed')
+
+    def test_missing_original_is_skipped(self):
+        module = self.upload('vowels.wav', make_wav())
+        os.remove(module.audio_file.path)
+        url = f'/api/v1/phonetics-modules/{module.pk}/audio/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response['Content-Length']), module.audio_renditions.get().size)
+        self.assertEqual(self.client.get(url, {'rendition': 'original'}).status_code, 404)
+
+    def test_new_upload_resets_metadata(self):
+        module = self.upload('vowels.wav', make_wav())
+        module.audio_file.save('vowels.wav', ContentFile(make_wav(seconds=2)))  # Not processed yet
+        module.refresh_from_db()
+        self.assertEqual(module.audio_status, 'pending')
+        self.assertIsNone(module.audio_duration)
+        response = self.client.get(f'/api/v1/phonetics-modules/{module.pk}/audio/')
+        self.assertEqual(int(response['Content-Length']), module.audio_file.size)
+
+    def test_deleting_module_removes_rendition_files(self):
+        module = self.upload('vowels.wav', make_wav())
+        path = module.audio_renditions.get().file.path
+        with self.captureOnCommitCallbacks(execute=True):
+            module.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(AudioRendition.objects.exists())
+
+    def test_resample_filters_out_high_frequencies(self):
+        rate = 44100
+        tone = np.sin(2 * np.pi * 12000 * np.arange(rate) / rate).astype(np.float32)
+        samples, new_rate = resample(tone, rate, 16000)
+        self.assertEqual((new_rate, len(samples)), (16000, 16000))
+        self.assertLess(np.sqrt(np.mean(samples[200:-200] ** 2)), 0.05)  # 12 kHz cannot be kept at 16 kHz
+
+    def test_management_command(self):
+        module = PhoneticsModule.objects.create(title="Vowels", description="D")
+        module.audio_file.save('vowels.wav', ContentFile(make_wav()))  # Queued, never run
+        out = StringIO()
+        call_command('process_audio', '--workers', '1', stdout=out)
+        module.refresh_from_db()
+        self.assertEqual(module.audio_status, 'ready')
+        self.assertIn("Processed 1 of 1 modules", out.getvalue())
+
+
+class AsyncViewTests(TestCase):
+    """
+    Async list/detail views return what the sync views return and pass writes to them.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.factory = APIRequestFactory()
+        cache.clear()
+        for i in range(3):
+            Resource.objects.create(title=f"Resource {i}", description="Description", content_url="http://example.com")
+        self.list_view = async_view(ResourceListCreateView).as_view(sync_view_class=ResourceListCreateView)
+        self.detail_view = async_view(ResourceDetailView).as_view(sync_view_class=ResourceDetailView)
+
+    def request(self, method, path, data=None, **extra):
+        request = getattr(self.factory, method)(path, data, format='json' if data else None, **extra)
+        force_authenticate(request, user=self.user)
+        return request
+
+    async def test_list_matches_sync_view(self):
+        response = await self.list_view(self.request('get', '/api/v1/resources/', {'page_size': 2}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        sync_view = sync_to_async(ResourceListCreateView.as_view())
+        sync_response = (await sync_view(self.request('get', '/api/v1/resources/?page_size=2'))).render()
+        self.assertEqual(json.loads(response.content), json.loads(sync_response.content))
+        self.assertEqual(json.loads(response.content)['count'], 3)
+
+        cached = await self.list_view(self.request('get', '/api/v1/resources/', {'page_size': 2}))
+        self.assertEqual(cached['X-Cache'], 'HIT')
+
+    async def test_detail_and_missing_object(self):
+        resource = await Resource.objects.afirst()
+        response = await self.detail_view(self.request('get', f'/api/v1/resources/{resource.pk}/'), pk=resource.pk)
+        self.assertEqual(json.loads(response.content)['title'], resource.title)
+        response = await self.detail_view(self.request('get', '/api/v1/resources/0/'), pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_etags_match_sync_view(self):
+        """
+        Async list and detail responses carry the sync view's validators and answer 304 to them.
+        """
+        resource = await Resource.objects.afirst()
+        sync_list = sync_to_async(ResourceListCreateView.as_view())
+        sync_detail = sync_to_async(ResourceDetailView.as_view())
+        for view, sync_view, path, kwargs in (
+            (self.list_view, sync_list, '/api/v1/resources/', {}),
+            (self.detail_view, sync_detail, f'/api/v1/resources/{resource.pk}/', {'pk': resource.pk}),
+        ):
+            response = await view(self.request('get', path), **kwargs)
+            sync_response = await sync_view(self.request('get', path), **kwargs)
+            self.assertEqual(response['ETag'], sync_response['ETag'])
+            self.assertEqual(response['Last-Modified'], sync_response['Last-Modified'])
+            response = await view(self.request('get', path, HTTP_IF_NONE_MATCH=response['ETag']), **kwargs)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    async def test_writes_go_to_sync_view(self):
+        data = {'title': "New", 'description': "Description", 'content_url': "http://example.com/new"}
+        response = await self.list_view(self.request('post', '/api/v1/resources/', data))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(await Resource.objects.acount(), 4)
+
+    async def test_anonymous_requests_are_rejected(self):
+        response = await self.list_view(self.factory.get('/api/v1/resources/'))
+        self.assertEqual(response.status_code, 401)
+
+
+class ChangeEventTests(TestCase):
+    """
+    Saves and deletes are pushed to event stream subscribers after commit.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        token = Token.objects.create(user=self.user)
+        self.async_client = AsyncClient()
+        self.headers = {'Authorization': f'Token {token.key}'}
+
+    def write(self, action):
+        with self.captureOnCommitCallbacks(execute=True):
+            return action()
+
+    async def next_event(self, chunks):
+        return await asyncio.wait_for(anext(chunks), 5)
+
+    async def test_stream_delivers_changes_of_requested_types(self):
+        subscribers = change_broker.subscriber_count
+        response = await self.async_client.get('/api/v1/events/', {'types': 'resources'}, headers=self.headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await self.next_event(chunks), b'retry: 3000\n\n')
+
+        resource = await sync_to_async(self.write)(lambda: Resource.objects.create(
+            title="Counting", description="D", content_url="http://example.com",
+        ))
+        await sync_to_async(self.write)(lambda: MathModule.objects.create(title="Math", description="D"))
+        message = (await self.next_event(chunks)).decode()
+        self.assertIn('event: change', message)
+        self.assertIn(json.dumps({'type': 'resources', 'id': resource.pk, 'action': 'saved'}), message)
+        self.assertNotIn('math-modules', message)
+
+        await sync_to_async(self.write)(resource.delete)
+        self.assertIn('"action": "deleted"', (await self.next_event(chunks)).decode())
+        self.assertEqual(change_broker.subscriber_count, subscribers + 1)
+
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0.01)
+        pending.cancel()  # As the ASGI handler does when the client disconnects
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(change_broker.subscriber_count, subscribers)
+
+    async def test_reconnect_replays_missed_events(self):
+        response = await self.async_client.get('/api/v1/events/', headers=self.headers)
+        chunks = aiter(response.streaming_content)
+        await self.next_event(chunks)
+        await sync_to_async(change_broker.publish)('child-profiles', [1], 'saved')
+        last_event_id = (await self.next_event(chunks)).decode().split('\n')[0].removeprefix('id: ')
+        await chunks.aclose()
+
+        await sync_to_async(change_broker.publish)('child-profiles', [2, 3], 'saved')
+        response = await self.async_client.get('/api/v1/events/', headers={**self.headers, 'Last-Event-ID': last_event_id})
+        chunks = aiter(response.streaming_content)
+        await self.next_event(chunks)
+        replayed = (await self.next_event(chunks)).decode()
+        self.assertEqual(replayed.count('event: change'), 2)
+        self.assertNotIn('"id": 1,', replayed)
+        await chunks.aclose()
+
+        response = await self.async_client.get('/api/v1/events/', headers={**self.headers, 'Last-Event-ID': 'unknown-7'})
+        chunks = aiter(response.streaming_content)
+        await self.next_event(chunks)
+        self.assertEqual(await self.next_event(chunks), RESET_MESSAGE)
+        await chunks.aclose()
+
+    async def test_fan_out_from_another_thread(self):
+        subscriptions = [change_broker.subscribe({'resources'})[0] for _ in range(500)]
+        try:
+            await asyncio.to_thread(change_broker.publish, 'resources', [7], 'saved')
+            messages = [await subscription.next_messages(5) for subscription in subscriptions]
+        finally:
+            for subscription in subscriptions:
+                change_broker.unsubscribe(subscription)
+        self.assertEqual(len(set(messages)), 1)
+        self.assertIn(b'"id": 7', messages[0])
+
+    async def test_lagging_subscriber_is_reset(self):
+        subscription = Subscription({'resources'}, 2, last_sequence=0)
+        for sequence in range(1, 4):
+            subscription.offer(ChangeEvent('epoch', sequence, 'resources', {'id': sequence}))
+        self.assertEqual(await subscription.next_messages(0), RESET_MESSAGE)
+
+    async def test_bulk_writes_are_published(self):
+        subscription, _ = change_broker.subscribe({'resources'})
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        items = [{'title': f"R{i}", 'description': "D", 'content_url': f"http://example.com/{i}"} for i in range(2)]
+        try:
+            response = await sync_to_async(self.write)(lambda: client.post('/api/v1/resources/', items, format='json'))
+            messages = (await subscription.next_messages(5)).decode()
+        finally:
+            change_broker.unsubscribe(subscription)
+        self.assertEqual(response.status_code, 201)
+        for result in response.data['results']:
+            self.assertIn(f'"id": {result["id"]},', messages)
+
+    async def test_unknown_types_are_rejected(self):
+        response = await self.async_client.get('/api/v1/events/', {'types': 'resources,games'}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_streamed_under_wsgi(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        self.assertEqual(client.get('/api/v1/events/').status_code, 503)
@@ -0,0 +1,161 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework import throttling
+
+
+DEFAULT_THROTTLE_SETTINGS = {
+    'STORE': 'edu.throttling.CacheCounterStore',  # Or 'edu.throttling.LocalCounterStore'
+    'CACHE_ALIAS': 'default',  # Shared counters; use Redis/Memcached so workers agree
+    'KEY_PREFIX': 'edu:throttle',
+}
+
+
+def get_throttle_settings():
+    """
+    Return the throttle settings, with defaults filled in.
+    """
+    return {**DEFAULT_THROTTLE_SETTINGS, **getattr(settings, 'EDU_THROTTLE', {})}
+
+
+# Counter Stores
+class BaseCounterStore:
+    """
+    Interface for throttle counter stores: expiring integers with atomic increments.
+    """
+    def incr(self, key, timeout):
+        """
+        Add one to `key` (starting from zero) and return the new value.
+        """
+        raise NotImplementedError
+
+    def get(self, key):
+        raise NotImplementedError
+
+
+class CacheCounterStore(BaseCounterStore):
+    """
+    Counters in a Django cache, shared by every worker using the same backend.
+    Relies on the backend's atomic `add`/`incr`.
+    """
+    def __init__(self):
+        self.cache = caches[get_throttle_settings()['CACHE_ALIAS']]
+
+    def incr(self, key, timeout):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr(); this request starts a new count.
+            self.cache.set(key, 1, timeout)
+            return 1
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+class LocalCounterStore(BaseCounterStore):
+    """
+    In-process counters: no network round trip, but each worker counts alone.
+    Also the stand-in for the shared store in tests.
+    """
+    _lock = threading.Lock()
+    _counters = {}  # key -> (expires_at, value); shared by all instances
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            expires_at, value = self._counters.get(key, (0, 0))
+            if expires_at <= now:
+                expires_at, value = now + timeout, 0
+                if len(self._counters) > 10000:
+                    self._purge(now)
+            self._counters[key] = (expires_at, value + 1)
+            return value + 1
+
+    def get(self, key):
+        with self._lock:
+            expires_at, value = self._counters.get(key, (0, 0))
+            return value if expires_at > time.monotonic() else 0
+
+    def _purge(self, now):
+        for key in [key for key, (expires_at, _) in self._counters.items() if expires_at <= now]:
+            del self._counters[key]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._counters.clear()
+
+
+def get_counter_store():
+    return import_string(get_throttle_settings()['STORE'])()
+
+
+# Throttles
+class SlidingWindowThrottleMixin:
+    """
+    Sliding-window counter in place of DRF's per-client timestamp list.
+
+    Each client uses two fixed-size counters, the current and the previous
+    window, and the request count is estimated as
+    `previous * (1 - elapsed fraction) + current`. Every request costs one
+    atomic increment and one read, however high the rate. Refused requests
+    are counted too, so a client that keeps retrying stays throttled.
+    """
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        store = get_counter_store()
+        prefix = f"{get_throttle_settings()['KEY_PREFIX']}:{ident}"
+        now = self.timer()
+        window, offset = divmod(now, self.duration)
+        window = int(window)
+        self.elapsed = offset / self.duration
+
+        self.current = store.incr(f"{prefix}:{window}", self.duration * 2)
+        self.previous = store.get(f"{prefix}:{window - 1}")
+        return self.previous * (1 - self.elapsed) + self.current <= self.num_requests
+
+    def wait(self):
+        """
+        Seconds until the estimate falls back under the limit.
+        """
+        if self.current >= self.num_requests:
+            # Only the next window helps; the previous one then weighs in.
+            return math.ceil((1 - self.elapsed) * self.duration)
+        fraction = 1 - (self.num_requests - self.current) / self.previous
+        return max(math.ceil((fraction - self.elapsed) * self.duration), 0)
+
+
+class AnonRateThrottle(SlidingWindowThrottleMixin, throttling.AnonRateThrottle):
+    """
+    Sliding-window limit on anonymous requests, per client IP (scope `anon`).
+    """
+
+
+class UserRateThrottle(SlidingWindowThrottleMixin, throttling.UserRateThrottle):
+    """
+    Sliding-window limit on authenticated requests, per user (scope `user`).
+    """
+
+
+def throttles(scope, user=None, anon=None):
+    """
+    Build throttle classes with their own rates for one endpoint, e.g.
+    `View.as_view(throttle_classes=throttles('search', user='60/min', anon='10/min'))`.
+    Omitted rates fall back to the default `user`/`anon` rates.
+    """
+    classes = []
+    for base, rate in ((AnonRateThrottle, anon), (UserRateThrottle, user)):
+        attrs = {'scope': scope, 'rate': rate or base.THROTTLE_RATES.get(base.scope)}
+        classes.append(type(f"{scope.title().replace('-', '')}{base.__name__}", (base,), attrs))
+    return classes
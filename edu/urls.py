@@ -1,80 +1,172 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .async_views import ChangeStreamView, async_view
+from .throttling import throttles
 
 app_name = 'edu'  # Namespace for this app
 
+# Endpoints with their own rate limits pass `throttle_classes=throttles(...)`,
+# which replaces the default `anon`/`user` throttles for that endpoint.
+
+
+def read_view(view_class, **initkwargs):
+    """
+    `view_class.as_view()`, or, with EDU_ASYNC_VIEWS on (early_child_api/asgi.py
+    turns it on), its async version: reads use the async ORM and other
+    methods are passed to `view_class`.
+    """
+    if getattr(settings, 'EDU_ASYNC_VIEWS', False):
+        return async_view(view_class).as_view(sync_view_class=view_class, **initkwargs)
+    return view_class.as_view(**initkwargs)
+
+
 urlpatterns = [
     # User Profile Endpoints
     path(
         'v1/user-profiles/',
-        views.UserProfileListCreateView.as_view(),
+        read_view(views.UserProfileListCreateView),
         name='user-profiles-list'
     ),
     path(
         'v1/user-profiles/<int:pk>/',
-        views.UserProfileDetailView.as_view(),
+        read_view(views.UserProfileDetailView),
         name='user-profile-detail'
     ),
 
     # Child Profile Endpoints
     path(
         'v1/child-profiles/',
-        views.ChildProfileListCreateView.as_view(),
+        read_view(views.ChildProfileListCreateView),
         name='child-profiles-list'
     ),
     path(
         'v1/child-profiles/<int:pk>/',
-        views.ChildProfileDetailView.as_view(),
+        read_view(views.ChildProfileDetailView),
         name='child-profile-detail'
     ),
+    path(
+        'v1/child-profiles/<int:pk>/recommendations/',
+        views.ChildRecommendationsView.as_view(),
+        name='child-recommendations'
+    ),
+    path(
+        'v1/child-profiles/<int:pk>/completions/',
+        views.ChildCompletionListCreateView.as_view(),
+        name='child-completions'
+    ),
+    path(
+        'v1/child-profiles/<int:pk>/progress/',
+        views.ChildProgressView.as_view(),
+        name='child-progress'
+    ),
 
     # Resource Endpoints
     path(
         'v1/resources/',
-        views.ResourceListCreateView.as_view(),
+        read_view(views.ResourceListCreateView),
         name='resources-list'
     ),
     path(
         'v1/resources/<int:pk>/',
-        views.ResourceDetailView.as_view(),
+        read_view(views.ResourceDetailView),
         name='resource-detail'
     ),
 
     # Phonetics Module Endpoints
     path(
         'v1/phonetics-modules/',
-        views.PhoneticsModuleListCreateView.as_view(),
+        read_view(views.PhoneticsModuleListCreateView),
         name='phonetics-modules-list'
     ),
     path(
         'v1/phonetics-modules/<int:pk>/',
-        views.PhoneticsModuleDetailView.as_view(),
+        read_view(views.PhoneticsModuleDetailView),
         name='phonetics-module-detail'
     ),
+    path(
+        'v1/phonetics-modules/<int:pk>/audio/',
+        # Seeking issues many small range requests, so the default daily rate is far too low
+        views.PhoneticsAudioView.as_view(throttle_classes=throttles('audio', user='1200/min')),
+        name='phonetics-module-audio'
+    ),
 
     # Math Module Endpoints
     path(
         'v1/math-modules/',
-        views.MathModuleListCreateView.as_view(),
+        read_view(views.MathModuleListCreateView),
         name='math-modules-list'
     ),
     path(
         'v1/math-modules/<int:pk>/',
-        views.MathModuleDetailView.as_view(),
+        read_view(views.MathModuleDetailView),
         name='math-module-detail'
     ),
 
     # STEM Module Endpoints
     path(
         'v1/stem-modules/',
-        views.STEMModuleListCreateView.as_view(),
+        read_view(views.STEMModuleListCreateView),
         name='stem-modules-list'
     ),
     path(
         'v1/stem-modules/<int:pk>/',
-        views.STEMModuleDetailView.as_view(),
+        read_view(views.STEMModuleDetailView),
         name='stem-module-detail'
     ),
-]
 
+    # Change Event Stream (ASGI only)
+    path(
+        'v1/events/',
+        # One request per connection, but clients reconnect after network blips
+        ChangeStreamView.as_view(throttle_classes=throttles('events', user='60/min')),
+        name='change-events'
+    ),
+
+    # Delta Sync Endpoints
+    path(
+        'v1/sync/<str:resource_type>/',
+        views.SyncFeedView.as_view(),
+        name='sync-feed'
+    ),
 
+    # Export Endpoints
+    path(
+        'v1/exports/<str:dataset>/',
+        views.ExportView.as_view(throttle_classes=throttles('export', user='30/hour')),
+        name='export'
+    ),
+
+    # Search Endpoint
+    path(
+        'v1/search/',
+        views.SearchView.as_view(throttle_classes=throttles('search', user='120/min', anon='20/min')),
+        name='search'
+    ),
+
+    # Catalog Endpoint
+    path(
+        'v1/catalog/',
+        views.CatalogView.as_view(),
+        name='catalog'
+    ),
+
+    # Progress Event Endpoint
+    path(
+        'v1/progress-events/',
+        views.ProgressEventIngestView.as_view(throttle_classes=throttles('progress-events', user='600/min')),
+        name='progress-events'
+    ),
+    path(
+        'v1/module-progress/<str:module_type>/<int:pk>/',
+        views.ModuleProgressView.as_view(),
+        name='module-progress'
+    ),
+
+    # Monitoring Endpoint
+    path(
+        'v1/cache-stats/',
+        views.CacheStatsView.as_view(),
+        name='cache-stats'
+    ),
+]
@@ -1,22 +1,86 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, ValidationError
-from rest_framework.pagination import PageNumberPagination
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.db.models import CharField, Value
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule
+from .access import in_group, is_owner
+from .audio import RENDITIONS, pick_rendition
+from .authentication import token_cache_metrics
+from .bulk import BulkCreateMixin, BulkMixin
+from .caching import CachedResponseMixin, response_cache_metrics
+from .conditional import ConditionalGetMixin
+from .exports import EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+from .fast_serializers import FastListMixin
+from .ingestion import event_buffer, get_ingest_settings
+from .media import serve_file
+from .pagination import CatalogPagination, CustomPagination, SyncPagination
+from .progress import MODULE_MODELS, child_progress, record_completions
+from .query_planning import optimize_queryset
+from .recommendations import AGE_BANDS, ITEM_TYPES, age_band_for, recommendations_for
+from .search import SEARCH_TYPES, get_search_backend
+from .streaming import stream_content
+from .models import (
+    UserProfile, ChildProfile, Resource, PhoneticsModule, MathModule, STEMModule, Tombstone, ProgressEvent,
+    ModuleCompletion, ModuleProgressSummary,
+)
 from .serializers import (
     UserProfileSerializer, 
     ChildProfileSerializer, 
     ResourceSerializer, 
     PhoneticsModuleSerializer, 
     MathModuleSerializer, 
-    STEMModuleSerializer
+    STEMModuleSerializer,
+    PhoneticsModuleCatalogSerializer,
+    MathModuleCatalogSerializer,
+    STEMModuleCatalogSerializer,
+    ProgressEventSerializer,
+    ModuleCompletionSerializer,
 )
 
 # Base mixin for shared functionality
 class BaseViewMixin:
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        """
+        Apply `select_related`/`prefetch_related` derived from the serializer
+        so list and detail endpoints run a constant number of queries.
+        """
+        queryset = super().get_queryset()
+        return optimize_queryset(queryset, self.get_serializer())
+
+    def get_object(self):
+        """
+        Memoize the detail object so mixins share a single lookup per request.
+        """
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
+
+    def get_plain_object(self):
+        """
+        Fetch the detail object by primary key without the serializer's
+        query plan and run object-level permission checks against it.
+        """
+        if getattr(self, '_object', None) is not None:
+            return self._object
+        if getattr(self, '_plain_object', None) is None:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            obj = get_object_or_404(
+                self.queryset.model._default_manager,
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+            )
+            self.check_object_permissions(self.request, obj)
+            self._plain_object = obj
+        return self._plain_object
+
     def handle_exception(self, exc):
         """
         Custom error response handler.
@@ -25,19 +89,28 @@ class BaseViewMixin:
             return Response({"error": "Resource not found."}, status=status.HTTP_404_NOT_FOUND)
         return super().handle_exception(exc)
 
-# Custom Pagination
-class CustomPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
 # Custom Permissions
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
     Custom permission to allow only owners or admins to edit/delete objects.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user.is_staff or obj.user == request.user
+        return request.user.is_staff or is_owner(request.user, obj, 'user')
+
+    @staticmethod
+    def scope_queryset(request, queryset, owner_field):
+        """
+        Queryset equivalent of `has_object_permission`: admins see every row,
+        other users only rows whose `owner_field` is the requesting user.
+        """
+        if request.user.is_staff:
+            return queryset
+        if owner_field is None:
+            return queryset.none()
+        owner_model = queryset.model._meta.get_field(owner_field).related_model
+        if not isinstance(request.user, owner_model):
+            return queryset.none()
+        return queryset.filter(**{owner_field: request.user})
 
 class IsAdminOrResourceCreator(permissions.BasePermission):
     """
@@ -45,29 +118,40 @@ class IsAdminOrResourceCreator(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         # Check if the user is an admin or in the 'resource_creator' group
-        return request.user.is_staff or request.user.groups.filter(name='resource_creator').exists()
+        return request.user.is_staff or in_group(request, 'resource_creator')
 
 # User Profile Views
-class UserProfileListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class UserProfileListCreateView(ConditionalGetMixin, BulkCreateMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create user profiles.
     - `GET`: Retrieve a list of user profiles.
     - `POST`: Create a new user profile linked to the authenticated user.
+    - `POST` with a JSON array creates profiles in bulk.
     """
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
     pagination_class = CustomPagination
 
+    def get_bulk_context(self, items):
+        """
+        Check every username and email in the batch with a single query.
+        """
+        context = super().get_bulk_context(items)
+        context['taken_values'] = UserProfileSerializer.find_taken_values(items)
+        return context
+
     def perform_create(self, serializer):
         """
         Save the user profile associated with the authenticated user.
         """
         try:
             serializer.save(user=self.request.user)
+        except ValidationError:
+            raise
         except Exception as e:
             raise ValidationError({"error": f"Failed to create user profile: {str(e)}"})
 
-class UserProfileDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class UserProfileDetailView(ConditionalGetMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a user profile.
     """
@@ -76,15 +160,29 @@ class UserProfileDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
 # Child Profile Views
-class ChildProfileListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class ChildProfileListCreateView(ConditionalGetMixin, BulkMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create child profiles.
+    - `POST`/`PATCH`/`DELETE` with a JSON array create, update or delete in bulk.
     """
     queryset = ChildProfile.objects.all()
     serializer_class = ChildProfileSerializer
     pagination_class = CustomPagination
+    # IsOwnerOrAdmin guards the rows a bulk PATCH/DELETE touches, as on the detail endpoint
+    permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
+
+    def get_bulk_context(self, items):
+        """
+        Resolve every referenced user profile with a single query.
+        """
+        context = super().get_bulk_context(items)
+        user_ids = {item['user_id'] for item in items if isinstance(item.get('user_id'), int)}
+        context['known_user_ids'] = set(
+            UserProfile.objects.filter(pk__in=user_ids).values_list('pk', flat=True)
+        )
+        return context
 
-class ChildProfileDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class ChildProfileDetailView(ConditionalGetMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a child profile.
     """
@@ -93,73 +191,558 @@ class ChildProfileDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIVie
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
 # Resource Views
-class ResourceListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class ResourceListCreateView(ConditionalGetMixin, CachedResponseMixin, BulkMixin, FastListMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create educational resources.
+    - `POST`/`PATCH`/`DELETE` with a JSON array create, update or delete in bulk.
     """
     queryset = Resource.objects.all()
     serializer_class = ResourceSerializer
+    cache_models = (Resource,)
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['category', 'level']
-    permission_classes = BaseViewMixin.permission_classes + [IsAdminOrResourceCreator]
+    filterset_fields = ['title']
+    # IsOwnerOrAdmin guards the rows a bulk PATCH/DELETE touches, as on the detail endpoint
+    permission_classes = BaseViewMixin.permission_classes + [IsAdminOrResourceCreator, IsOwnerOrAdmin]
 
-class ResourceDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class ResourceDetailView(ConditionalGetMixin, CachedResponseMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a specific resource.
     """
     queryset = Resource.objects.all()
     serializer_class = ResourceSerializer
+    cache_models = (Resource,)
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
 # Phonetics Module Views
-class PhoneticsModuleListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class PhoneticsModuleListCreateView(ConditionalGetMixin, CachedResponseMixin, FastListMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create phonetics modules.
     """
     queryset = PhoneticsModule.objects.all()
     serializer_class = PhoneticsModuleSerializer
+    cache_models = (PhoneticsModule, Resource)
     pagination_class = CustomPagination
 
-class PhoneticsModuleDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class PhoneticsModuleDetailView(ConditionalGetMixin, CachedResponseMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a phonetics module.
     """
     queryset = PhoneticsModule.objects.all()
     serializer_class = PhoneticsModuleSerializer
+    cache_models = (PhoneticsModule, Resource)
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
+class PhoneticsAudioView(generics.GenericAPIView):
+    """
+    API endpoint delivering a phonetics module's audio file.
+    - The smallest processed rendition whose type the `Accept` header
+      allows, or the original upload; `?rendition=original|wav|opus|mp3`
+      asks for one explicitly.
+    - Byte ranges (`Range: bytes=...`), so players can seek and resume.
+    - Strong ETag/Last-Modified validators and `Cache-Control: private`.
+    - With `EDU_MEDIA['OFFLOAD']` set, the front server sends the file.
+    Readable by any authenticated user, like the module list.
+    """
+    queryset = PhoneticsModule.objects.only('id', 'audio_file', 'audio_status')
+    permission_classes = BaseViewMixin.permission_classes
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is audio whatever the Accept header asks for.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, pk):
+        module = get_object_or_404(self.get_queryset(), pk=pk)
+        if not module.audio_file:
+            raise NotFound("This module has no audio file.")
+        codec = request.query_params.get('rendition')
+        if codec is not None and codec != 'original' and codec not in RENDITIONS:
+            raise ValidationError({"rendition": f"Choose one of: original, {', '.join(RENDITIONS)}."})
+        chosen = pick_rendition(module, request.headers.get('Accept'), codec)
+        if chosen is None:
+            raise NotFound("This rendition is not available.")
+        response = serve_file(request, *chosen)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
 # Math Module Views
-class MathModuleListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class MathModuleListCreateView(ConditionalGetMixin, CachedResponseMixin, FastListMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create math modules.
     """
     queryset = MathModule.objects.all()
     serializer_class = MathModuleSerializer
+    cache_models = (MathModule, Resource)
     pagination_class = CustomPagination
 
-class MathModuleDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class MathModuleDetailView(ConditionalGetMixin, CachedResponseMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a math module.
     """
     queryset = MathModule.objects.all()
     serializer_class = MathModuleSerializer
+    cache_models = (MathModule, Resource)
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
 # STEM Module Views
-class STEMModuleListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+class STEMModuleListCreateView(ConditionalGetMixin, CachedResponseMixin, FastListMixin, BaseViewMixin, generics.ListCreateAPIView):
     """
     API endpoint to list and create STEM modules.
     """
     queryset = STEMModule.objects.all()
     serializer_class = STEMModuleSerializer
+    cache_models = (STEMModule, Resource)
     pagination_class = CustomPagination
 
-class STEMModuleDetailView(BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
+class STEMModuleDetailView(ConditionalGetMixin, CachedResponseMixin, BaseViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update, and delete a STEM module.
     """
     queryset = STEMModule.objects.all()
     serializer_class = STEMModuleSerializer
+    cache_models = (STEMModule, Resource)
     permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
 
+# Delta Sync Views
+SYNC_FEEDS = {
+    'child-profiles': (ChildProfile, ChildProfileSerializer),
+    'resources': (Resource, ResourceSerializer),
+    'phonetics-modules': (PhoneticsModule, PhoneticsModuleSerializer),
+    'math-modules': (MathModule, MathModuleSerializer),
+    'stem-modules': (STEMModule, STEMModuleSerializer),
+}
+
+class SyncFeedView(BaseViewMixin, generics.ListAPIView):
+    """
+    API endpoint returning rows changed and deleted since a watermark.
+    - `GET ?updated_since=<ISO 8601>`: rows with a newer `updated_at`, plus
+      tombstones for rows deleted since then. Omit it for a full sync.
+    - The response `watermark` is the `updated_since` for the next sync.
+    Changed rows are keyset-paginated on `(updated_at, id)`; the `next`
+    cursor keeps the first page's window, so the pages of one sync fit
+    together. Tombstones for the window are returned with the first page.
+    """
+    pagination_class = SyncPagination
+
+    def get_feed(self):
+        try:
+            return SYNC_FEEDS[self.kwargs['resource_type']]
+        except KeyError:
+            raise NotFound()
+
+    def get_serializer_class(self):
+        return self.get_feed()[1]
+
+    def get_queryset(self):
+        self.queryset = self.get_feed()[0].objects.all()
+        queryset = super().get_queryset().filter(updated_at__lte=self.watermark)
+        if self.updated_since is not None:
+            queryset = queryset.filter(updated_at__gt=self.updated_since)
+        return queryset
+
+    def get_updated_since(self):
+        value = self.request.query_params.get('updated_since')
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError({"updated_since": "Must be an ISO 8601 datetime."})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, dt_timezone.utc)
+        return parsed
+
+    def get_deleted(self):
+        """
+        Return ids of rows deleted inside the `(updated_since, watermark]` window.
+        """
+        if self.updated_since is None:
+            return []
+        return list(
+            Tombstone.objects.filter(
+                model=self.get_feed()[0]._meta.label_lower,
+                deleted_at__gt=self.updated_since,
+                deleted_at__lte=self.watermark,
+            ).values_list('object_id', flat=True)
+        )
+
+    def list(self, request, *args, **kwargs):
+        cursor = request.query_params.get(self.paginator.cursor_query_param)
+        first_page = not cursor
+        if first_page:
+            # Hold the watermark back slightly so rows from transactions that are
+            # still committing are picked up by the next sync instead of skipped.
+            settle = getattr(settings, 'EDU_SYNC_SETTLE_SECONDS', 2)
+            self.watermark = timezone.now() - timedelta(seconds=settle)
+            self.updated_since = self.get_updated_since()
+        else:
+            self.updated_since, self.watermark = self.paginator.decode_window(cursor)
+        self.paginator.window = (self.updated_since, self.watermark)
+
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return Response({
+            "watermark": self.watermark.isoformat(),
+            "next": self.paginator.get_next_link(),
+            "changed": serializer.data,
+            "deleted": self.get_deleted() if first_page else [],
+        })
+
+# Export Views
+class ExportView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint streaming a full dataset export.
+    - `GET ?export_format=csv|ndjson`: rows are read with a server-side cursor
+      and written as they arrive, so memory stays flat for any table size.
+    Rows are scoped like `IsOwnerOrAdmin`: admins export everything.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is CSV or NDJSON whatever the Accept header asks for.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, dataset):
+        try:
+            export = EXPORT_DATASETS[dataset]
+        except KeyError:
+            raise NotFound()
+        file_format = request.query_params.get('export_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({"export_format": f"Choose one of: {', '.join(EXPORT_FORMATS)}."})
+
+        queryset = IsOwnerOrAdmin.scope_queryset(request, export['model'].objects.all(), export['owner_field'])
+        response = StreamingHttpResponse(
+            stream_content(request, iter_export(queryset, export['columns'], file_format)),
+            content_type=EXPORT_FORMATS[file_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{file_format}"'
+        return response
+
+# Search Views
+class SearchView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint for full-text search across resources and modules.
+    - `GET ?q=<terms>`: every term must match the title or description;
+      terms also match as prefixes. Results are ranked, titles weighing most.
+    - `type`: optional comma-separated subset of
+      `resource`, `phonetics-module`, `math-module`, `stem-module`.
+    - `limit`: number of results (default 20, at most 100).
+    """
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({"q": "This parameter is required."})
+        types = [value for value in request.query_params.get('type', '').split(',') if value]
+        unknown = [value for value in types if value not in SEARCH_TYPES]
+        if unknown:
+            raise ValidationError({"type": f"Unknown types: {', '.join(unknown)}."})
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        hits = get_search_backend().search(query, types=types, limit=max(limit, 1))
+
+        # One primary key lookup per result type
+        rows = {}
+        for search_type in {hit[0] for hit in hits}:
+            model = SEARCH_TYPES[search_type][1]
+            pks = [pk for hit_type, pk, _ in hits if hit_type == search_type]
+            rows[search_type] = model.objects.only('id', 'title', 'description').in_bulk(pks)
+
+        results = []
+        for search_type, pk, score in hits:
+            obj = rows[search_type].get(pk)
+            if obj is not None:
+                results.append({
+                    "type": search_type,
+                    "id": obj.pk,
+                    "title": obj.title,
+                    "description": obj.description,
+                    "score": round(score, 4),
+                })
+        return Response({"query": query, "results": results})
+
+# Catalog Views
+CATALOG_SECTIONS = {
+    'phonetics': (PhoneticsModule, PhoneticsModuleCatalogSerializer, 'phonetics_modules'),
+    'math': (MathModule, MathModuleCatalogSerializer, 'math_modules'),
+    'stem': (STEMModule, STEMModuleCatalogSerializer, 'stem_modules'),
+}
+
+class CatalogView(CachedResponseMixin, BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint returning every module type and their resources in one response.
+    - `types`: optional comma-separated subset of `phonetics`, `math`, `stem`.
+    - `difficulty_level`: filter math modules (`Easy`, `Medium`, `Hard`).
+    - `page`, `page_size`: each response holds that page of every module
+      type; `count` gives each type's total and `next` is set while any
+      type has more pages.
+    Modules list their resource ids; each resource of the page's modules
+    appears once under `resources`. The response is built with a count and
+    a page query per module type, one UNION ALL over the link tables and one
+    resource query, and is cached as a unit.
+    """
+    cache_models = (Resource, PhoneticsModule, MathModule, STEMModule)
+    pagination_class = CatalogPagination
+
+    def get_sections(self):
+        types = [value for value in self.request.query_params.get('types', '').split(',') if value]
+        unknown = [value for value in types if value not in CATALOG_SECTIONS]
+        if unknown:
+            raise ValidationError({"types": f"Unknown types: {', '.join(unknown)}."})
+        return types or list(CATALOG_SECTIONS)
+
+    def get_module_queryset(self, section):
+        queryset = CATALOG_SECTIONS[section][0].objects.order_by('created_at', 'id')
+        difficulty_level = self.request.query_params.get('difficulty_level')
+        if section == 'math' and difficulty_level:
+            queryset = queryset.filter(difficulty_level=difficulty_level)
+        return queryset
+
+    def build_catalog(self):
+        sections = self.get_sections()
+        paginators = {section: self.pagination_class() for section in sections}
+        modules = {
+            section: paginators[section].paginate_queryset(self.get_module_queryset(section), self.request, view=self)
+            for section in sections
+        }
+        if all(paginator.is_past_end() for paginator in paginators.values()):
+            raise NotFound("Invalid page.")
+
+        # Every module/resource link for the returned modules in a single query
+        link_queries = []
+        for section in sections:
+            model = CATALOG_SECTIONS[section][0]
+            module_field = f"{model._meta.model_name}_id"
+            link_queries.append(
+                model.resources.through.objects
+                .filter(**{f"{module_field}__in": [module.pk for module in modules[section]]})
+                .annotate(section=Value(section, output_field=CharField()))
+                .values_list('section', module_field, 'resource_id')
+            )
+        resource_ids = {section: {} for section in sections}
+        links = link_queries[0].union(*link_queries[1:], all=True) if link_queries else []
+        for section, module_id, resource_id in links:
+            resource_ids[section].setdefault(module_id, []).append(resource_id)
+        for section_links in resource_ids.values():
+            for ids in section_links.values():
+                ids.sort()
+
+        all_ids = {pk for section_links in resource_ids.values() for ids in section_links.values() for pk in ids}
+        resources = Resource.objects.filter(pk__in=all_ids).order_by('id') if all_ids else []
+
+        # Every type's paginator links to the same neighbouring page number
+        data = {
+            'count': {CATALOG_SECTIONS[section][2]: paginators[section].page.paginator.count for section in sections},
+            'next': next(filter(None, (paginator.get_next_link() for paginator in paginators.values())), None),
+            'previous': next(filter(None, (paginator.get_previous_link() for paginator in paginators.values())), None),
+        }
+        for section in sections:
+            model, serializer_class, key = CATALOG_SECTIONS[section]
+            context = {**self.get_serializer_context(), 'resource_ids': resource_ids[section]}
+            data[key] = serializer_class(modules[section], many=True, context=context).data
+        data['resources'] = ResourceSerializer(resources, many=True, context=self.get_serializer_context()).data
+        return data
+
+    def get(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: Response(self.build_catalog()))
+
+# Recommendation Views
+class ChildRecommendationsView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint returning age-appropriate modules and resources for a child.
+    - `limit`: number of results (default 20, at most 100).
+    - `type`: optional comma-separated subset of
+      `resource`, `phonetics-module`, `math-module`, `stem-module`.
+    Rows are precomputed per age band by `refresh_recommendations`; modules
+    the child has completed are left out.
+    """
+    permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
+    max_limit = 100
+
+    def get_queryset(self):
+        return ChildProfile.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        child = self.get_object()
+        types = [value for value in request.query_params.get('type', '').split(',') if value]
+        unknown = [value for value in types if value not in ITEM_TYPES]
+        if unknown:
+            raise ValidationError({"type": f"Unknown types: {', '.join(unknown)}."})
+        try:
+            limit = max(min(int(request.query_params.get('limit', 20)), self.max_limit), 1)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        rows = recommendations_for(child, limit=limit, item_types=types)
+
+        # One primary key lookup per item type
+        objects = {}
+        for item_type in {row.item_type for row in rows}:
+            pks = [row.item_id for row in rows if row.item_type == item_type]
+            objects[item_type] = ITEM_TYPES[item_type].objects.only('id', 'title').in_bulk(pks)
+
+        results = []
+        for row in rows:
+            obj = objects[row.item_type].get(row.item_id)
+            if obj is not None:
+                results.append({
+                    "type": row.item_type,
+                    "id": obj.pk,
+                    "title": obj.title,
+                    "score": round(row.score, 4),
+                })
+        return Response({"child": child.pk, "age_band": AGE_BANDS[age_band_for(child.age)], "results": results})
+
+# Progress Event Views
+class ProgressEventIngestView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint accepting batches of child activity events.
+    - `POST` a JSON object or array of objects with `child_id`, `event_type`
+      (`module_started`, `audio_played`, `problem_solved`, `module_completed`),
+      `module_type`, `module_id` and optional `value` and `occurred_at`.
+    Valid batches are buffered and written in the background (`202 Accepted`);
+    if any event is invalid nothing is queued. When the buffer is full the
+    response is `503` with `Retry-After`.
+    """
+    serializer_class = ProgressEventSerializer
+
+    def get_batch_context(self, items):
+        """
+        Resolve every child the user may write for and every referenced
+        module, one query per table.
+        """
+        child_ids = {item.get('child_id') for item in items if isinstance(item.get('child_id'), int)}
+        children = IsOwnerOrAdmin.scope_queryset(self.request, ChildProfile.objects.filter(pk__in=child_ids), 'user')
+        module_ids = {}
+        for item in items:
+            code = ProgressEventSerializer.MODULE_TYPES.get(item.get('module_type'))
+            if code is not None and isinstance(item.get('module_id'), int):
+                module_ids.setdefault(code, set()).add(item['module_id'])
+        return {
+            **self.get_serializer_context(),
+            'known_child_ids': set(children.values_list('pk', flat=True)),
+            'known_module_ids': {
+                code: set(ProgressEventSerializer.MODULE_MODELS[code].objects.filter(pk__in=ids).values_list('pk', flat=True))
+                for code, ids in module_ids.items()
+            },
+        }
+
+    def post(self, request, *args, **kwargs):
+        items = request.data if isinstance(request.data, list) else [request.data]
+        options = get_ingest_settings()
+        if len(items) > options['MAX_ITEMS']:
+            raise ValidationError({"error": f"A batch may contain at most {options['MAX_ITEMS']} items."})
+        if not all(isinstance(item, dict) for item in items):
+            raise ValidationError({"error": "Expected an object or a list of objects."})
+
+        serializer = self.get_serializer(context=self.get_batch_context(items))
+        events, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                events.append(ProgressEvent(**serializer.run_validation(item)))
+            except ValidationError as exc:
+                errors.append({"index": index, "status": "error", "errors": exc.detail})
+        if errors:
+            return Response(
+                {"invalid": len(errors), "total": len(items), "results": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not event_buffer.offer(events):
+            response = Response(
+                {"error": "Event buffer is full; retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            response['Retry-After'] = str(max(int(options['FLUSH_INTERVAL'] or 1), 1))
+            return response
+        return Response({"accepted": len(events)}, status=status.HTTP_202_ACCEPTED)
+
+# Progress Views
+class ChildCompletionListCreateView(BaseViewMixin, generics.ListCreateAPIView):
+    """
+    API endpoint to list and record a child's module completions.
+    - `POST` with `module_type`, `module_id` and optional `completed_at`;
+      recording a completion twice returns the existing one with `200`.
+    Completions update the child and module progress rollups in the same
+    transaction.
+    """
+    queryset = ModuleCompletion.objects.all()
+    serializer_class = ModuleCompletionSerializer
+    pagination_class = CustomPagination
+    permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
+
+    def get_child(self):
+        child = get_object_or_404(ChildProfile, pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, child)
+        return child
+
+    def get_queryset(self):
+        return super().get_queryset().filter(child_id=self.kwargs['pk']).order_by('-completed_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        self.get_child()
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        child = self.get_child()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        attrs = serializer.validated_data
+        created = record_completions([(child.pk, attrs['module_type'], attrs['module_id'], attrs['completed_at'])])
+        if created:
+            return Response(self.get_serializer(created[0]).data, status=status.HTTP_201_CREATED)
+        existing = self.get_queryset().get(module_type=attrs['module_type'], module_id=attrs['module_id'])
+        return Response(self.get_serializer(existing).data)
+
+class ChildProgressView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint returning a child's completion summary.
+    Reads the child and its rollup row in a single query.
+    """
+    permission_classes = BaseViewMixin.permission_classes + [IsOwnerOrAdmin]
+
+    def get_queryset(self):
+        return ChildProfile.objects.select_related('progress_summary')
+
+    def get(self, request, *args, **kwargs):
+        child = self.get_object()
+        summary = getattr(child, 'progress_summary', None)
+        return Response({"child": child.pk, **child_progress(summary)})
+
+class ModuleProgressView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint returning how many children completed a module, and when last.
+    """
+    def get_queryset(self):
+        return ModuleProgressSummary.objects.all()
+
+    def get(self, request, module_type, pk):
+        model = MODULE_MODELS.get(module_type)
+        if model is None:
+            raise NotFound(f"Unknown module type '{module_type}'.")
+        if not model.objects.filter(pk=pk).exists():
+            raise NotFound("Module not found.")
+        summary = self.get_queryset().filter(module_type=module_type, module_id=pk).first()
+        return Response({
+            "module_type": module_type,
+            "module_id": pk,
+            "completions": summary.completions if summary else 0,
+            "last_completed_at": summary.last_completed_at if summary else None,
+        })
+
+# Monitoring Views
+class CacheStatsView(BaseViewMixin, generics.GenericAPIView):
+    """
+    API endpoint reporting this process's cache hit rates (admins only):
+    response cache hits per view and token resolution hits per layer.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            "responses": response_cache_metrics.snapshot(),
+            "tokens": token_cache_metrics.snapshot(),
+        })